@@ -0,0 +1,141 @@
+"""Write synthetic glTF assets for the benchmarks.
+
+Assets are a node hierarchy plus grid meshes, each mesh a triangle list with
+its own POSITION and index accessors. Every mesh holds the same grid, so large
+buffers are written by repeating one block of bytes.
+"""
+import array
+import io
+import json
+import os
+import random
+import sys
+
+
+# Nodes per chain, chains hang off random earlier nodes so depth grows with the asset.
+CHAIN_LENGTH = 20
+
+COMPONENT_TYPE_UNSIGNED_INT = 5125
+COMPONENT_TYPE_FLOAT = 5126
+
+TARGET_ARRAY_BUFFER = 34962
+TARGET_ELEMENT_ARRAY_BUFFER = 34963
+
+
+def toBytes(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+
+    return values.tostring() if hasattr(values, 'tostring') else values.tobytes()
+
+
+def getGrid(gridSize):
+    """Get the positions and triangle indices of a flat grid of gridSize by gridSize vertices, as bytes.
+
+    Returns:
+        tuple: position bytes, index bytes, vertex count and index count.
+    """
+    positions = array.array('f')
+    for row in range(gridSize):
+        for column in range(gridSize):
+            positions.extend((float(column), 0.0, float(row)))
+
+    indices = array.array('I')
+    for row in range(gridSize - 1):
+        for column in range(gridSize - 1):
+            a = row * gridSize + column
+            b = a + gridSize
+            indices.extend((a, b, a + 1, a + 1, b, b + 1))
+
+    return toBytes(positions), toBytes(indices), gridSize * gridSize, len(indices)
+
+
+def getHierarchy(nodeCount, rootCount=1, seed=0):
+    """Get the children of each node of a random hierarchy, the first rootCount nodes being roots.
+
+    Returns:
+        list: child indices per node.
+    """
+    rng = random.Random(seed)
+    children = [[] for _ in range(nodeCount)]
+
+    index = rootCount
+    while index < nodeCount:
+        parent = rng.randrange(index)
+        for _ in range(min(CHAIN_LENGTH, nodeCount - index)):
+            children[parent].append(index)
+            parent = index
+            index += 1
+
+    return children
+
+
+def writeAsset(directory, nodeCount, meshCount=0, gridSize=2, rootCount=1, seed=0):
+    """Write out.gltf and out.bin into directory, the first meshCount nodes each get a mesh.
+
+    Returns:
+        str: the directory.
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    rng = random.Random(seed)
+    positionBytes, indexBytes, vertexCount, indexCount = getGrid(gridSize)
+
+    description = {
+        'asset': {'version': '2.0', 'generator': 'dragonfly benchmarks'},
+        'scene': 0,
+        'scenes': [{'name': 'scene', 'nodes': list(range(min(rootCount, nodeCount)))}],
+        'nodes': [],
+        'meshes': [],
+        'accessors': [],
+        'bufferViews': [],
+        'buffers': [],
+    }
+
+    for index, children in enumerate(getHierarchy(nodeCount, rootCount, seed)):
+        node = {
+            'name': 'node{0}'.format(index),
+            'translation': [rng.uniform(-1.0, 1.0) for _ in range(3)],
+        }
+        if children:
+            node['children'] = children
+        if index < meshCount:
+            node['mesh'] = index
+        description['nodes'].append(node)
+
+    binPath = os.path.join(directory, 'out.bin')
+    byteOffset = 0
+    with io.open(binPath, 'wb') as fp:
+        for index in range(meshCount):
+            for data, componentType, dataType, count, target in (
+                    (positionBytes, COMPONENT_TYPE_FLOAT, 'VEC3', vertexCount, TARGET_ARRAY_BUFFER),
+                    (indexBytes, COMPONENT_TYPE_UNSIGNED_INT, 'SCALAR', indexCount, TARGET_ELEMENT_ARRAY_BUFFER)):
+                fp.write(data)
+                description['bufferViews'].append({
+                    'buffer': 0, 'byteOffset': byteOffset, 'byteLength': len(data), 'target': target})
+                description['accessors'].append({
+                    'bufferView': len(description['bufferViews']) - 1,
+                    'componentType': componentType, 'type': dataType, 'count': count})
+                byteOffset += len(data)
+
+            accessorIndex = len(description['accessors'])
+            description['accessors'][accessorIndex - 2].update(
+                {'min': [0.0, 0.0, 0.0], 'max': [gridSize - 1.0, 0.0, gridSize - 1.0]})
+            description['meshes'].append({'name': 'mesh{0}'.format(index), 'primitives': [
+                {'attributes': {'POSITION': accessorIndex - 2}, 'indices': accessorIndex - 1, 'mode': 4}]})
+
+    description['buffers'].append({'uri': 'out.bin', 'byteLength': byteOffset})
+
+    with open(os.path.join(directory, 'out.gltf'), 'w') as fp:
+        json.dump(description, fp, separators=(',', ':'))
+
+    return directory
+
+
+def getGridSize(megabytes, meshCount):
+    """Get the grid size that makes meshCount meshes take about megabytes of buffer data."""
+    # Each vertex takes 12 bytes of position and about 24 bytes of indices, 6 per grid cell.
+    vertices = megabytes * 1024 * 1024 / 36.0 / meshCount
+
+    return max(2, int(vertices ** 0.5))
@@ -0,0 +1,67 @@
+"""Time adding buffer views with BufferView.addBufferView, in memory and streamed to a file.
+
+Adds 10k, 100k and 1M views of a few bytes each and reports the time per view,
+which stays flat when appending is linear in the final buffer size. The
+view sizes cycle through every 4 byte alignment, so padding is exercised too.
+
+    python benchmarks/buffer_append.py [--counts 10000 100000 1000000]
+"""
+import argparse
+import sys
+
+import common
+
+common.addSourcePath()
+
+from gltf.interface import gltf
+
+
+COUNTS = [10000, 100000, 1000000]
+
+CHUNKS = [b'\x01' * size for size in (12, 13, 14, 15)]
+
+
+def addViews(count, stream=False):
+    """Add count views to a new buffer.
+
+    Returns:
+        int: the final byte length of the buffer.
+    """
+    buff = gltf.Buffer()
+    if stream:
+        buff.streamTo()
+
+    bufferViews = []
+    try:
+        for index in range(count):
+            bufferViews.append(gltf.BufferView.addBufferView(buff, CHUNKS[index % len(CHUNKS)]))
+
+        return buff.getByteLength()
+    finally:
+        buff.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=COUNTS)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for stream in (False, True):
+        firstPerView = None
+        for count in args.counts:
+            duration, byteLength = common.timeCall(addViews, count, stream)
+            perView = duration / count
+            firstPerView = firstPerView or perView
+
+            rows.append([
+                'streamed' if stream else 'memory', count, common.toMegabytes(byteLength),
+                duration, perView * 1e6, perView / firstPerView])
+
+    common.printTable(['buffer', 'views', 'MB', 'seconds', 'us/view', 'vs first'], rows)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Compare eager and memory-mapped buffer loading in GLTF.importGLTF.
+
+Writes a synthetic asset with a large .bin buffer, then imports it in a fresh
+interpreter per mode and reports the time until the first node is available,
+the time until the first mesh's positions are decoded, and the peak memory
+the import added to the process.
+
+    python benchmarks/buffer_loading.py [--megabytes 256] [--directory DIR]
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+
+import common
+
+common.addSourcePath()
+
+from gltf.interface import gltf
+
+import assets
+
+
+MODES = ['eager', 'mapped']
+
+MESH_COUNT = 64
+
+
+def runCase(mode, directory):
+    """Import the asset in this process and emit the measurements."""
+    peakBefore = common.getPeakMemory()
+
+    start = time.time()
+    ctx = gltf.GLTF.importGLTF(directory, mapped=mode == 'mapped')
+    firstNode = ctx.nodes[0]
+    firstNodeTime = time.time() - start
+
+    ctx.getAccessorArray(ctx.meshes[firstNode.mesh].primitives[0].attributes['POSITION'])
+    firstMeshTime = time.time() - start
+
+    common.emitResult({
+        'firstNodeSeconds': firstNodeTime,
+        'firstMeshSeconds': firstMeshTime,
+        'peakMemory': common.getPeakMemory() - peakBefore,
+        'bufferBytes': ctx.buffers[0].getByteLength(),
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--megabytes', type=int, default=256, help='size of the synthetic buffer')
+    parser.add_argument('--directory', help='asset directory to use, a synthetic asset is written when omitted')
+    parser.add_argument('--case', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        runCase(args.case, args.directory)
+        return 0
+
+    directory = args.directory
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix='gltf_buffers')
+        assets.writeAsset(directory, MESH_COUNT, MESH_COUNT, assets.getGridSize(args.megabytes, MESH_COUNT))
+
+    try:
+        rows = []
+        for mode in MODES:
+            result = common.runIsolated(__file__, ['--case', mode, '--directory', directory])
+            rows.append([
+                mode,
+                common.toMegabytes(result['bufferBytes']),
+                result['firstNodeSeconds'],
+                result['firstMeshSeconds'],
+                common.toMegabytes(result['peakMemory']),
+            ])
+    finally:
+        if args.directory is None:
+            shutil.rmtree(directory)
+
+    common.printTable(['mode', 'buffer MB', 'first node s', 'first mesh s', 'peak MB'], rows)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Helpers shared by the benchmark scripts.
+
+Scripts run from a checkout with the Python 2.7 interpreter the package
+targets, e.g. python benchmarks/buffer_loading.py. Measurements that depend on
+process state, like peak memory, run each case in a fresh interpreter through
+runIsolated.
+"""
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+BENCHMARK_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(BENCHMARK_DIRECTORY), 'src')
+STANDIN_DIRECTORY = os.path.join(BENCHMARK_DIRECTORY, 'standin')
+
+BYTES_PER_MB = 1024 * 1024
+
+# Prefix of the line an isolated case prints its result on.
+RESULT_PREFIX = 'BENCHMARK_RESULT '
+
+
+def addSourcePath(standin=False):
+    """Make the packages importable, along with the in-memory maya stand-in when standin is set."""
+    paths = [SOURCE_DIRECTORY]
+    if standin:
+        paths.append(STANDIN_DIRECTORY)
+
+    for path in reversed(paths):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def timeCall(func, *args, **kwargs):
+    """Call func once with the garbage collector off.
+
+    Returns:
+        tuple: wall time in seconds and the result of the call.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.time()
+        result = func(*args, **kwargs)
+        duration = time.time() - start
+    finally:
+        gc.enable()
+
+    return duration, result
+
+
+def getPeakMemory():
+    """Get the peak resident memory of this process in bytes, None when it cannot be read."""
+    if resource is None:
+        return
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    if sys.platform != 'darwin':
+        peak *= 1024
+
+    return peak
+
+
+def getCurrentMemory():
+    """Get the current resident memory of this process in bytes, None when it cannot be read."""
+    try:
+        with open('/proc/self/statm') as fp:
+            return int(fp.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError):
+        return
+
+
+def toMegabytes(value):
+    if value is None:
+        return float('nan')
+
+    return value / float(BYTES_PER_MB)
+
+
+def emitResult(result):
+    """Print the result of an isolated case for runIsolated to pick up."""
+    sys.stdout.write(RESULT_PREFIX + json.dumps(result) + '\n')
+    sys.stdout.flush()
+
+
+def runIsolated(scriptPath, args):
+    """Run a script in a fresh interpreter and get the result it emitted.
+
+    Returns:
+        dict
+    """
+    output = subprocess.check_output([sys.executable, scriptPath] + [str(a) for a in args])
+
+    for line in output.decode('utf8').splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+
+    raise RuntimeError('{0} emitted no result.'.format(scriptPath))
+
+
+def printTable(columns, rows):
+    """Print rows of values under column titles, aligned."""
+    cells = [list(columns)] + [[formatValue(v) for v in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(columns))]
+
+    for row in cells:
+        print('  '.join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+def formatValue(value):
+    if isinstance(value, float):
+        return '{0:.4f}'.format(value)
+
+    return str(value)
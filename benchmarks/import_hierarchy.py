@@ -0,0 +1,108 @@
+"""Time gltf.maya.importer.importGLTF against the in-memory maya stand-in.
+
+Writes synthetic assets of 5k and 50k nodes, one node in ten with a grid mesh,
+and imports each into an empty stand-in scene. The run reports the wall time
+and the Maya API calls of the import, then checks the scene: every node has
+its parent and translation, every mesh has a shaded shape with its points,
+and a single undo removes the whole import.
+
+    python benchmarks/import_hierarchy.py [--sizes 5000 50000]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import common
+
+common.addSourcePath(standin=True)
+
+from maya import cmds, standin
+
+from gltf.maya import importer
+
+import assets
+
+
+SIZES = [5000, 50000]
+
+# One node in this many gets a mesh.
+MESH_INTERVAL = 10
+
+GRID_SIZE = 2
+
+TOLERANCE = 1e-9
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def verify(directory, nodeCount, meshCount):
+    """Check the imported scene against the asset written to directory."""
+    scene = standin.scene
+    names = ['node{0}'.format(i) for i in range(nodeCount)]
+
+    check(all(n in scene.names for n in names), 'Not every node was imported.')
+    nodes = [scene.names[n] for n in names]
+
+    for node, children in zip(nodes, assets.getHierarchy(nodeCount)):
+        check([c for c in node.children if c.nodeType == 'transform'] == [nodes[i] for i in children],
+              'The children of {0} do not match.'.format(node.name))
+
+    with open(os.path.join(directory, 'out.gltf')) as fp:
+        description = json.load(fp)
+    for node, gltfNode in zip(nodes, description['nodes']):
+        check(all(abs(a - b) <= TOLERANCE for a, b in zip(node.attrs['translate'], gltfNode['translation'])),
+              '{0} is not where it should be.'.format(node.name))
+
+    shapes = [c for n in nodes for c in n.children if c.nodeType == 'mesh']
+    check(len(shapes) == meshCount, 'Not every mesh was imported.')
+    check(all(s.getValue(('inMesh', None)) is not None for s in shapes), 'A mesh has no geometry.')
+
+    positionBytes = assets.getGrid(GRID_SIZE)[0]
+    check(all(s.getValue(('inMesh', None)).data.points.tostring() == positionBytes for s in shapes),
+          'A mesh does not have the points of its accessor.')
+
+    shadingGroup = scene.names['initialShadingGroup']
+    members = set(source for source, _ in shadingGroup.inputs.values())
+    check(members == set(shapes), 'Not every mesh is in initialShadingGroup.')
+
+    check(len(scene.undoQueue) == 1, 'The import took more than one undo step.')
+    cmds.undo()
+    check(not scene.world.children and list(scene.names) == ['initialShadingGroup'] and not shadingGroup.inputs,
+          'Undo did not remove the import.')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for size in args.sizes:
+        meshCount = size // MESH_INTERVAL
+        directory = assets.writeAsset(tempfile.mkdtemp(prefix='gltf_import'), size, meshCount, GRID_SIZE)
+
+        try:
+            standin.newScene()
+            standin.resetCalls()
+            duration, _ = common.timeCall(importer.importGLTF, directory)
+            callCount = sum(standin.calls.values())
+
+            verify(directory, size, meshCount)
+        finally:
+            shutil.rmtree(directory)
+
+        rows.append([size, meshCount, duration, duration * 1e6 / size, callCount, callCount / float(size)])
+
+    common.printTable(['nodes', 'meshes', 'seconds', 'us/node', 'calls', 'calls/node'], rows)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Compare eager and lazy GLTF.importGLTF for opening a file and reading scene 0's root names.
+
+Writes a synthetic asset of 200k nodes under 100 roots, one node in ten with
+a small mesh, then opens it in a fresh interpreter per mode. The run reports
+the time to open the file and read the root names, the peak and retained
+memory that added to the process, and how many spec objects were created.
+Buffers are mapped in both modes, so only the json and the spec objects count.
+The json mode only parses the file, the floor both modes share.
+
+    python benchmarks/lazy_import.py [--nodes 200000] [--directory DIR]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import common
+
+common.addSourcePath()
+
+from gltf.interface import core, gltf
+
+import assets
+
+
+MODES = ['json', 'eager', 'lazy']
+
+ROOT_COUNT = 100
+
+# One node in this many gets a mesh.
+MESH_INTERVAL = 10
+
+# Properties that are created on first access in lazy mode.
+LAZY_PROPERTIES = ['scenes', 'nodes', 'meshes', 'accessors', 'bufferViews']
+
+
+def getCreatedCount(ctx):
+    """Get how many spec objects of the lazy properties exist."""
+    count = 0
+    for name in LAZY_PROPERTIES:
+        items = getattr(ctx, name)
+        count += items.getCreatedCount() if isinstance(items, core.LazyList) else len(items)
+
+    return count
+
+
+def runCase(mode, directory):
+    """Open the asset in this process, read the root names and emit the measurements."""
+    peakBefore = common.getPeakMemory()
+    memoryBefore = common.getCurrentMemory()
+
+    start = time.time()
+    if mode == 'json':
+        with open(os.path.join(directory, 'out.gltf')) as fp:
+            description = json.load(fp)
+        nodes = description['nodes']
+        names = [nodes[i]['name'] for i in description['scenes'][description.get('scene') or 0]['nodes']]
+        createdCount = 0
+    else:
+        ctx = gltf.GLTF.importGLTF(directory, mapped=True, lazy=mode == 'lazy')
+        names = [ctx.nodes[i].name for i in ctx.scenes[ctx.scene or 0].nodes]
+        createdCount = getCreatedCount(ctx)
+    duration = time.time() - start
+
+    memoryAfter = common.getCurrentMemory()
+
+    common.emitResult({
+        'seconds': duration,
+        'peakMemory': common.getPeakMemory() - peakBefore,
+        'memory': memoryAfter - memoryBefore if memoryBefore is not None else None,
+        'rootCount': len(names),
+        'createdCount': createdCount,
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--nodes', type=int, default=200000)
+    parser.add_argument('--directory', help='asset directory to use, a synthetic asset is written when omitted')
+    parser.add_argument('--case', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        runCase(args.case, args.directory)
+        return 0
+
+    directory = args.directory
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix='gltf_lazy')
+        assets.writeAsset(directory, args.nodes, args.nodes // MESH_INTERVAL, rootCount=ROOT_COUNT)
+
+    try:
+        rows = []
+        for mode in MODES:
+            result = common.runIsolated(__file__, ['--case', mode, '--directory', directory])
+            rows.append([
+                mode,
+                result['rootCount'],
+                result['seconds'],
+                common.toMegabytes(result['peakMemory']),
+                common.toMegabytes(result['memory']),
+                result['createdCount'],
+            ])
+    finally:
+        if args.directory is None:
+            shutil.rmtree(directory)
+
+    common.printTable(['mode', 'roots', 'seconds', 'peak MB', 'retained MB', 'objects created'], rows)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""Benchmark dragonfly and gltf.maya tools against the in-memory maya stand-in.
+
+Runs freezeTree, packRotations, getSkeleton, selectChildren and exportSelection
+over synthetic hierarchies of 1k to 100k nodes, counting every Maya API call.
+Each run is checked against maya_tools_baseline.json and fails when a call
+count grows or a scenario gets slower than the baseline allows. Wall times
+depend on the machine, so refresh the baseline with --update on the machine
+that does the comparing.
+
+    python benchmarks/maya_tools.py [--sizes 1000 10000] [--update]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+import common
+
+common.addSourcePath(standin=True)
+
+from maya import standin
+from maya.api import OpenMaya
+
+from dragonfly import joints, transforms
+from dragonfly.tools import design
+from gltf.maya import export, utils
+
+
+BASELINE_PATH = os.path.join(common.BENCHMARK_DIRECTORY, 'maya_tools_baseline.json')
+
+SIZES = [1000, 10000, 100000]
+
+# Nodes per chain, chains hang off random earlier nodes so depth grows with the scene.
+CHAIN_LENGTH = 20
+
+# One node in this many gets a mesh in the export scene.
+MESH_INTERVAL = 10
+
+# One joint in this many is a skin influence.
+INFLUENCE_INTERVAL = 10
+
+# A scenario fails when it takes longer than the baseline times this, plus the slack in seconds.
+TIME_TOLERANCE = 1.5
+TIME_SLACK = 0.05
+
+TOLERANCE = 1e-6
+
+
+def buildHierarchy(count, nodeType='transform', seed=0):
+    """Build a random hierarchy of count nodes with random transformations, straight into a new scene.
+
+    Returns:
+        list: scene nodes, the root first and parents before children.
+    """
+    rng = random.Random(seed)
+    scene = standin.newScene()
+
+    root = scene.createNode(nodeType, 'root')
+    nodes = [root]
+
+    while len(nodes) < count:
+        parent = rng.choice(nodes)
+
+        for _ in range(min(CHAIN_LENGTH, count - len(nodes))):
+            node = scene.createNode(nodeType, None, parent)
+            node.attrs['translate'] = [rng.uniform(-1.0, 1.0) for _ in range(3)]
+            node.attrs['rotate'] = [rng.uniform(-math.pi, math.pi) for _ in range(3)]
+            if nodeType == 'joint':
+                node.attrs['rotateAxis'] = [rng.uniform(-0.5, 0.5) for _ in range(3)]
+                node.attrs['jointOrient'] = [rng.uniform(-math.pi, math.pi) for _ in range(3)]
+                node.attrs['rotateOrder'] = rng.randrange(6)
+            else:
+                node.attrs['scale'] = [rng.uniform(0.5, 2.0)] * 3
+
+            nodes.append(node)
+            parent = node
+
+    return nodes
+
+
+def getWorldPositions(nodes):
+    return [standin.getWorldMatrix(n)[12:15] for n in nodes]
+
+
+def getWorldMatrices(nodes):
+    return [standin.getWorldMatrix(n) for n in nodes]
+
+
+def isClose(a, b, tolerance=TOLERANCE):
+    return all(abs(x - y) <= tolerance * max(1.0, abs(x), abs(y)) for x, y in zip(a, b))
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+class Scenario(object):
+    """Sets up a scene, runs one tool over it, then checks the outcome."""
+    name = None
+
+    def setUp(self, size):
+        raise NotImplementedError
+
+    def run(self):
+        raise NotImplementedError
+
+    def verify(self, result):
+        pass
+
+
+class FreezeTree(Scenario):
+    name = 'freezeTree'
+
+    def setUp(self, size):
+        self.nodes = buildHierarchy(size)
+        self.positions = getWorldPositions(self.nodes)
+        self.parents = [n.parent for n in self.nodes]
+
+    def run(self):
+        transforms.freezeTree(OpenMaya.wrap(self.nodes[0]))
+
+    def verify(self, result):
+        check(all(isClose(n.attrs['scale'], [1.0, 1.0, 1.0]) for n in self.nodes), 'Scales were not frozen.')
+        check([n.parent for n in self.nodes] == self.parents, 'The hierarchy was not restored.')
+        check(all(isClose(a, b) for a, b in zip(getWorldPositions(self.nodes), self.positions)), 'Nodes moved.')
+        check(len(standin.scene.undoQueue) == 1, 'Freezing took more than one undo step.')
+
+
+class PackRotations(Scenario):
+    name = 'packRotations'
+
+    def setUp(self, size):
+        self.nodes = buildHierarchy(size, 'joint')
+        self.matrices = getWorldMatrices(self.nodes)
+
+    def run(self):
+        joints.packRotations([OpenMaya.wrap(n) for n in self.nodes])
+
+    def verify(self, result):
+        check(all(n.attrs['rotate'] == [0.0, 0.0, 0.0] for n in self.nodes), 'Rotations were not packed.')
+        check(all(isClose(a, b) for a, b in zip(getWorldMatrices(self.nodes), self.matrices)), 'Joints moved.')
+        check(len(standin.scene.undoQueue) == 1, 'Packing took more than one undo step.')
+
+
+class GetSkeleton(Scenario):
+    name = 'getSkeleton'
+
+    def setUp(self, size):
+        self.nodes = buildHierarchy(size, 'joint')
+        influences = self.nodes[::INFLUENCE_INTERVAL]
+        random.Random(1).shuffle(influences)
+        self.influences = [OpenMaya.wrap(n) for n in influences]
+
+        expected = set()
+        for n in influences:
+            while n.nodeType == 'joint' and n not in expected:
+                expected.add(n)
+                n = n.parent
+        self.expected = expected
+
+    def run(self):
+        return utils.getSkeleton(self.influences)
+
+    def verify(self, result):
+        nodes = [OpenMaya.unwrap(n) for n in result]
+        check(len(nodes) == len(self.expected) and set(nodes) == self.expected, 'Skeleton does not match.')
+
+        found = set()
+        for n in nodes:
+            check(n.parent.nodeType != 'joint' or n.parent in found, 'A joint came before its parent.')
+            found.add(n)
+
+
+class SelectChildren(Scenario):
+    name = 'selectChildren'
+
+    def setUp(self, size):
+        self.nodes = buildHierarchy(size, 'joint')
+        standin.scene.select([self.nodes[0]])
+
+        # Only the tool method is needed, not a widget.
+        self.widget = design.GeneralToolsWidget.__new__(design.GeneralToolsWidget)
+
+    def run(self):
+        self.widget.selectChildren()
+
+    def verify(self, result):
+        check(set(standin.scene.selection) == set(self.nodes), 'Not every child was selected.')
+
+
+def createCube(parent, offset):
+    points = [(x + offset, y, z) for x in (0.0, 1.0) for y in (0.0, 1.0) for z in (0.0, 1.0)]
+    faces = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+
+    OpenMaya.MFnMesh().create(points, [4] * len(faces), [i for face in faces for i in face], parent=OpenMaya.wrap(parent))
+
+
+class ExportSelection(Scenario):
+    name = 'exportSelection'
+
+    def setUp(self, size):
+        self.nodes = buildHierarchy(size)
+        for index, node in enumerate(self.nodes[::MESH_INTERVAL]):
+            createCube(node, index)
+        standin.scene.select([self.nodes[0]])
+
+        self.outputDirectory = tempfile.mkdtemp(prefix='gltf_export')
+
+    def run(self):
+        export.exportSelection(outputDirectory=self.outputDirectory)
+
+    def verify(self, result):
+        try:
+            with open(os.path.join(self.outputDirectory, 'out.gltf')) as fp:
+                description = json.load(fp)
+        finally:
+            shutil.rmtree(self.outputDirectory)
+
+        check(len(description['nodes']) == len(self.nodes), 'Not every node was exported.')
+        check(len(description['meshes']) == len(self.nodes[::MESH_INTERVAL]), 'Not every mesh was exported.')
+
+        positions = description['accessors'][description['meshes'][0]['primitives'][0]['attributes']['POSITION']]
+        check(
+            (positions['count'], positions['min'], positions['max']) == (8, [0.0] * 3, [1.0] * 3),
+            'The first cube was not exported with its points.')
+
+
+SCENARIOS = [FreezeTree, PackRotations, GetSkeleton, SelectChildren, ExportSelection]
+
+
+def runScenario(scenarioType, size):
+    """Run one scenario at one size.
+
+    Returns:
+        dict: seconds and calls, the count per API call.
+    """
+    scenario = scenarioType()
+    scenario.setUp(size)
+
+    standin.resetCalls()
+    duration, result = common.timeCall(scenario.run)
+    calls = dict(standin.calls)
+
+    scenario.verify(result)
+
+    return {'seconds': duration, 'calls': calls}
+
+
+def compare(name, size, result, baseline):
+    """Get the regressions of a result against its baseline.
+
+    Returns:
+        list: messages, empty when nothing regressed.
+    """
+    messages = []
+
+    for api, count in sorted(result['calls'].items()):
+        expected = baseline['calls'].get(api, 0)
+        if count > expected:
+            messages.append('{0} {1}: {2} calls {3}, up from {4}.'.format(name, size, api, count, expected))
+
+    allowed = baseline['seconds'] * TIME_TOLERANCE + TIME_SLACK
+    if result['seconds'] > allowed:
+        messages.append('{0} {1}: took {2:.3f}s, more than the {3:.3f}s allowed.'.format(
+            name, size, result['seconds'], allowed))
+
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--scenarios', nargs='+', choices=[s.name for s in SCENARIOS])
+    parser.add_argument('--update', action='store_true', help='write the results as the new baseline')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as fp:
+            baseline = json.load(fp)
+
+    results = {}
+    rows = []
+    regressions = []
+
+    for scenarioType in SCENARIOS:
+        if args.scenarios and scenarioType.name not in args.scenarios:
+            continue
+
+        for size in args.sizes:
+            result = runScenario(scenarioType, size)
+            results.setdefault(scenarioType.name, {})[str(size)] = result
+
+            callCount = sum(result['calls'].values())
+            rows.append([scenarioType.name, size, result['seconds'], callCount, callCount / float(size)])
+
+            expected = baseline.get(scenarioType.name, {}).get(str(size))
+            if expected is not None and not args.update:
+                regressions.extend(compare(scenarioType.name, size, result, expected))
+
+    common.printTable(['scenario', 'nodes', 'seconds', 'calls', 'calls/node'], rows)
+
+    if args.update:
+        for name, sizes in results.items():
+            baseline.setdefault(name, {}).update(sizes)
+
+        with open(BASELINE_PATH, 'w') as fp:
+            json.dump(baseline, fp, indent=2, separators=(',', ': '), sort_keys=True)
+            fp.write('\n')
+
+        print('Wrote {0}.'.format(BASELINE_PATH))
+        return 0
+
+    for message in regressions:
+        print(message)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
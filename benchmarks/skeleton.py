@@ -0,0 +1,134 @@
+"""Compare utils.resolveSkeleton with the recursive skeleton walk it replaced.
+
+Builds joint rigs of branches chains, each depth joints long, under one root
+in the in-memory maya stand-in, so rigs range from a few deep chains to many
+shallow ones. Every other joint is a skin influence, so influences share most
+of their ancestors. Both resolvers get the influences in a shuffled order and
+the run reports their wall time and Maya API calls. The old walk is quadratic,
+so it only runs on rigs of up to --naive-limit joints.
+
+    python benchmarks/skeleton.py [--rigs 4x100 100x4 20x20 200x200]
+"""
+import argparse
+import random
+import sys
+
+import common
+
+common.addSourcePath(standin=True)
+
+from maya import standin
+from maya.api import OpenMaya
+
+from gltf.maya import utils
+
+
+# Rigs as depth x branches, face rigs are around 400 joints.
+RIGS = ['4x100', '100x4', '20x20', '50x200', '200x50', '200x200']
+
+# One joint in this many is a skin influence.
+INFLUENCE_INTERVAL = 2
+
+NAIVE_LIMIT = 2000
+
+
+def getNaiveSkeleton(influences):
+    """Resolve a skeleton the way getSkeletonHierarchy did before resolveSkeleton."""
+    nodes = getNaiveAncestors(influences)
+
+    return [i for n, i in enumerate(nodes) if i not in nodes[:n]]
+
+
+def getNaiveAncestors(influences):
+    result = []
+
+    for n in influences:
+        result.append(n)
+
+        for parentMObject in utils.getParents(n):
+            if parentMObject.hasFn(OpenMaya.MFn.kTransform) and parentMObject not in influences:
+                result.extend(getNaiveAncestors([parentMObject]))
+
+    return result
+
+
+def getResolvedSkeleton(influences):
+    return utils.resolveSkeleton(influences)[0]
+
+
+RESOLVERS = [('resolveSkeleton', getResolvedSkeleton), ('naive', getNaiveSkeleton)]
+
+
+def buildRig(depth, branches, seed=0):
+    """Build branches chains of depth joints under a root joint, in a new scene.
+
+    Returns:
+        list: the influences, shuffled, and the set of scene nodes they resolve to.
+    """
+    scene = standin.newScene()
+
+    root = scene.createNode('joint', 'root')
+    joints = [root]
+    for _ in range(branches):
+        parent = root
+        for _ in range(depth):
+            parent = scene.createNode('joint', None, parent)
+            joints.append(parent)
+
+    influences = joints[::INFLUENCE_INTERVAL]
+    random.Random(seed).shuffle(influences)
+
+    expected = set()
+    for n in influences:
+        while n.nodeType == 'joint' and n not in expected:
+            expected.add(n)
+            n = n.parent
+
+    return [OpenMaya.wrap(n) for n in influences], expected
+
+
+def verify(result, expected):
+    nodes = [OpenMaya.unwrap(n) for n in result]
+    if len(nodes) != len(expected) or set(nodes) != expected:
+        raise AssertionError('Skeleton does not match.')
+
+
+def parseRig(value):
+    depth, branches = value.lower().split('x')
+
+    return int(depth), int(branches)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rigs', type=parseRig, nargs='+', default=[parseRig(r) for r in RIGS],
+                        help='rigs as DEPTHxBRANCHES')
+    parser.add_argument('--naive-limit', type=int, default=NAIVE_LIMIT,
+                        help='largest rig, in joints, to run the old walk on')
+    args = parser.parse_args(argv)
+
+    rows = []
+    for depth, branches in args.rigs:
+        influences, expected = buildRig(depth, branches)
+        jointCount = depth * branches + 1
+
+        for name, resolver in RESOLVERS:
+            if resolver is getNaiveSkeleton and jointCount > args.naive_limit:
+                continue
+
+            standin.resetCalls()
+            duration, result = common.timeCall(resolver, influences)
+            callCount = sum(standin.calls.values())
+            verify(result, expected)
+
+            rows.append([
+                '{0}x{1}'.format(depth, branches), jointCount, len(influences), name,
+                duration, callCount, callCount / float(len(influences))])
+
+    common.printTable(['rig', 'joints', 'influences', 'resolver', 'seconds', 'calls', 'calls/influence'], rows)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
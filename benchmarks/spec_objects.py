@@ -0,0 +1,172 @@
+"""Measure the memory and speed of glTF spec objects over a synthetic 100k-node scene.
+
+Builds nodes, accessors and buffer views from a parsed description with
+GLTF.fromDescription, then serializes them with GLTF.toGLTF. The same work is
+repeated with plain __dict__ objects walking the same field lists, the way
+spec objects were stored before they got __slots__. Each representation runs
+in a fresh interpreter so the memory it retains is measured on its own.
+
+    python benchmarks/spec_objects.py [--nodes 100000]
+"""
+import argparse
+import random
+import sys
+
+import common
+
+common.addSourcePath()
+
+from gltf.interface import core, gltf
+
+
+REPRESENTATIONS = ['slots', 'dict']
+
+
+class DictSpecObject(object):
+    """A spec object kept in a __dict__ and serialized the way spec objects were before they got __slots__."""
+    fields = []
+    requiredFields = []
+
+    def __init__(self):
+        for field in self.fields:
+            setattr(self, field, None)
+
+    @property
+    def gltf(self):
+        result = {}
+
+        for field in self.fields:
+            fieldValue = getattr(self, field, None)
+            if fieldValue is not None:
+                result[field] = fieldValue
+
+            if field in self.requiredFields and field is None:
+                raise ValueError('Field is required: {0}'.format(field))
+
+        return result
+
+    @classmethod
+    def fromData(cls, **kwargs):
+        instance = cls()
+        for key, value in kwargs.items():
+            if key in instance.fields:
+                setattr(instance, key, value)
+
+        return instance
+
+
+class DictNode(DictSpecObject):
+
+    @property
+    def gltf(self):
+        if self.matrix is not None and self.matrix == core.IDENTITY_MATRIX:
+            self.matrix = None
+
+        return super(DictNode, self).gltf
+
+
+DICT_TYPES = dict(
+    (name, type(name, (DictNode if name == 'Node' else DictSpecObject,), {
+        'fields': list(getattr(gltf, name).fields), 'requiredFields': list(getattr(gltf, name).requiredFields)}))
+    for name in ('Node', 'Accessor', 'BufferView'))
+
+
+def getDescription(nodeCount, seed=0):
+    """Get a description with a node, an accessor and a buffer view per node."""
+    rng = random.Random(seed)
+
+    nodes = []
+    for index in range(nodeCount):
+        node = {
+            'name': 'node{0}'.format(index),
+            'translation': [rng.uniform(-1.0, 1.0) for _ in range(3)],
+            'rotation': [0.0, 0.0, 0.0, 1.0],
+        }
+        if index and index % 10:
+            node['mesh'] = index
+        nodes.append(node)
+
+    for index in range(1, nodeCount):
+        nodes[rng.randrange(index)].setdefault('children', []).append(index)
+
+    return {
+        'asset': {'version': '2.0'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': nodes,
+        'accessors': [
+            {'bufferView': index, 'componentType': 5126, 'type': 'VEC3', 'count': 4} for index in range(nodeCount)],
+        'bufferViews': [
+            {'buffer': 0, 'byteOffset': index * 48, 'byteLength': 48} for index in range(nodeCount)],
+    }
+
+
+def build(description, representation):
+    """Create the spec objects of a description.
+
+    Returns:
+        object: the GLTF, or a dict of lists of plain objects.
+    """
+    if representation == 'slots':
+        return gltf.GLTF.fromDescription(description)
+
+    return dict(
+        (key, [DICT_TYPES[name].fromData(**data) for data in description[key]])
+        for key, name in (('nodes', 'Node'), ('accessors', 'Accessor'), ('bufferViews', 'BufferView')))
+
+
+def serialize(result, representation):
+    if representation == 'slots':
+        return result.toGLTF()
+
+    return dict((key, [o.gltf for o in objects]) for key, objects in result.items())
+
+
+def runCase(representation, nodeCount):
+    description = getDescription(nodeCount)
+    objectCount = len(description['nodes']) + len(description['accessors']) + len(description['bufferViews'])
+
+    memoryBefore = common.getCurrentMemory()
+    buildTime, result = common.timeCall(build, description, representation)
+    memoryAfter = common.getCurrentMemory()
+
+    serializeTime, document = common.timeCall(serialize, result, representation)
+
+    common.emitResult({
+        'objectCount': objectCount,
+        'buildSeconds': buildTime,
+        'serializeSeconds': serializeTime,
+        'memory': memoryAfter - memoryBefore if memoryBefore is not None else None,
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--nodes', type=int, default=100000)
+    parser.add_argument('--case', choices=REPRESENTATIONS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        runCase(args.case, args.nodes)
+        return 0
+
+    rows = []
+    for representation in REPRESENTATIONS:
+        result = common.runIsolated(__file__, ['--case', representation, '--nodes', args.nodes])
+        memory = result['memory']
+        rows.append([
+            representation,
+            result['objectCount'],
+            result['buildSeconds'],
+            result['serializeSeconds'],
+            common.toMegabytes(memory),
+            memory / float(result['objectCount']) if memory is not None else float('nan'),
+        ])
+
+    common.printTable(['objects', 'count', 'build s', 'serialize s', 'MB', 'bytes/object'], rows)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
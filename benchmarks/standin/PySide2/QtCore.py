@@ -0,0 +1,7 @@
+"""Stand-in for PySide2.QtCore."""
+
+
+class Qt(object):
+    AlignTop = 0x20
+    Window = 0x1
+    Tool = 0xb
@@ -0,0 +1,7 @@
+"""Stand-in for PySide2.QtWidgets, enough to define widget classes and call their methods without a UI."""
+
+
+class QWidget(object):
+
+    def __init__(self, parent=None):
+        pass
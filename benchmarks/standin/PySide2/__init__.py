@@ -0,0 +1 @@
+"""Stand-in for the PySide2 classes dragonfly derives from, widgets are never shown."""
@@ -0,0 +1,41 @@
+"""Stand-in for the parts of the Maya API 1.0, maya.OpenMaya, used by gltf.maya.
+
+Only raw mesh point access and the plug edits around it are modelled. Objects
+wrap the same scene nodes as maya.api.OpenMaya, and return values that the API
+1.0 hands back through arguments are filled in the same way.
+"""
+from maya import standin
+from maya.api import OpenMaya as OpenMaya2
+
+
+MObject = OpenMaya2.MObject
+MPlug = OpenMaya2.MPlug
+MFnDependencyNode = OpenMaya2.MFnDependencyNode
+
+
+class MSelectionList(OpenMaya2.MSelectionList):
+
+    def getDependNode(self, index, mObject):
+        mObject._node = self._nodes[index]
+
+
+class RawPoints(object):
+    """The float pointer MFnMesh.getRawPoints returns, int() gives its address like a SWIG pointer."""
+
+    def __init__(self, points):
+        self._points = points
+
+    def __int__(self):
+        return self._points.buffer_info()[0]
+
+    __long__ = __int__
+
+
+class MFnMesh(OpenMaya2.MFnMesh):
+
+    def getRawPoints(self):
+        return RawPoints(self._getGeometry().points)
+
+
+class MDGModifier(OpenMaya2.MDGModifier):
+    pass
@@ -0,0 +1,8 @@
+"""Stand-in for maya.OpenMayaUI, there is no main window to reach."""
+
+
+class MQtUtil(object):
+
+    @staticmethod
+    def mainWindow():
+        raise RuntimeError('The stand-in has no main window.')
@@ -0,0 +1 @@
+"""In-memory stand-in for the maya package, see maya.standin."""
@@ -0,0 +1,869 @@
+"""Stand-in for the parts of maya.api.OpenMaya used by dragonfly and gltf.maya.
+
+Calls are counted in maya.standin.calls. Data passed to and from the API is
+held in plain lists, so objects that Maya would copy are shared instead.
+"""
+import array
+import imp
+import math
+import os
+
+from maya import standin
+from maya.standin import RecordedObject, RecordedType
+
+
+# Base class of the recorded API arrays.
+RecordedList = RecordedType('RecordedList', (list,), {})
+
+
+class MFn(object):
+    kInvalid = standin.kInvalid
+    kBase = standin.kBase
+    kDependencyNode = standin.kDependencyNode
+    kDagNode = standin.kDagNode
+    kTransform = standin.kTransform
+    kJoint = standin.kJoint
+    kWorld = standin.kWorld
+    kMesh = standin.kMesh
+    kSkinClusterFilter = standin.kSkinClusterFilter
+    kData = standin.kData
+    kMeshData = standin.kMeshData
+    kMatrixData = standin.kMatrixData
+    kSet = standin.kSet
+    kShadingEngine = standin.kShadingEngine
+
+
+class MSpace(object):
+    kInvalid = 0
+    kTransform = 1
+    kPreTransform = 2
+    kPostTransform = 3
+    kWorld = 4
+    kObject = kPreTransform
+
+
+def wrap(node):
+    """Get an MObject for a scene node without counting a construction."""
+    result = MObject.__new__(MObject)
+    result._node = node
+
+    return result
+
+
+def create(cls, *args):
+    """Make an API object for the caller without counting a construction, as the API does internally."""
+    result = cls.__new__(cls)
+    result.__init__(*args)
+
+    return result
+
+
+def unwrap(mObject):
+    """Get the scene node of an MObject or MDagPath, None for null objects."""
+    if isinstance(mObject, MDagPath):
+        return mObject._node
+
+    if mObject is None:
+        return
+
+    return mObject._node
+
+
+class MObject(RecordedObject):
+
+    def __init__(self, other=None):
+        self._node = other._node if other is not None else None
+
+    def __eq__(self, other):
+        return isinstance(other, MObject) and self._node is other._node
+
+    def __ne__(self, other):
+        return not self == other
+
+    # MObjects cannot be hashed in Maya either.
+    __hash__ = None
+
+    def hasFn(self, fnType):
+        return self._node is not None and fnType in self._node.fnTypes
+
+    def isNull(self):
+        return self._node is None
+
+    def apiType(self):
+        if self._node is None:
+            return MFn.kInvalid
+
+        return max(self._node.fnTypes)
+
+
+MObject.kNullObj = wrap(None)
+
+
+class MObjectHandle(RecordedObject):
+
+    def __init__(self, mObject=None):
+        self._node = unwrap(mObject)
+
+    def __eq__(self, other):
+        return isinstance(other, MObjectHandle) and self._node is other._node
+
+    def __ne__(self, other):
+        return not self == other
+
+    def hashCode(self):
+        # Like Maya's, hash codes come from the address and are not unique.
+        return (id(self._node) >> 4) & 0xFFFFF
+
+    def isValid(self):
+        return self._node is not None and self._node.alive
+
+    def isAlive(self):
+        return self.isValid()
+
+    def object(self):
+        return wrap(self._node)
+
+
+class MVector(RecordedObject):
+
+    def __init__(self, *args):
+        if len(args) == 1:
+            args = tuple(args[0])[:3]
+
+        self.x, self.y, self.z = [float(v) for v in args] if args else (0.0, 0.0, 0.0)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __len__(self):
+        return 3
+
+    def __sub__(self, other):
+        return create(MVector, self.x - other[0], self.y - other[1], self.z - other[2])
+
+
+MVector.kZeroVector = MVector()
+
+
+class MPoint(MVector):
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z, 1.0))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z, 1.0)[index]
+
+    def __len__(self):
+        return 4
+
+
+class MFloatPoint(MPoint):
+    pass
+
+
+class MFloatPointArray(RecordedList):
+
+    def __init__(self, *args):
+        """Take a sequence of points, or a size and the point to fill with."""
+        points = args[0] if args else ()
+        if len(args) == 2:
+            points = [args[1]] * args[0]
+
+        super(MFloatPointArray, self).__init__(tuple(float(c) for c in point[:3]) + (1.0,) for point in points)
+
+
+class MPointArray(list):
+    pass
+
+
+class MIntArray(RecordedList):
+
+    def __init__(self, values=()):
+        super(MIntArray, self).__init__(int(v) for v in values)
+
+
+class MMatrix(RecordedObject):
+
+    def __init__(self, values=None):
+        if values is None:
+            values = standin.IDENTITY
+        elif isinstance(values, MMatrix):
+            values = values._values
+        else:
+            values = list(values)
+            if len(values) == 4:
+                values = [c for row in values for c in row]
+
+        self._values = [float(v) for v in values]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return 16
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __mul__(self, other):
+        return fromValues(standin.multiply(self._values, other._values))
+
+    def getElement(self, row, column):
+        return self._values[row * 4 + column]
+
+    def inverse(self):
+        return fromValues(standin.inverse(self._values))
+
+    def transpose(self):
+        return fromValues(standin.transpose(self._values))
+
+
+MMatrix.kIdentity = MMatrix()
+
+
+def fromValues(values):
+    """Get an MMatrix for flat values without counting a construction."""
+    result = MMatrix.__new__(MMatrix)
+    result._values = values
+
+    return result
+
+
+class MEulerRotation(RecordedObject):
+    kXYZ, kYZX, kZXY, kXZY, kYXZ, kZYX = range(6)
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, order=0):
+        if isinstance(x, (list, tuple, MVector)):
+            x, y, z = x[0], x[1], x[2]
+
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+        self.order = order
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def asMatrix(self):
+        return fromValues(standin.eulerToMatrix([self.x, self.y, self.z], self.order))
+
+
+class MQuaternion(RecordedObject):
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        self.x, self.y, self.z, self.w = float(x), float(y), float(z), float(w)
+
+    def asMatrix(self):
+        x, y, z, w = self.x, self.y, self.z, self.w
+
+        # The transpose of the column vector rotation matrix, for row vectors.
+        return fromValues([
+            1 - 2 * (y * y + z * z), 2 * (x * y + z * w), 2 * (x * z - y * w), 0.0,
+            2 * (x * y - z * w), 1 - 2 * (x * x + z * z), 2 * (y * z + x * w), 0.0,
+            2 * (x * z + y * w), 2 * (y * z - x * w), 1 - 2 * (x * x + y * y), 0.0,
+            0.0, 0.0, 0.0, 1.0])
+
+    def asEulerRotation(self):
+        return create(MEulerRotation, *standin.matrixToEuler(self.asMatrix()._values))
+
+
+class MTransformationMatrix(RecordedObject):
+
+    def __init__(self, matrix=None):
+        self._values = list(matrix) if matrix is not None else list(standin.IDENTITY)
+
+    def asMatrix(self):
+        return fromValues(list(self._values))
+
+    def translation(self, space):
+        return create(MVector, self._values[12:15])
+
+    def rotation(self, asQuaternion=False):
+        return create(MEulerRotation, *standin.matrixToEuler(standin.getRotation(self._values)))
+
+    def scale(self, space):
+        return standin.getScale(self._values)
+
+
+class MAngle(RecordedObject):
+    kInvalid, kRadians, kDegrees = range(3)
+
+    def __init__(self, value=0.0, unit=1):
+        self._radians = math.radians(value) if unit == MAngle.kDegrees else float(value)
+
+    def asRadians(self):
+        return self._radians
+
+    def asDegrees(self):
+        return math.degrees(self._radians)
+
+
+class MPlug(RecordedObject):
+
+    def __init__(self, node=None, path=None):
+        self._node = node
+        self._path = path
+
+    def _getValue(self):
+        return self._node.getValue(self._path)
+
+    def name(self):
+        attr, index = self._path
+        if index is None:
+            return '{0}.{1}'.format(self._node.name, attr)
+
+        if attr in standin.ARRAY_ATTRS:
+            return '{0}.{1}[{2}]'.format(self._node.name, attr, index)
+
+        return '{0}.{1}{2}'.format(self._node.name, attr, standin.AXES[index])
+
+    def node(self):
+        return wrap(self._node)
+
+    def child(self, index):
+        attr, childIndex = self._path
+        if childIndex is not None or not isinstance(self._node.attrs.get(attr), list):
+            raise RuntimeError('{0} is not a compound plug.'.format(self.name()))
+
+        return create(MPlug, self._node, (attr, index))
+
+    def elementByLogicalIndex(self, index):
+        attr, childIndex = self._path
+        if childIndex is not None or attr not in standin.ARRAY_ATTRS:
+            raise RuntimeError('{0} is not an array plug.'.format(self.name()))
+
+        return create(MPlug, self._node, (attr, index))
+
+    def getExistingArrayAttributeIndices(self):
+        attr = self._path[0]
+        return sorted(index for a, index in self._node.inputs if a == attr and index is not None)
+
+    def numChildren(self):
+        value = self._node.attrs.get(self._path[0])
+        return len(value) if self._path[1] is None and isinstance(value, list) else 0
+
+    def asDouble(self):
+        return float(self._getValue())
+
+    def asFloat(self):
+        return float(self._getValue())
+
+    def asInt(self):
+        return int(self._getValue())
+
+    def asBool(self):
+        return bool(self._getValue())
+
+    def asMAngle(self):
+        return create(MAngle, self._getValue())
+
+    def asMObject(self):
+        value = self._getValue()
+        if self._path[0] == 'matrix':
+            data = standin.Node('matrixData')
+            data.data = value
+            return wrap(data)
+
+        return wrap(value)
+
+    @property
+    def isDestination(self):
+        standin.calls['MPlug.isDestination'] += 1
+        return self._path in self._node.inputs
+
+    def source(self):
+        source = self._node.inputs.get(self._path)
+        if source is None:
+            return create(MPlug)
+
+        return create(MPlug, *source)
+
+    def isNull(self):
+        return self._node is None
+
+
+class MDagPath(RecordedObject):
+
+    def __init__(self, other=None):
+        self._node = other._node if other is not None else None
+
+    @staticmethod
+    def getAPathTo(mObject):
+        return toDagPath(unwrap(mObject))
+
+    def node(self):
+        return wrap(self._node)
+
+    def transform(self):
+        node = self._node
+        if node.nodeType in standin.SHAPE_TYPES:
+            node = node.parent
+
+        return wrap(node)
+
+    def fullPathName(self):
+        return standin.getPath(self._node)
+
+    def partialPathName(self):
+        return self._node.name
+
+    def length(self):
+        return self._node.getDepth() + 1
+
+    def inclusiveMatrix(self):
+        return fromValues(standin.getWorldMatrix(self._node))
+
+    def exclusiveMatrix(self):
+        return fromValues(standin.getWorldMatrix(self._node.parent))
+
+    def inclusiveMatrixInverse(self):
+        return fromValues(standin.inverse(standin.getWorldMatrix(self._node)))
+
+    def exclusiveMatrixInverse(self):
+        return fromValues(standin.inverse(standin.getWorldMatrix(self._node.parent)))
+
+    def hasFn(self, fnType):
+        return fnType in self._node.fnTypes
+
+    def apiType(self):
+        return max(self._node.fnTypes)
+
+
+def toDagPath(node):
+    """Get an MDagPath for a scene node without counting a construction."""
+    if node is None or not node.isDag:
+        raise RuntimeError('(kInvalidParameter): Object is not a DAG node.')
+
+    result = MDagPath.__new__(MDagPath)
+    result._node = node
+
+    return result
+
+
+class MFnBase(RecordedObject):
+
+    def __init__(self, mObject=None):
+        self._node = unwrap(mObject)
+
+    def setObject(self, mObject):
+        self._node = unwrap(mObject)
+
+    def object(self):
+        return wrap(self._node)
+
+    def hasObj(self, mObject):
+        return unwrap(mObject) is not None
+
+
+class MFnDependencyNode(MFnBase):
+
+    def name(self):
+        return self._node.name
+
+    def typeName(self):
+        return self._node.nodeType
+
+    def hasAttribute(self, attr):
+        return standin.getAttrPath(self._node.nodeType, attr) is not None
+
+    def findPlug(self, attr, wantNetworkedPlug):
+        path = standin.getAttrPath(self._node.nodeType, attr)
+        if path is None:
+            raise RuntimeError('(kInvalidParameter): Cannot find plug {0} on {1}.'.format(attr, self._node.name))
+
+        return create(MPlug, self._node, path)
+
+
+class MFnDagNode(MFnDependencyNode):
+
+    def parentCount(self):
+        return 1 if self._node.parent is not None else 0
+
+    def parent(self, index):
+        if index != 0 or self._node.parent is None:
+            raise IndexError('Parent index out of range.')
+
+        return wrap(self._node.parent)
+
+    def childCount(self):
+        return len(self._node.children)
+
+    def child(self, index):
+        return wrap(self._node.children[index])
+
+    def hasParent(self, mObject):
+        return self._node.parent is unwrap(mObject)
+
+    def hasChild(self, mObject):
+        return unwrap(mObject) in self._node.children
+
+    def fullPathName(self):
+        return standin.getPath(self._node)
+
+    def partialPathName(self):
+        return self._node.name
+
+    def getPath(self):
+        return toDagPath(self._node)
+
+    def dagPath(self):
+        return toDagPath(self._node)
+
+
+class MFnMatrixData(MFnBase):
+
+    def matrix(self):
+        return fromValues(list(self._node.data))
+
+    def create(self, matrix=None):
+        self._node = standin.Node('matrixData')
+        self._node.data = list(matrix) if matrix is not None else list(standin.IDENTITY)
+
+        return wrap(self._node)
+
+
+class MFnMeshData(MFnBase):
+
+    def create(self):
+        self._node = standin.Node('meshData')
+
+        return wrap(self._node)
+
+
+class Geometry(object):
+    """Points, polygon counts and vertex ids of a mesh.
+
+    Points are packed x, y, z floats, like the raw points of a Maya mesh.
+    """
+    __slots__ = ['points', 'polygonCounts', 'polygonConnects']
+
+    def __init__(self, points, polygonCounts, polygonConnects):
+        self.points = points
+        self.polygonCounts = polygonCounts
+        self.polygonConnects = polygonConnects
+
+
+class MFnMesh(MFnDagNode):
+
+    def _getGeometry(self):
+        node = self._node
+        if node.nodeType == 'mesh':
+            node = node.getValue(('inMesh', None))
+
+        if node is None or node.data is None:
+            raise RuntimeError('(kInvalidParameter): Mesh has no geometry.')
+
+        return node.data
+
+    def create(self, vertices, polygonCounts, polygonConnects, uValues=None, vValues=None, parent=None):
+        """Build a mesh into mesh data, or as a new shape under a transform.
+
+        Shapes made this way are not undoable, as in Maya.
+        """
+        geometry = Geometry(
+            array.array('f', (c for p in vertices for c in p[:3])),
+            [int(c) for c in polygonCounts], [int(i) for i in polygonConnects])
+        if sum(geometry.polygonCounts) != len(geometry.polygonConnects):
+            raise RuntimeError('(kInvalidParameter): Polygon counts do not match the vertex ids.')
+
+        parentNode = unwrap(parent)
+        if parentNode is not None and parentNode.nodeType == 'meshData':
+            parentNode.data = geometry
+            self._node = parentNode
+            return wrap(parentNode)
+
+        if parentNode is None:
+            parentNode = standin.scene.createNode('transform', 'polySurface')
+
+        data = standin.Node('meshData')
+        data.data = geometry
+
+        self._node = standin.scene.createNode('mesh', parentNode.name + 'Shape', parentNode)
+        self._node.attrs['inMesh'] = data
+
+        return wrap(parentNode)
+
+    def numVertices(self):
+        return len(self._getGeometry().points) // 3
+
+    def numPolygons(self):
+        return len(self._getGeometry().polygonCounts)
+
+    def getPoints(self, space=MSpace.kObject):
+        points = self._getGeometry().points
+        return MPointArray(create(MPoint, points[i:i + 3]) for i in range(0, len(points), 3))
+
+    def getVertices(self):
+        geometry = self._getGeometry()
+        return create(MIntArray, geometry.polygonCounts), create(MIntArray, geometry.polygonConnects)
+
+    def getTriangles(self):
+        """Fan triangulate every polygon."""
+        geometry = self._getGeometry()
+        triangleCounts = []
+        vertexIds = []
+
+        offset = 0
+        for count in geometry.polygonCounts:
+            polygon = geometry.polygonConnects[offset:offset + count]
+            offset += count
+
+            triangleCounts.append(max(0, count - 2))
+            for i in range(1, count - 1):
+                vertexIds.extend((polygon[0], polygon[i], polygon[i + 1]))
+
+        return create(MIntArray, triangleCounts), create(MIntArray, vertexIds)
+
+
+class MSelectionList(RecordedObject):
+
+    def __init__(self, other=None):
+        self._nodes = list(other._nodes) if other is not None else []
+        self._members = set(self._nodes)
+
+    def _add(self, node):
+        if node not in self._members:
+            self._members.add(node)
+            self._nodes.append(node)
+
+    def add(self, item, mergeWithExisting=True):
+        if isinstance(item, basestring):
+            node = standin.scene.lookup(item)
+        else:
+            node = unwrap(item)
+
+        self._add(node)
+
+        return self
+
+    def length(self):
+        return len(self._nodes)
+
+    def isEmpty(self):
+        return not self._nodes
+
+    def clear(self):
+        self._nodes = []
+        self._members = set()
+
+    def getDependNode(self, index):
+        return wrap(self._nodes[index])
+
+    def getDagPath(self, index):
+        return toDagPath(self._nodes[index])
+
+    def getSelectionStrings(self, index=None):
+        nodes = self._nodes if index is None else [self._nodes[index]]
+        return [n.name for n in nodes]
+
+
+def toSelectionList(nodes):
+    result = MSelectionList.__new__(MSelectionList)
+    result._nodes = list(nodes)
+    result._members = set(result._nodes)
+
+    return result
+
+
+class MGlobal(RecordedObject):
+    kReplaceList, kXORWithList, kAddToList, kRemoveFromList, kAddToHeadOfList = range(5)
+
+    @staticmethod
+    def getActiveSelectionList(orderedSelectionIfAvailable=False):
+        return toSelectionList(standin.scene.selection)
+
+    @staticmethod
+    def setActiveSelectionList(selectionList, listAdjustment=0):
+        MGlobal._adjust(selectionList._nodes, listAdjustment)
+
+    @staticmethod
+    def selectByName(name, listAdjustment=0):
+        MGlobal._adjust([standin.scene.lookup(name)], listAdjustment)
+
+    @staticmethod
+    def clearSelectionList():
+        standin.scene.select([])
+
+    @staticmethod
+    def _adjust(nodes, listAdjustment):
+        selection = standin.scene.selection
+        if listAdjustment == MGlobal.kReplaceList:
+            standin.scene.select(nodes)
+        elif listAdjustment == MGlobal.kAddToList:
+            standin.scene.select(nodes, add=True)
+        elif listAdjustment == MGlobal.kRemoveFromList:
+            for node in nodes:
+                selection.pop(node, None)
+        else:
+            raise NotImplementedError('Selection adjustment {0} is not supported.'.format(listAdjustment))
+
+    @staticmethod
+    def executeCommandOnIdle(command, displayEnabled=False):
+        raise NotImplementedError('MEL is not supported.')
+
+
+class MDGModifier(RecordedObject):
+    """Queues edits as closures, doIt runs the new ones and undoIt reverts all that ran."""
+
+    def __init__(self):
+        self._operations = []
+        self._done = 0
+        self._undos = []
+
+    def _queue(self, operation):
+        self._operations.append(operation)
+
+    def createNode(self, nodeType):
+        node = standin.Node(nodeType)
+        self._queue(lambda: standin.scene.addNode(node))
+
+        return wrap(node)
+
+    def renameNode(self, mObject, name):
+        node = unwrap(mObject)
+        self._queue(lambda: standin.scene.rename(node, name))
+
+    def newPlugValue(self, plug, value):
+        data = unwrap(value)
+        self._queue(lambda: standin.scene.setValue(plug._node, plug._path, data))
+
+    def newPlugValueDouble(self, plug, value):
+        value = float(value)
+        self._queue(lambda: standin.scene.setValue(plug._node, plug._path, value))
+
+    def newPlugValueFloat(self, plug, value):
+        value = float(value)
+        self._queue(lambda: standin.scene.setValue(plug._node, plug._path, value))
+
+    def newPlugValueInt(self, plug, value):
+        value = int(value)
+        self._queue(lambda: standin.scene.setValue(plug._node, plug._path, value))
+
+    def newPlugValueBool(self, plug, value):
+        value = bool(value)
+        self._queue(lambda: standin.scene.setValue(plug._node, plug._path, value))
+
+    def newPlugValueMAngle(self, plug, angle):
+        value = angle.asRadians()
+        self._queue(lambda: standin.scene.setValue(plug._node, plug._path, value))
+
+    def connect(self, sourcePlug, destinationPlug):
+        self._queue(lambda: standin.scene.connect(
+            sourcePlug._node, sourcePlug._path, destinationPlug._node, destinationPlug._path))
+
+    def disconnect(self, sourcePlug, destinationPlug):
+        self._queue(lambda: standin.scene.disconnect(destinationPlug._node, destinationPlug._path))
+
+    def doIt(self):
+        undos = standin.scene.capture()
+        try:
+            for operation in self._operations[self._done:]:
+                operation()
+        finally:
+            standin.scene.release()
+            self._undos.extend(undos)
+        self._done = len(self._operations)
+
+    def undoIt(self):
+        standin.runUndos(self._undos)
+        self._undos = []
+        self._done = 0
+
+
+class MDagModifier(MDGModifier):
+
+    def createNode(self, nodeType, parent=MObject.kNullObj):
+        node = standin.Node(nodeType)
+        parentNode = unwrap(parent)
+
+        if node.nodeType in standin.SHAPE_TYPES and parentNode is None:
+            # Shapes always get a transform, as in Maya.
+            parentNode = standin.Node('transform')
+            self._queue(lambda: standin.scene.addNode(parentNode))
+
+        self._queue(lambda: standin.scene.addNode(node, parentNode))
+
+        return wrap(node)
+
+    def reparentNode(self, mObject, newParent=MObject.kNullObj):
+        node = unwrap(mObject)
+        parentNode = unwrap(newParent)
+        self._queue(lambda: standin.scene.reparent(node, parentNode))
+
+
+class MPxCommand(object):
+    """Base of plugin commands, not undoable unless isUndoable says so."""
+
+    def __init__(self):
+        pass
+
+    def doIt(self, args):
+        pass
+
+    def undoIt(self):
+        pass
+
+    def redoIt(self):
+        pass
+
+    def isUndoable(self):
+        return False
+
+
+class MFnPlugin(RecordedObject):
+    """Registers plugin commands as functions of maya.cmds."""
+
+    def __init__(self, plugin=None, vendor='', version='', apiVersion='Any'):
+        self._plugin = plugin
+
+    def registerCommand(self, name, creator, createSyntax=None):
+        from maya import cmds
+
+        def command(*args, **kwargs):
+            standin.calls['cmds.' + name] += 1
+
+            instance = creator()
+            instance.doIt(args)
+            if instance.isUndoable():
+                standin.scene.pushUndo(instance.undoIt)
+
+        setattr(cmds, name, command)
+        self._plugin.commands.append(name)
+
+    def deregisterCommand(self, name):
+        from maya import cmds
+
+        delattr(cmds, name)
+        self._plugin.commands.remove(name)
+
+
+class Plugin(object):
+    """A loaded plugin module and the commands it registered."""
+
+    def __init__(self, path):
+        self.path = path
+        self.commands = []
+        self.module = imp.load_source('standinPlugin{0}'.format(len(plugins)), path)
+
+
+# Loaded plugins by normalized path.
+plugins = {}
+
+
+def loadPlugin(path):
+    key = os.path.normcase(os.path.abspath(path))
+    if key in plugins:
+        return
+
+    plugin = plugins[key] = Plugin(path)
+    plugin.module.initializePlugin(plugin)
+
+
+def isPluginLoaded(path):
+    return os.path.normcase(os.path.abspath(path)) in plugins
@@ -0,0 +1,10 @@
+"""Stand-in for the parts of maya.api.OpenMayaAnim used by gltf.maya."""
+from maya import standin
+from maya.api import OpenMaya
+
+
+class MFnSkinCluster(OpenMaya.MFnDependencyNode):
+    """Skin clusters hold their influence nodes as data."""
+
+    def influenceObjects(self):
+        return [OpenMaya.toDagPath(n) for n in self._node.data or []]
@@ -0,0 +1 @@
+"""Stand-in for maya.api.OpenMayaUI, there is no UI to reach."""
@@ -0,0 +1,169 @@
+"""Stand-in for the maya.cmds commands used by dragonfly and gltf.maya.
+
+Each command that edits the scene is one undo step, or part of the open
+undo chunk. Commands registered by plugins are added to this module.
+"""
+import contextlib
+import functools
+
+from maya import standin
+from maya.api import OpenMaya
+
+
+def command(func):
+    """Count calls to a command under cmds.<name>."""
+    return standin.recorded('cmds.' + func.__name__)(func)
+
+
+@contextlib.contextmanager
+def undoable():
+    """Put the edits made in the block on the undo queue as one step."""
+    undos = standin.scene.capture()
+    try:
+        yield
+    finally:
+        standin.scene.release()
+        if undos:
+            standin.scene.pushUndo(functools.partial(standin.runUndos, undos))
+
+
+def getNodes(names):
+    return [standin.scene.lookup(n) for n in names]
+
+
+@command
+def objExists(name):
+    return name.rsplit('|', 1)[-1] in standin.scene.names
+
+
+@command
+def createNode(nodeType, name=None, parent=None, n=None, p=None):
+    name = name or n
+    parent = parent or p
+
+    with undoable():
+        node = standin.scene.createNode(nodeType, name, standin.scene.lookup(parent) if parent else None)
+
+    return node.name
+
+
+@command
+def rename(name, newName):
+    with undoable():
+        return standin.scene.rename(standin.scene.lookup(name), newName)
+
+
+@command
+def parent(*names, **kwargs):
+    """Parent nodes under the last one, or to the world, keeping their world transformation unless relative is set.
+
+    Returns:
+        list: the names of the parented nodes.
+    """
+    world = kwargs.get('world', kwargs.get('w', False))
+    relative = kwargs.get('relative', kwargs.get('r', False))
+
+    nodes = getNodes(names)
+    if world:
+        parentNode = None
+    else:
+        if len(nodes) < 2:
+            raise RuntimeError('parent: Not enough objects or values.')
+        parentNode = nodes.pop()
+
+    with undoable():
+        for node in nodes:
+            if node.parent is (parentNode or standin.scene.world):
+                raise RuntimeError('Object {0} is already a child of the given parent.'.format(node.name))
+            standin.scene.reparent(node, parentNode, keepWorld=not relative)
+
+    return [n.name for n in nodes]
+
+
+@command
+def makeIdentity(*names, **kwargs):
+    """Freeze the scale of transforms into their child transforms' translation.
+
+    Only apply with scale is modelled, shapes keep their points.
+    """
+    if not kwargs.get('apply', kwargs.get('a', False)):
+        raise NotImplementedError('makeIdentity is only supported with apply.')
+    if kwargs.get('t') or kwargs.get('translate') or kwargs.get('r') or kwargs.get('rotate'):
+        raise NotImplementedError('makeIdentity only supports freezing scale.')
+    if not kwargs.get('s', kwargs.get('scale', True)):
+        return
+
+    scene = standin.scene
+    with undoable():
+        for node in getNodes(names):
+            if node.nodeType not in ('transform', 'joint'):
+                continue
+
+            scale = node.attrs['scale']
+            for child in node.children:
+                if child.nodeType in ('transform', 'joint'):
+                    translate = child.attrs['translate']
+                    scene.setValue(child, ('translate', None), [t * s for t, s in zip(translate, scale)])
+            scene.setValue(node, ('scale', None), [1.0, 1.0, 1.0])
+
+
+@command
+def select(*names, **kwargs):
+    add = kwargs.get('add', kwargs.get('af', False))
+    if kwargs.get('clear', kwargs.get('cl', False)):
+        standin.scene.select([])
+        return
+
+    standin.scene.select(getNodes(names), add=add)
+
+
+@command
+def ls(*names, **kwargs):
+    if kwargs.get('selection', kwargs.get('sl', False)):
+        nodes = list(standin.scene.selection)
+    elif names:
+        nodes = getNodes(names)
+    else:
+        nodes = list(standin.scene.names.values())
+
+    if kwargs.get('long', kwargs.get('l', False)):
+        return [standin.getPath(n) if n.isDag else n.name for n in nodes]
+
+    return [n.name for n in nodes]
+
+
+@command
+def undoInfo(**kwargs):
+    if kwargs.get('openChunk', kwargs.get('ock', False)):
+        standin.scene.openChunk()
+    elif kwargs.get('closeChunk', kwargs.get('cck', False)):
+        standin.scene.closeChunk()
+    elif kwargs.get('query', kwargs.get('q', False)):
+        return True
+
+
+@command
+def undo():
+    standin.scene.undo()
+
+
+@command
+def pluginInfo(path, query=False, loaded=False, q=False, l=False):
+    return OpenMaya.isPluginLoaded(path)
+
+
+@command
+def loadPlugin(path, quiet=False, qt=False):
+    OpenMaya.loadPlugin(path)
+
+
+@command
+def file(*args, **kwargs):
+    if kwargs.get('new', kwargs.get('n', False)):
+        standin.newScene()
+        return
+
+    if kwargs.get('query', kwargs.get('q', False)) and kwargs.get('sceneName', kwargs.get('sn', False)):
+        return standin.scene.sceneName
+
+    raise NotImplementedError('Only new and scene name queries are supported.')
@@ -0,0 +1,608 @@
+"""In-memory scene behind the maya stand-in modules.
+
+Only what dragonfly and gltf.maya touch is modelled: a DAG of transforms,
+joints and mesh shapes, their transform channels and connections, world
+matrices, the selection, initialShadingGroup membership, and an undo queue. Node names are unique across the
+scene, geometry is stored but never deformed, and pivots, shear and
+inverseScale compensation are ignored.
+
+Every call into the stand-in API is counted in calls, keyed by the Maya name
+of the call, e.g. 'MFnDagNode.parent' or 'cmds.parent'.
+"""
+import collections
+import functools
+import math
+import types
+
+
+calls = collections.Counter()
+
+
+def resetCalls():
+    calls.clear()
+
+
+def recorded(name):
+    """Count the calls to a function under name."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RecordedType(type):
+    """Counts the calls to the public methods and the constructor of a class.
+
+    Calls are keyed 'Class.method', constructions by the class name alone.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        for key, value in list(namespace.items()):
+            if key.startswith('_'):
+                continue
+
+            label = '{0}.{1}'.format(name, key)
+
+            if isinstance(value, staticmethod):
+                namespace[key] = staticmethod(recorded(label)(value.__func__))
+            elif isinstance(value, classmethod):
+                namespace[key] = classmethod(recorded(label)(value.__func__))
+            elif isinstance(value, types.FunctionType):
+                namespace[key] = recorded(label)(value)
+
+        return super(RecordedType, mcs).__new__(mcs, name, bases, namespace)
+
+    def __call__(cls, *args, **kwargs):
+        calls[cls.__name__] += 1
+
+        return super(RecordedType, cls).__call__(*args, **kwargs)
+
+
+# Base class of the recorded API classes, declared this way to work with either metaclass syntax.
+RecordedObject = RecordedType('RecordedObject', (object,), {})
+
+
+# Function set types, as in OpenMaya.MFn.
+kInvalid = 0
+kBase = 1
+kDependencyNode = 4
+kDagNode = 107
+kTransform = 110
+kJoint = 121
+kWorld = 248
+kMesh = 296
+kSkinClusterFilter = 682
+kData = 1000
+kMeshData = 590
+kMatrixData = 576
+kSet = 464
+kShadingEngine = 320
+
+FN_TYPES = {
+    'world': (kBase, kDependencyNode, kDagNode, kWorld),
+    'transform': (kBase, kDependencyNode, kDagNode, kTransform),
+    'joint': (kBase, kDependencyNode, kDagNode, kTransform, kJoint),
+    'mesh': (kBase, kDependencyNode, kDagNode, kMesh),
+    'skinCluster': (kBase, kDependencyNode, kSkinClusterFilter),
+    'multiplyDivide': (kBase, kDependencyNode),
+    'network': (kBase, kDependencyNode),
+    'shadingEngine': (kBase, kDependencyNode, kSet, kShadingEngine),
+    'meshData': (kBase, kData, kMeshData),
+    'matrixData': (kBase, kData, kMatrixData),
+}
+
+DAG_TYPES = set(['world', 'transform', 'joint', 'mesh'])
+
+SHAPE_TYPES = set(['mesh'])
+
+# Default attribute values per node type, vectors are compound attributes with X, Y and Z children.
+TRANSFORM_ATTRS = {
+    'visibility': True,
+    'translate': [0.0, 0.0, 0.0],
+    'rotate': [0.0, 0.0, 0.0],
+    'rotateAxis': [0.0, 0.0, 0.0],
+    'scale': [1.0, 1.0, 1.0],
+    'rotateOrder': 0,
+    'inheritsTransform': True,
+    'intermediateObject': False,
+}
+
+JOINT_ATTRS = dict(TRANSFORM_ATTRS, **{
+    'jointOrient': [0.0, 0.0, 0.0],
+    'inverseScale': [1.0, 1.0, 1.0],
+    'segmentScaleCompensate': True,
+})
+
+NODE_ATTRS = {
+    'transform': TRANSFORM_ATTRS,
+    'joint': JOINT_ATTRS,
+    'mesh': {'visibility': True, 'intermediateObject': False, 'inMesh': None, 'instObjGroups': None},
+    'shadingEngine': {'dagSetMembers': None},
+    'multiplyDivide': {'input1': [0.0, 0.0, 0.0], 'input2': [1.0, 1.0, 1.0], 'output': [0.0, 0.0, 0.0], 'operation': 1},
+}
+
+# Attributes whose edits move the node and everything below it.
+MATRIX_ATTRS = set(['translate', 'rotate', 'rotateAxis', 'scale', 'rotateOrder', 'jointOrient'])
+
+# Array attributes, only their connected elements are modelled.
+ARRAY_ATTRS = set(['instObjGroups', 'dagSetMembers'])
+
+# Attributes computed from others, read only.
+COMPUTED_ATTRS = set(['matrix'])
+
+AXES = 'XYZ'
+
+ROTATE_ORDERS = ['xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx']
+
+
+def getAttrPath(nodeType, attr):
+    """Resolve an attribute name to its (attr, child index) path, None when the node type has no such attribute.
+
+    Returns:
+        tuple
+    """
+    attrs = NODE_ATTRS.get(nodeType, {})
+
+    if attr in attrs or attr in COMPUTED_ATTRS and nodeType in ('transform', 'joint'):
+        return attr, None
+
+    if attr[-1:] in AXES and isinstance(attrs.get(attr[:-1]), list):
+        return attr[:-1], AXES.index(attr[-1])
+
+
+# Row major 4x4 matrices as flat lists, multiplied with row vectors like Maya's.
+
+IDENTITY = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+def multiply(a, b):
+    return [
+        a[row] * b[column] + a[row + 1] * b[4 + column] + a[row + 2] * b[8 + column] + a[row + 3] * b[12 + column]
+        for row in (0, 4, 8, 12) for column in (0, 1, 2, 3)]
+
+
+def inverse(m):
+    """Invert an affine matrix."""
+    a, b, c = m[0:3]
+    d, e, f = m[4:7]
+    g, h, i = m[8:11]
+
+    determinant = a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+    if abs(determinant) < 1e-12:
+        raise ValueError('Matrix is singular.')
+    s = 1.0 / determinant
+
+    r = [
+        (e * i - f * h) * s, (c * h - b * i) * s, (b * f - c * e) * s,
+        (f * g - d * i) * s, (a * i - c * g) * s, (c * d - a * f) * s,
+        (d * h - e * g) * s, (b * g - a * h) * s, (a * e - b * d) * s,
+    ]
+    tx, ty, tz = m[12:15]
+
+    return [
+        r[0], r[1], r[2], 0.0,
+        r[3], r[4], r[5], 0.0,
+        r[6], r[7], r[8], 0.0,
+        -(tx * r[0] + ty * r[3] + tz * r[6]), -(tx * r[1] + ty * r[4] + tz * r[7]), -(tx * r[2] + ty * r[5] + tz * r[8]), 1.0,
+    ]
+
+
+def transpose(m):
+    return [m[column * 4 + row] for row in range(4) for column in range(4)]
+
+
+def getAxisMatrix(axis, angle):
+    c = math.cos(angle)
+    s = math.sin(angle)
+
+    if axis == 'x':
+        return [1.0, 0.0, 0.0, 0.0, 0.0, c, s, 0.0, 0.0, -s, c, 0.0, 0.0, 0.0, 0.0, 1.0]
+    if axis == 'y':
+        return [c, 0.0, -s, 0.0, 0.0, 1.0, 0.0, 0.0, s, 0.0, c, 0.0, 0.0, 0.0, 0.0, 1.0]
+    return [c, s, 0.0, 0.0, -s, c, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+def eulerToMatrix(angles, rotateOrder=0):
+    """Get the rotation matrix of angles in radians, the first axis of the order is applied first."""
+    result = IDENTITY
+    for axis in ROTATE_ORDERS[rotateOrder]:
+        angle = angles['xyz'.index(axis)]
+        if angle:
+            result = multiply(result, getAxisMatrix(axis, angle))
+
+    return result
+
+
+def matrixToEuler(m):
+    """Get xyz order angles in radians from a rotation matrix."""
+    sy = max(-1.0, min(1.0, -m[2]))
+    y = math.asin(sy)
+
+    if abs(sy) < 1.0 - 1e-9:
+        x = math.atan2(m[6], m[10])
+        z = math.atan2(m[1], m[0])
+    else:
+        # Gimbal lock, the whole rotation goes in x.
+        x = math.atan2(-m[9], m[5])
+        z = 0.0
+
+    return [x, y, z]
+
+
+def getScale(m):
+    return [math.sqrt(m[row] ** 2 + m[row + 1] ** 2 + m[row + 2] ** 2) for row in (0, 4, 8)]
+
+
+def getRotation(m):
+    """Get the rotation part of an affine matrix without shear."""
+    result = list(IDENTITY)
+    for row, length in zip((0, 4, 8), getScale(m)):
+        for column in range(3):
+            result[row + column] = m[row + column] / (length or 1.0)
+
+    return result
+
+
+def scaleMatrix(scale):
+    return [scale[0], 0.0, 0.0, 0.0, 0.0, scale[1], 0.0, 0.0, 0.0, 0.0, scale[2], 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+def translateMatrix(translate):
+    return [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, translate[0], translate[1], translate[2], 1.0]
+
+
+def copyAttrs(attrs):
+    return dict((k, list(v) if isinstance(v, list) else v) for k, v in attrs.items())
+
+
+class Node(object):
+    """A scene node or data object, handed out by the API wrapped in MObjects."""
+
+    def __init__(self, nodeType, name=None):
+        self.nodeType = nodeType
+        self.name = name
+        self.fnTypes = frozenset(FN_TYPES.get(nodeType, (kBase,)))
+        self.attrs = copyAttrs(NODE_ATTRS.get(nodeType, {}))
+        self.parent = None
+        self.children = []
+        # Source (node, attr path) per connected destination attr path.
+        self.inputs = {}
+        # Geometry of mesh data, matrix of matrix data, influences of skin clusters.
+        self.data = None
+        self.alive = False
+
+        # Cached world matrix and path, None when stale.
+        self.world = None
+        self.path = None
+
+    @property
+    def isDag(self):
+        return self.nodeType in DAG_TYPES
+
+    def getValue(self, path):
+        attr, index = path
+        if attr == 'matrix':
+            return getLocalMatrix(self)
+
+        source = self.inputs.get(path)
+        if source is not None:
+            return source[0].getValue(source[1])
+
+        if attr in ARRAY_ATTRS:
+            return
+
+        if index is not None and (attr, None) in self.inputs:
+            return self.getValue((attr, None))[index]
+
+        value = self.attrs[attr]
+        if index is not None:
+            return value[index]
+
+        return value
+
+    def getDepth(self):
+        depth = 0
+        node = self.parent
+        while node is not None and node.nodeType != 'world':
+            depth += 1
+            node = node.parent
+
+        return depth
+
+
+def getLocalMatrix(node):
+    if node.nodeType not in ('transform', 'joint'):
+        return IDENTITY
+
+    attrs = node.attrs
+    result = scaleMatrix(attrs['scale'])
+    result = multiply(result, eulerToMatrix(attrs['rotateAxis']))
+    result = multiply(result, eulerToMatrix(attrs['rotate'], attrs['rotateOrder']))
+    if node.nodeType == 'joint':
+        result = multiply(result, eulerToMatrix(attrs['jointOrient']))
+
+    return multiply(result, translateMatrix(attrs['translate']))
+
+
+def invalidate(node, field):
+    """Clear a cached field of the node and everything below it.
+
+    A stale node only ever has stale descendants, so the walk stops at nodes already cleared.
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if getattr(current, field) is None and current is not node:
+            continue
+
+        setattr(current, field, None)
+        stack.extend(current.children)
+
+
+def getWorldMatrix(node):
+    """Get the world matrix of a DAG node, cached until it or a parent moves."""
+    chain = []
+    while node is not None and node.nodeType != 'world' and node.world is None:
+        chain.append(node)
+        node = node.parent
+
+    world = IDENTITY if node is None or node.nodeType == 'world' else node.world
+    for node in reversed(chain):
+        world = multiply(getLocalMatrix(node), world)
+        node.world = world
+
+    return world
+
+
+def getPath(node):
+    """Get the full path name of a DAG node, cached until it or a parent is renamed or reparented."""
+    chain = []
+    while node is not None and node.nodeType != 'world' and node.path is None:
+        chain.append(node)
+        node = node.parent
+
+    path = '' if node is None or node.nodeType == 'world' else node.path
+    for node in reversed(chain):
+        path = node.path = path + '|' + node.name
+
+    return path
+
+
+def runUndos(undos):
+    for undo in reversed(undos):
+        undo()
+
+
+class Scene(object):
+    """The nodes, selection and undo queue of the current scene."""
+
+    def __init__(self):
+        self.world = Node('world', '')
+        self.world.alive = True
+        self.names = {}
+        self.nameCounters = collections.Counter()
+        self.sceneName = ''
+
+        # Selected nodes in order, as keys.
+        self.selection = collections.OrderedDict()
+
+        # Each entry undoes one command. Open chunks and modifiers gather undos in a list instead.
+        self.undoQueue = []
+        self._undoTargets = []
+        self._chunks = []
+
+        # Default nodes of every scene.
+        self.createNode('shadingEngine', 'initialShadingGroup')
+
+    def getUniqueName(self, name):
+        if name and name not in self.names:
+            return name
+
+        base = (name or '').rstrip('0123456789') or 'node'
+        while True:
+            self.nameCounters[base] += 1
+            candidate = '{0}{1}'.format(base, self.nameCounters[base])
+            if candidate not in self.names:
+                return candidate
+
+    def lookup(self, name):
+        """Find a node by name or path.
+
+        Returns:
+            Node
+        """
+        node = self.names.get(name.rsplit('|', 1)[-1])
+        if node is None:
+            raise RuntimeError('No object matches name: {0}'.format(name))
+
+        return node
+
+    # Undo.
+
+    def record(self, undo):
+        """Record how to undo an edit that was just made."""
+        if self._undoTargets:
+            self._undoTargets[-1].append(undo)
+
+    def capture(self):
+        """Gather the undos of the edits made until release, returning the list they go in."""
+        undos = []
+        self._undoTargets.append(undos)
+
+        return undos
+
+    def release(self):
+        return self._undoTargets.pop()
+
+    def pushUndo(self, undo):
+        """Put one undoable step on the queue, or into the open undo chunk."""
+        if self._chunks:
+            self._chunks[-1].append(undo)
+        else:
+            self.undoQueue.append(undo)
+
+    def openChunk(self):
+        self._chunks.append([])
+
+    def closeChunk(self):
+        undos = self._chunks.pop()
+        if undos:
+            self.pushUndo(lambda: runUndos(undos))
+
+    def undo(self):
+        if self.undoQueue:
+            self.undoQueue.pop()()
+
+    # Edits, each recording its undo.
+
+    def addNode(self, node, parent=None):
+        """Put a node into the scene, under parent or the world when it is a DAG node."""
+        node.alive = True
+        node.name = self.getUniqueName(node.name or node.nodeType)
+        self.names[node.name] = node
+        if node.isDag:
+            self.attach(node, parent or self.world)
+        self.record(lambda: self.removeNode(node))
+
+    def createNode(self, nodeType, name=None, parent=None):
+        node = Node(nodeType, name)
+        self.addNode(node, parent)
+
+        return node
+
+    def removeNode(self, node):
+        if node.parent is not None:
+            node.parent.children.remove(node)
+
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            stack.extend(current.children)
+
+            current.parent = None
+            current.children = []
+            self.names.pop(current.name, None)
+            self.selection.pop(current, None)
+            current.alive = False
+            current.world = current.path = None
+
+    def attach(self, node, parent, index=None):
+        node.parent = parent
+        if index is None:
+            parent.children.append(node)
+        else:
+            parent.children.insert(index, node)
+        invalidate(node, 'world')
+        invalidate(node, 'path')
+
+    def reparent(self, node, parent, keepWorld=False):
+        """Move a node under parent, the world when None, optionally keeping its world matrix."""
+        parent = parent or self.world
+        oldParent = node.parent
+        oldIndex = oldParent.children.index(node)
+        oldAttrs = copyAttrs(node.attrs)
+        world = getWorldMatrix(node)
+
+        oldParent.children.remove(node)
+
+        if keepWorld and node.nodeType in ('transform', 'joint'):
+            local = multiply(world, inverse(getWorldMatrix(parent)))
+            node.attrs['translate'] = list(local[12:15])
+            node.attrs['scale'] = getScale(local)
+            rotation = getRotation(local)
+            if node.nodeType == 'joint':
+                # Joints keep rotate and rotateAxis, the joint orient takes up the difference.
+                kept = multiply(eulerToMatrix(node.attrs['rotateAxis']), eulerToMatrix(node.attrs['rotate'], node.attrs['rotateOrder']))
+                node.attrs['jointOrient'] = matrixToEuler(multiply(transpose(kept), rotation))
+            else:
+                node.attrs['rotate'] = matrixToEuler(rotation)
+                node.attrs['rotateOrder'] = 0
+                node.attrs['rotateAxis'] = [0.0, 0.0, 0.0]
+
+            # The world matrices are unchanged, only the paths are stale.
+            node.parent = parent
+            parent.children.append(node)
+            invalidate(node, 'path')
+        else:
+            self.attach(node, parent)
+
+        def undo():
+            parent.children.remove(node)
+            node.attrs = oldAttrs
+            self.attach(node, oldParent, oldIndex)
+
+        self.record(undo)
+
+    def rename(self, node, name):
+        oldName = node.name
+        del self.names[oldName]
+        node.name = self.getUniqueName(name)
+        self.names[node.name] = node
+        invalidate(node, 'path')
+
+        def undo():
+            del self.names[node.name]
+            node.name = oldName
+            self.names[oldName] = node
+            invalidate(node, 'path')
+
+        self.record(undo)
+
+        return node.name
+
+    def setValue(self, node, path, value):
+        attr, index = path
+        if attr in COMPUTED_ATTRS:
+            raise RuntimeError('{0} is read only.'.format(attr))
+
+        oldValue = node.attrs[attr]
+        if index is None:
+            node.attrs[attr] = list(value) if isinstance(value, (list, tuple)) else value
+        else:
+            node.attrs[attr] = list(oldValue)
+            node.attrs[attr][index] = value
+        if attr in MATRIX_ATTRS:
+            invalidate(node, 'world')
+
+        def undo():
+            node.attrs[attr] = oldValue
+            if attr in MATRIX_ATTRS:
+                invalidate(node, 'world')
+
+        self.record(undo)
+
+    def connect(self, source, sourcePath, destination, destinationPath):
+        if destinationPath in destination.inputs:
+            raise RuntimeError('{0}.{1} is already connected.'.format(destination.name, destinationPath[0]))
+
+        if isinstance(source.getValue(sourcePath), list) != isinstance(destination.getValue(destinationPath), list):
+            raise RuntimeError('The types of {0}.{1} and {2}.{3} do not match.'.format(
+                source.name, sourcePath[0], destination.name, destinationPath[0]))
+
+        destination.inputs[destinationPath] = (source, sourcePath)
+        self.record(lambda: destination.inputs.pop(destinationPath))
+
+    def disconnect(self, destination, destinationPath):
+        source = destination.inputs.pop(destinationPath)
+        self.record(lambda: destination.inputs.__setitem__(destinationPath, source))
+
+    def select(self, nodes, add=False):
+        if not add:
+            self.selection.clear()
+
+        for node in nodes:
+            self.selection[node] = None
+
+
+scene = Scene()
+
+
+def newScene():
+    """Start over with an empty scene."""
+    global scene
+    scene = Scene()
+
+    return scene
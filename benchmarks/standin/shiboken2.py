@@ -0,0 +1,5 @@
+"""Stand-in for shiboken2, there are no C++ objects to wrap."""
+
+
+def wrapInstance(pointer, cls):
+    raise RuntimeError('The stand-in has no C++ objects to wrap.')
@@ -1,32 +1,19 @@
-import math
 import logging
 
 from maya.api import OpenMaya
 from maya import cmds
 
+from dragonfly import modifier, orient, transforms
 
-LOG = logging.getLogger(__name__)
-
-
-def getAllChild(node):
-    dagNode = OpenMaya.MFnDagNode(node)
-
-    children = []
 
-    for childIndex in range(dagNode.childCount()):
-        child = dagNode.child(childIndex) 
-        if not child.hasFn(OpenMaya.MFn.kJoint):
-            continue
-        children.append(child)
+LOG = logging.getLogger(__name__)
 
-    result = []
 
-    if children:
-        for child in children:
-            result.append(child)
-            result.extend(getAllChild(child))
+def getAllChild(node, index=None):
+    if index is None:
+        index = transforms.HierarchyIndex(OpenMaya.MFn.kJoint)
 
-    return result
+    return index.getAllChildren(node)
 
 
 def getChildren(node):
@@ -42,72 +29,146 @@ def getChildren(node):
     return result
 
 
-def packRotation(node, preserveChildren):
-    wm, r, ra, jo = getMatrices(node)
-    setRotationMatrices(node, jo, preserveChildren)
+class JointState(object):
+    """Rotation and matrix data of a joint, read through plugs that are resolved once.
 
+    Angles are stored in radians.
+    """
+    __slots__ = [
+        'node', 'dagPath', 'plugs',
+        'rotate', 'rotateAxis', 'jointOrient', 'rotateOrder',
+        'worldMatrix', 'parentMatrix', 'parentInverseMatrix',
+    ]
 
-def getMatrices(node):
-    nodeName = OpenMaya.MFnDagNode(node).getPath()
+    attrs = ['translate', 'rotate', 'rotateAxis', 'jointOrient', 'rotateOrder']
+
+    def __init__(self, node):
+        self.node = node
+        self.dagPath = OpenMaya.MDagPath.getAPathTo(node)
+
+        depNode = OpenMaya.MFnDependencyNode(node)
+        self.plugs = dict((attr, depNode.findPlug(attr, False)) for attr in self.attrs)
+
+        self.read()
+
+    def read(self):
+        """Refresh the values, e.g. after a parent was changed."""
+        self.rotate = self.getAngles('rotate')
+        self.rotateAxis = self.getAngles('rotateAxis')
+        self.jointOrient = self.getAngles('jointOrient')
+        self.rotateOrder = orient.ROTATE_ORDERS[self.plugs['rotateOrder'].asInt()]
+
+        self.worldMatrix = self.dagPath.inclusiveMatrix()
+        self.parentMatrix = self.dagPath.exclusiveMatrix()
+        self.parentInverseMatrix = self.dagPath.exclusiveMatrixInverse()
+
+    def getAngles(self, attr):
+        plug = self.plugs[attr]
+
+        return [plug.child(i).asMAngle().asRadians() for i in range(3)]
+
+    def getMatrices(self):
+        pm = self.parentMatrix
 
-    r = cmds.getAttr('{0}.r'.format(nodeName))
-    r = [math.radians(x) for x in r[0]]
-    ra = cmds.getAttr('{0}.ra'.format(nodeName))
-    ra = [math.radians(x) for x in ra[0]]
-    jo = cmds.getAttr('{0}.jo'.format(nodeName))
-    jo = [math.radians(x) for x in jo[0]]
+        r = OpenMaya.MEulerRotation(*self.rotate).asMatrix() * pm
+        ra = OpenMaya.MEulerRotation(*self.rotateAxis).asMatrix() * pm
+        jo = OpenMaya.MEulerRotation(*self.jointOrient).asMatrix() * pm
 
-    wm = OpenMaya.MMatrix(cmds.getAttr('{0}.wm'.format(nodeName)))
-    pm = OpenMaya.MMatrix(cmds.getAttr('{0}.pm'.format(nodeName)))
+        return self.worldMatrix, r, ra, jo
 
-    r = OpenMaya.MEulerRotation(*r).asMatrix() * pm
-    ra = OpenMaya.MEulerRotation(*ra).asMatrix() * pm
-    jo = OpenMaya.MEulerRotation(*jo).asMatrix() * pm
+    def getPosition(self):
+        return [self.worldMatrix.getElement(3, i) for i in range(3)]
 
-    return wm, r, ra, jo
+    def getWorldRotation(self):
+        return orient.orthonormalize(getRotationRows(self.worldMatrix))
 
+    def write(self, translate=None, rotate=None, rotateAxis=None, jointOrient=None, dagModifier=None):
+        """Write new values through the plugs, angles in radians.
 
-def setRotationMatrices(node, orientMatrix, preserveChildren=True):
-    if preserveChildren:
-        children = getChildren(node)
-        matrices = [getMatrices(j) for j in children]
+        The edit is queued on dagModifier when given, otherwise it runs right away as one undoable edit.
+        """
+        execute = dagModifier is None
+        if execute:
+            dagModifier = modifier.DagModifier()
 
-    wm, r, ra, jo = getMatrices(node)
-    r = OpenMaya.MMatrix()
-    ra = orientMatrix * r.inverse() * jo.inverse()
-    setMatrices(node, wm, r, ra, jo)
+        if translate is not None:
+            dagModifier.setDoubles(self.node, 'translate', translate)
 
-    if preserveChildren:
-        for child, childm in zip(children, matrices):
-            setMatrices(child, *childm)
+        for attr, value in (('rotate', rotate), ('rotateAxis', rotateAxis), ('jointOrient', jointOrient)):
+            if value is not None:
+                dagModifier.setAngles(self.node, attr, value)
 
+        if execute:
+            dagModifier.doIt()
 
-def setMatrices(node, worldMatrix, rotationMatrix, rotateAxisMatrix, orientMatrix, translate=True, rotate=True):
-    nodeName = OpenMaya.MFnDagNode(node).fullPathName()
 
-    pim = OpenMaya.MMatrix(cmds.getAttr('{0}.pim'.format(nodeName)))
+def getRotationRows(matrix):
+    return [[matrix.getElement(row, column) for column in range(3)] for row in range(3)]
 
-    matrix = worldMatrix * pim
-    
-    if rotate:
-        wm, r, ra, jo = getMatrices(node)
 
-        rEuler = OpenMaya.MTransformationMatrix(rotationMatrix).rotation()
-        rEuler = [math.degrees(rEuler.x), math.degrees(rEuler.y), math.degrees(rEuler.z)]
-        LOG.info(rEuler)
+def readJointStates(nodes):
+    return [JointState(n) for n in nodes]
 
-        raEuler = OpenMaya.MTransformationMatrix(rotateAxisMatrix).rotation()
-        raEuler = [math.degrees(raEuler.x), math.degrees(raEuler.y), math.degrees(raEuler.z)]
-        LOG.info(raEuler)
 
-        joEuler = OpenMaya.MTransformationMatrix(orientMatrix * pim * r * pim).rotation()
-        joEuler = [math.degrees(joEuler.x), math.degrees(joEuler.y), math.degrees(joEuler.z)]
-        LOG.info(joEuler)
+def packRotation(node):
+    # Packing keeps the local rotation as is, so children never move.
+    packRotations([node])
 
-        cmds.setAttr(nodeName + '.r', *rEuler)
-        cmds.setAttr(nodeName + '.ra', *raEuler)
-        cmds.setAttr(nodeName + '.jo', *joEuler)
-    
-    if translate:
-        t = [matrix.getElement(3, 0), matrix.getElement(3, 1), matrix.getElement(3, 2)]
-        cmds.setAttr(nodeName + '.t', *t)
\ No newline at end of file
+
+def packRotations(nodes):
+    """Move the rotate and rotateAxis values of every joint into its joint orient, in one undoable edit."""
+    dagModifier = modifier.DagModifier()
+
+    for state in readJointStates(nodes):
+        jointOrient = orient.packRotation(state.rotate, state.rotateAxis, state.jointOrient, state.rotateOrder)
+        state.write(rotate=[0.0, 0.0, 0.0], rotateAxis=[0.0, 0.0, 0.0], jointOrient=jointOrient, dagModifier=dagModifier)
+
+    dagModifier.doIt()
+
+
+def orientJoints(nodes, up=orient.WORLD_UP):
+    """Aim every joint's x axis at its first child with y leaning towards up, in one undoable edit.
+
+    The orientation is packed into the joint orient and rotate and rotateAxis are zeroed.
+    Child joints that are not part of nodes keep their world transformation.
+    Joints are expected to have a scale of one.
+    """
+    states = readJointStates(nodes)
+    if not states:
+        return
+    states.sort(key=lambda s: s.dagPath.length())
+
+    indices = dict((transforms.getNodeKey(s.node), i) for i, s in enumerate(states))
+
+    parents = []
+    parentFrames = {}
+    for index, state in enumerate(states):
+        parent = indices.get(transforms.getNodeKey(OpenMaya.MFnDagNode(state.node).parent(0)))
+        if parent is None:
+            parentFrames[index] = getRotationRows(state.parentMatrix)
+        parents.append(parent)
+
+    positions = [s.getPosition() for s in states]
+    frames, jointOrients, translates = orient.orientChain(positions, parents, up, parentFrames)
+
+    dagModifier = modifier.DagModifier()
+
+    for state, frame, jointOrient, translate, position in zip(states, frames, jointOrients, translates, positions):
+        state.write(translate, [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], jointOrient, dagModifier=dagModifier)
+
+        for child in getChildren(state.node):
+            if transforms.getNodeKey(child) in indices:
+                continue
+
+            childState = JointState(child)
+            childOrient = orient.getCompensatedOrient(
+                childState.getWorldRotation(), frame, childState.rotate, childState.rotateAxis, childState.rotateOrder)
+            childTranslate = orient.transformVector(
+                orient.subtract(childState.getPosition(), position), orient.transpose(frame))
+            childState.write(translate=childTranslate, jointOrient=childOrient, dagModifier=dagModifier)
+
+    dagModifier.doIt()
+
+
+def getMatrices(node):
+    return JointState(node).getMatrices()
@@ -0,0 +1,158 @@
+"""Batched DAG edits that run in a single doIt() and undo as one step.
+
+Operations are queued on an OpenMaya.MDagModifier and executed together. The
+modifier is then handed to a small undoable command, registered by loading
+this module as a plugin, so Maya's undo queue sees the batch as one entry.
+"""
+import contextlib
+import logging
+import os
+
+from maya.api import OpenMaya
+from maya import cmds
+
+
+LOG = logging.getLogger(__name__)
+
+COMMAND_NAME = 'dragonflyModifier'
+
+# Modifiers that were executed and wait for the undo command to pick them up.
+_pending = []
+
+
+def maya_useNewAPI():
+    """Tells Maya this plugin uses the Python API 2.0."""
+    pass
+
+
+class ModifierCommand(OpenMaya.MPxCommand):
+    """Puts the last executed modifier on the undo queue."""
+
+    def __init__(self):
+        super(ModifierCommand, self).__init__()
+        self._modifier = None
+
+    @staticmethod
+    def creator():
+        return ModifierCommand()
+
+    def doIt(self, args):
+        # Maya loads the plugin as its own module, so reach the queue through the package.
+        from dragonfly import modifier
+        self._modifier = modifier._pending.pop()
+
+    def isUndoable(self):
+        return True
+
+    def undoIt(self):
+        self._modifier.undoIt()
+
+    def redoIt(self):
+        self._modifier.doIt()
+
+
+def initializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).registerCommand(COMMAND_NAME, ModifierCommand.creator)
+
+
+def uninitializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)
+
+
+def loadPlugin():
+    pluginPath = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+
+    if not cmds.pluginInfo(pluginPath, query=True, loaded=True):
+        cmds.loadPlugin(pluginPath, quiet=True)
+
+
+@contextlib.contextmanager
+def undoChunk(name='dragonfly'):
+    """Group every command run inside the block into one undo step."""
+    cmds.undoInfo(openChunk=True, chunkName=name)
+    try:
+        yield
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
+class DagModifier(object):
+    """Queues node creation, reparenting and attribute edits to execute in one go.
+
+    Can be used as a context manager, the queued edits are executed when the
+    block exits without an error.
+    """
+
+    def __init__(self):
+        self._modifier = OpenMaya.MDagModifier()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None:
+            self.doIt()
+
+    def createNode(self, nodeType, parent=None, name=None):
+        """Queue a new DAG node, parented at creation time.
+
+        Returns:
+            OpenMaya.MObject: the node, valid once doIt has run.
+        """
+        if parent is None:
+            node = self._modifier.createNode(nodeType)
+        else:
+            node = self._modifier.createNode(nodeType, parent)
+
+        if name is not None:
+            self._modifier.renameNode(node, name)
+
+        return node
+
+    def reparent(self, node, parent=None):
+        """Queue a reparent, keeping the node's local transformation. The world is used when parent is None."""
+        if parent is None:
+            self._modifier.reparentNode(node)
+        else:
+            self._modifier.reparentNode(node, parent)
+
+    def setDoubles(self, node, attr, values):
+        """Queue values for the children of a compound attribute, e.g. translate."""
+        plug = getPlug(node, attr)
+
+        for index, value in enumerate(values):
+            self._modifier.newPlugValueDouble(plug.child(index), value)
+
+    def setAngles(self, node, attr, radians):
+        """Queue angles in radians for the children of a compound attribute, e.g. rotate."""
+        plug = getPlug(node, attr)
+
+        for index, value in enumerate(radians):
+            self._modifier.newPlugValueMAngle(plug.child(index), OpenMaya.MAngle(value))
+
+    def setInt(self, node, attr, value):
+        self._modifier.newPlugValueInt(getPlug(node, attr), value)
+
+    def setBool(self, node, attr, value):
+        self._modifier.newPlugValueBool(getPlug(node, attr), value)
+
+    def connect(self, sourcePlug, destinationPlug):
+        self._modifier.connect(sourcePlug, destinationPlug)
+
+    def disconnect(self, sourcePlug, destinationPlug):
+        self._modifier.disconnect(sourcePlug, destinationPlug)
+
+    def doIt(self):
+        """Execute every queued edit and record them as a single undo step."""
+        loadPlugin()
+
+        self._modifier.doIt()
+
+        _pending.append(self._modifier)
+        getattr(cmds, COMMAND_NAME)()
+
+        self._modifier = OpenMaya.MDagModifier()
+
+
+def getPlug(node, attr):
+    return OpenMaya.MFnDependencyNode(node).findPlug(attr, False)
@@ -1,37 +1,173 @@
+import contextlib
+
+from maya.api import OpenMaya
 from maya import cmds
 
-def createNode(nodeType, name):
+from dragonfly import modifier
+
+
+# Modifiers of the open batch blocks, connections queue on the outermost one.
+_batches = []
+
+
+def createNode(nodeType, name=None):
     n = Node.fromType(nodeType)
-    n.rename(name)
+    if name is not None:
+        n.rename(name)
 
     return n
 
+
+@contextlib.contextmanager
+def batch():
+    """Queue every connection made in the block on one shared modifier.
+
+    The connections are made in a single doIt, undone as one step, when the
+    outermost block exits without an error.
+    """
+    if _batches:
+        yield _batches[0]
+        return
+
+    dagModifier = modifier.DagModifier()
+    _batches.append(dagModifier)
+    try:
+        yield dagModifier
+    finally:
+        _batches.pop()
+
+    dagModifier.doIt()
+
+
 class Node(object):
-    def __init__(self, name):
-        if not cmds.objExists(name):
-            raise ValueError('Failed to create Node: {0}'.format(name))
+    """A scene node held by handle, so renames and reparents never need a new lookup.
 
-        self._fullPath = cmds.ls(name, long=True, recursive=True)[0]
+    Attributes are reached as items or attributes, e.g. node['scale'] or node.scaleX,
+    and their plugs are resolved once per node.
+    """
+    __slots__ = ['_handle', '_plugs']
+
+    def __init__(self, node):
+        if not isinstance(node, OpenMaya.MObject):
+            if not cmds.objExists(node):
+                raise ValueError('Failed to create Node: {0}'.format(node))
+
+            selectionList = OpenMaya.MSelectionList()
+            selectionList.add(node)
+            node = selectionList.getDependNode(0)
+
+        self._handle = OpenMaya.MObjectHandle(node)
+        self._plugs = {}
 
     @staticmethod
     def fromType(nodeType):
         n = cmds.createNode(nodeType)
-        
+
         return Node(n)
 
+    def __eq__(self, other):
+        return isinstance(other, Node) and self._handle == other._handle
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._handle.hashCode()
+
+    def __repr__(self):
+        return 'Node({0!r})'.format(self.fullPath)
+
+    def __getitem__(self, attr):
+        return Attribute(self, attr)
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+
+        return Attribute(self, attr)
+
+    @property
+    def object(self):
+        if not self._handle.isValid():
+            raise ValueError('Node no longer exists.')
+
+        return self._handle.object()
+
+    @property
+    def dagPath(self):
+        """The first path to the node, or None for dependency nodes."""
+        mObject = self.object
+        if not mObject.hasFn(OpenMaya.MFn.kDagNode):
+            return
+
+        return OpenMaya.MDagPath.getAPathTo(mObject)
+
+    @property
+    def name(self):
+        return OpenMaya.MFnDependencyNode(self.object).name()
+
+    @property
+    def fullPath(self):
+        dagPath = self.dagPath
+        if dagPath is None:
+            return self.name
+
+        return dagPath.fullPathName()
+
     def rename(self, newName):
-        cmds.rename(self._fullPath, newName)
-        self._fullPath = cmds.ls(name, long=True, recursive=True)[0]
+        cmds.rename(self.fullPath, newName)
+
+    def getPlug(self, attr):
+        """Get the plug of an attribute, resolved on first use.
+
+        Returns:
+            OpenMaya.MPlug
+        """
+        plug = self._plugs.get(attr)
+        if plug is None:
+            depNode = OpenMaya.MFnDependencyNode(self.object)
+            if not depNode.hasAttribute(attr):
+                raise AttributeError('{0} has no attribute {1}'.format(depNode.name(), attr))
+
+            plug = self._plugs[attr] = depNode.findPlug(attr, False)
+
+        return plug
 
 
 class Attribute(object):
-    def __init__(self, attr):
-        pass
+    __slots__ = ['node', 'attr']
+
+    def __init__(self, node, attr):
+        self.node = node
+        self.attr = attr
+
+        # Fail early on a missing attribute, and cache its plug.
+        node.getPlug(attr)
+
+    def __repr__(self):
+        return 'Attribute({0!r})'.format(self.fullName)
+
+    @property
+    def plug(self):
+        return self.node.getPlug(self.attr)
 
     @property
     def fullName(self):
-        return
+        return '{0}.{1}'.format(self.node.fullPath, self.attr)
 
     def connect(self, nodeAttr):
-        cmds.connectAttr(self.fullName, nodeAttr.fullName)
+        """Connect this attribute to nodeAttr, queued on the open batch if any."""
+        if _batches:
+            _batches[0].connect(self.plug, nodeAttr.plug)
+            return
+
+        with modifier.DagModifier() as dagModifier:
+            dagModifier.connect(self.plug, nodeAttr.plug)
+
+    def disconnect(self, nodeAttr):
+        if _batches:
+            _batches[0].disconnect(self.plug, nodeAttr.plug)
+            return
 
+        with modifier.DagModifier() as dagModifier:
+            dagModifier.disconnect(self.plug, nodeAttr.plug)
@@ -0,0 +1,212 @@
+"""Joint orientation math over plain position arrays, usable without Maya.
+
+Matrices are 3x3 lists of rows in Maya's row-vector convention, so a child's
+world rotation is its local rotation times its parent's. Angles are radians
+and joint orients always use the xyz rotate order.
+"""
+import math
+
+
+WORLD_UP = (0.0, 1.0, 0.0)
+# Up vector used when a joint aims straight along the requested up vector.
+FALLBACK_UP = (0.0, 0.0, 1.0)
+
+IDENTITY = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+
+# Same order as the rotateOrder enum attribute.
+ROTATE_ORDERS = ['xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx']
+
+EPSILON = 1e-9
+
+
+def subtract(a, b):
+    return [a[0] - b[0], a[1] - b[1], a[2] - b[2]]
+
+
+def dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def cross(a, b):
+    return [
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0],
+    ]
+
+
+def normalize(v):
+    length = math.sqrt(dot(v, v))
+    if length < EPSILON:
+        return [0.0, 0.0, 0.0]
+
+    return [v[0] / length, v[1] / length, v[2] / length]
+
+
+def transpose(m):
+    return [list(row) for row in zip(*m)]
+
+
+def multiply(a, b):
+    """Multiply two 3x3 matrices."""
+    columns = list(zip(*b))
+
+    return [[dot(row, column) for column in columns] for row in a]
+
+
+def transformVector(v, m):
+    """Transform a row vector by a 3x3 matrix."""
+    return [
+        v[0] * m[0][0] + v[1] * m[1][0] + v[2] * m[2][0],
+        v[0] * m[0][1] + v[1] * m[1][1] + v[2] * m[2][1],
+        v[0] * m[0][2] + v[1] * m[1][2] + v[2] * m[2][2],
+    ]
+
+
+def orthonormalize(m):
+    """Remove scale and shear from a 3x3 matrix, keeping the direction of its x axis."""
+    x = normalize(m[0])
+    z = normalize(cross(x, m[1]))
+    y = cross(z, x)
+
+    return [x, y, z]
+
+
+def getAxisRotation(axis, angle):
+    """Get the rotation matrix of an angle around the x, y or z axis."""
+    c = math.cos(angle)
+    s = math.sin(angle)
+
+    if axis == 'x':
+        return [[1.0, 0.0, 0.0], [0.0, c, s], [0.0, -s, c]]
+    if axis == 'y':
+        return [[c, 0.0, -s], [0.0, 1.0, 0.0], [s, 0.0, c]]
+
+    return [[c, s, 0.0], [-s, c, 0.0], [0.0, 0.0, 1.0]]
+
+
+def eulerToMatrix(angles, rotateOrder='xyz'):
+    """Get the rotation matrix of euler angles, the first axis of rotateOrder being applied first."""
+    matrix = IDENTITY
+    for axis in rotateOrder:
+        matrix = multiply(matrix, getAxisRotation(axis, angles['xyz'.index(axis)]))
+
+    return matrix
+
+
+def matrixToEuler(m):
+    """Get the xyz euler angles of a rotation matrix."""
+    sy = max(-1.0, min(1.0, -m[0][2]))
+    y = math.asin(sy)
+
+    if abs(sy) < 1.0 - EPSILON:
+        x = math.atan2(m[1][2], m[2][2])
+        z = math.atan2(m[0][1], m[0][0])
+    else:
+        # Gimbal lock, put the whole remaining rotation on x.
+        x = math.atan2(-m[2][1], m[1][1])
+        z = 0.0
+
+    return [x, y, z]
+
+
+def getAimFrame(aim, up=WORLD_UP):
+    """Get a rotation whose x axis points along aim and whose y axis leans towards up.
+
+    Returns:
+        list: x, y and z axis rows, or None if aim has no length.
+    """
+    x = normalize(aim)
+    if dot(x, x) < EPSILON:
+        return
+
+    z = normalize(cross(x, up))
+    if dot(z, z) < EPSILON:
+        z = normalize(cross(x, FALLBACK_UP))
+
+    y = cross(z, x)
+
+    return [x, y, z]
+
+
+def orientChain(positions, parents, up=WORLD_UP, parentFrames=None):
+    """Orient every joint of a chain or skeleton in one pass.
+
+    Each joint's x axis aims at its first child and its y axis leans towards up,
+    like `joint -e -oj xyz -sao yup`. Joints without children, or sitting on
+    their child, keep their parent's frame. The whole orientation is packed into
+    the joint orient, leaving rotate and rotateAxis at zero.
+
+    Args:
+        positions (list): world position per joint, parents listed before their children.
+        parents (list): parent index per joint, None when the parent is not in the list.
+        up (tuple): world vector the secondary axis leans towards.
+        parentFrames (dict): world rotation of the outside parent, per root index. Identity when missing.
+
+    Returns:
+        tuple: world rotation, joint orient angles and local translate per joint.
+            Translate is None for roots, since their parent's position is unknown.
+    """
+    parentFrames = parentFrames or {}
+
+    firstChild = [None] * len(positions)
+    for index, parent in enumerate(parents):
+        if parent is not None and firstChild[parent] is None:
+            firstChild[parent] = index
+
+    frames = []
+    jointOrients = []
+    translates = []
+
+    for index, position in enumerate(positions):
+        parent = parents[index]
+        if parent is None:
+            parentFrame = orthonormalize(parentFrames.get(index, IDENTITY))
+        else:
+            parentFrame = frames[parent]
+
+        frame = None
+        if firstChild[index] is not None:
+            frame = getAimFrame(subtract(positions[firstChild[index]], position), up)
+        if frame is None:
+            frame = parentFrame
+
+        # Local rotation is world times the parent's inverse, which is its transpose.
+        parentInverse = transpose(parentFrame)
+        frames.append(frame)
+        jointOrients.append(matrixToEuler(multiply(frame, parentInverse)))
+
+        if parent is None:
+            translates.append(None)
+        else:
+            translates.append(transformVector(subtract(position, positions[parent]), parentInverse))
+
+    return frames, jointOrients, translates
+
+
+def getLocalRotation(rotate, rotateAxis, jointOrient, rotateOrder='xyz'):
+    """Get a joint's local rotation, which is rotateAxis * rotate * jointOrient."""
+    matrix = multiply(eulerToMatrix(rotateAxis), eulerToMatrix(rotate, rotateOrder))
+
+    return multiply(matrix, eulerToMatrix(jointOrient))
+
+
+def packRotation(rotate, rotateAxis, jointOrient, rotateOrder='xyz'):
+    """Get the joint orient holding the whole local rotation, once rotate and rotateAxis are zeroed.
+
+    Returns:
+        list: joint orient euler angles.
+    """
+    return matrixToEuler(getLocalRotation(rotate, rotateAxis, jointOrient, rotateOrder))
+
+
+def getCompensatedOrient(worldRotation, parentFrame, rotate, rotateAxis, rotateOrder='xyz'):
+    """Get the joint orient that keeps a joint's world rotation under a new parent frame.
+
+    Returns:
+        list: joint orient euler angles.
+    """
+    local = multiply(worldRotation, transpose(parentFrame))
+    rotation = multiply(eulerToMatrix(rotateAxis), eulerToMatrix(rotate, rotateOrder))
+
+    return matrixToEuler(multiply(transpose(rotation), local))
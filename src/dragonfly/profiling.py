@@ -0,0 +1,228 @@
+"""Count and time the Maya calls made by dragonfly tool operations.
+
+Tracking is off until enable() is called, or DRAGONFLY_TRACK_CALLS is set in the
+environment with DRAGONFLY_CALL_REPORTS optionally naming a report directory.
+
+While a decorated tool runs, the cmds and OpenMaya globals of the dragonfly
+modules are swapped for recording proxies, so every cmds command, OpenMaya
+function set construction and static call like MGlobal.selectByName is counted
+and timed per call site. Each invocation then logs a summary line and, when a
+report directory is set, writes a JSON report.
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import time
+
+from maya.api import OpenMaya
+from maya import cmds
+
+
+LOG = logging.getLogger(__name__)
+
+# Module globals replaced by recording proxies while an operation is tracked.
+TRACKED_GLOBALS = {'cmds': cmds, 'OpenMaya': OpenMaya}
+TRACKED_MODULES = [
+    'dragonfly.tools.design',
+    'dragonfly.joints',
+    'dragonfly.transforms',
+    'dragonfly.modifier',
+]
+
+# Number of call sites listed in summaries, slowest first.
+SLOWEST_SITES = 5
+
+_settings = {
+    'enabled': bool(os.environ.get('DRAGONFLY_TRACK_CALLS')),
+    'reportDirectory': os.environ.get('DRAGONFLY_CALL_REPORTS') or None,
+}
+
+# Trackers of the operations currently running, nested operations report into the outermost one.
+_active = []
+
+
+def enable(reportDirectory=None):
+    """Start tracking tool operations, writing a JSON report per operation to reportDirectory when given."""
+    _settings['enabled'] = True
+    _settings['reportDirectory'] = reportDirectory
+
+
+def disable():
+    _settings['enabled'] = False
+    _settings['reportDirectory'] = None
+
+
+def isEnabled():
+    return _settings['enabled']
+
+
+class CallStats(object):
+    __slots__ = ['count', 'totalTime', 'maxTime']
+
+    def __init__(self):
+        self.count = 0
+        self.totalTime = 0.0
+        self.maxTime = 0.0
+
+    def add(self, duration):
+        self.count += 1
+        self.totalTime += duration
+        self.maxTime = max(self.maxTime, duration)
+
+
+class CallTracker(object):
+    """Records the Maya calls made by dragonfly modules while the block runs."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = {}
+        self.duration = 0.0
+        self._startTime = None
+        self._patched = []
+
+    def __enter__(self):
+        for moduleName in TRACKED_MODULES:
+            module = sys.modules.get(moduleName)
+            if module is None:
+                continue
+
+            for globalName, original in TRACKED_GLOBALS.items():
+                if getattr(module, globalName, None) is original:
+                    setattr(module, globalName, _RecordingProxy(original, globalName, self))
+                    self._patched.append((module, globalName, original))
+
+        self._startTime = time.time()
+
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.duration = time.time() - self._startTime
+
+        for module, globalName, original in self._patched:
+            setattr(module, globalName, original)
+        self._patched = []
+
+    def record(self, apiName, site, duration):
+        key = (apiName, site)
+
+        stats = self.calls.get(key)
+        if stats is None:
+            stats = self.calls[key] = CallStats()
+
+        stats.add(duration)
+
+    def getSummary(self):
+        """Get the totals per API name and the slowest call sites.
+
+        Returns:
+            dict
+        """
+        apis = {}
+        for (apiName, site), stats in self.calls.items():
+            api = apis.setdefault(apiName, {'count': 0, 'time': 0.0})
+            api['count'] += stats.count
+            api['time'] += stats.totalTime
+
+        sites = sorted(self.calls.items(), key=lambda item: item[1].totalTime, reverse=True)
+
+        return {
+            'name': self.name,
+            'duration': self.duration,
+            'callCount': sum(s.count for s in self.calls.values()),
+            'callTime': sum(s.totalTime for s in self.calls.values()),
+            'apis': apis,
+            'slowestSites': [
+                {'api': apiName, 'site': site, 'count': s.count, 'time': s.totalTime, 'maxTime': s.maxTime}
+                for (apiName, site), s in sites[:SLOWEST_SITES]],
+        }
+
+    def log(self, summary=None):
+        summary = summary or self.getSummary()
+
+        slowest = ', '.join(
+            '{api} at {site} x{count} {time:.3f}s'.format(**s) for s in summary['slowestSites'])
+        LOG.info('{name} made {callCount} Maya calls taking {callTime:.3f}s of {duration:.3f}s. Slowest: {slowest}'.format(
+            slowest=slowest or 'none', **summary))
+
+    def writeReport(self, directory, summary=None):
+        """Write the summary as JSON in directory.
+
+        Returns:
+            str: path of the report.
+        """
+        summary = summary or self.getSummary()
+
+        fileName = '{0}_{1}.json'.format(self.name, time.strftime('%Y%m%d_%H%M%S'))
+        filePath = os.path.join(directory, fileName)
+
+        with open(filePath, 'w') as fp:
+            json.dump(summary, fp, indent=2, sort_keys=True)
+
+        return filePath
+
+
+class _RecordingProxy(object):
+    """Stands in for a module or class, recording calls to it and to its callable attributes."""
+
+    def __init__(self, target, apiName, tracker):
+        self._target = target
+        self._apiName = apiName
+        self._tracker = tracker
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value):
+            return value
+
+        proxy = _RecordingProxy(value, '{0}.{1}'.format(self._apiName, name), self._tracker)
+        # Cache the proxy, the next lookup will not reach __getattr__.
+        setattr(self, name, proxy)
+
+        return proxy
+
+    def __call__(self, *args, **kwargs):
+        caller = sys._getframe(1)
+        site = '{0}:{1}'.format(os.path.basename(caller.f_code.co_filename), caller.f_lineno)
+
+        start = time.time()
+        try:
+            return self._target(*args, **kwargs)
+        finally:
+            self._tracker.record(self._apiName, site, time.time() - start)
+
+
+def trackCalls(func):
+    """Track the Maya calls of a tool method when tracking is enabled.
+
+    Extra arguments sent by Qt signals, like the checked state of a button, are
+    dropped when the method does not take them.
+    """
+    argSpec = inspect.getargspec(func)
+    maxArgs = None if argSpec.varargs else len(argSpec.args)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        args = (self,) + args
+        if maxArgs is not None:
+            args = args[:maxArgs]
+
+        if not _settings['enabled'] or _active:
+            return func(*args, **kwargs)
+
+        tracker = CallTracker('{0}.{1}'.format(type(self).__name__, func.__name__))
+        _active.append(tracker)
+        try:
+            with tracker:
+                return func(*args, **kwargs)
+        finally:
+            _active.pop()
+
+            summary = tracker.getSummary()
+            tracker.log(summary)
+            if _settings['reportDirectory']:
+                tracker.writeReport(_settings['reportDirectory'], summary)
+
+    return wrapper
@@ -0,0 +1,514 @@
+"""Discover rig task packages and build task instances in dependency order.
+
+A task package is a `<Name>.task` folder in the tasks directory, holding a
+config.yaml that describes its properties and a build.py with a build(task)
+function. Packages are discovered once per directory and their schemas cached.
+
+A task instance drives its bone, every other node it references is an input.
+So a task is built after every task driving one of its input nodes.
+
+Builds can be incremental: each task is fingerprinted from its package, its
+property values and the outputs of its upstream tasks. A manifest keeps the
+fingerprint and created nodes and attributes per task, so only tasks whose
+fingerprint changed are torn down and built again.
+"""
+import collections
+import hashlib
+import imp
+import json
+import logging
+import os
+import time
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from maya import cmds
+
+from dragonfly import modifier, node
+
+
+LOG = logging.getLogger(__name__)
+
+TASKS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tasks')
+TASK_EXTENSION = '.task'
+CONFIG_FILE = 'config.yaml'
+BUILD_FILE = 'build.py'
+
+MANIFEST_VERSION = 1
+MANIFEST_NODE = 'dragonflyManifest'
+MANIFEST_ATTR = 'manifest'
+
+# Discovered task types per tasks directory.
+_taskTypes = {}
+
+
+def getHash(*values):
+    """Get a stable hash of JSON serializable values."""
+    return hashlib.sha1(json.dumps(values, sort_keys=True)).hexdigest()
+
+
+class Property(object):
+    """A task property and its schema."""
+    __slots__ = ['name', 'description', 'type', 'required', 'default', 'min', 'max', 'properties']
+
+    def __init__(self, name, schema, description=None):
+        self.name = name
+        self.description = description
+        self.type = schema.get('type')
+        self.required = schema.get('required', False)
+        self.default = schema.get('default')
+        self.min = schema.get('minimum')
+        self.max = schema.get('maximum')
+        self.properties = [Property(k, v) for k, v in sorted(schema.get('properties', {}).items())]
+
+    def validate(self, value, path=None):
+        """Check a value against the schema, filling in defaults.
+
+        Returns:
+            the validated value.
+        """
+        path = path or self.name
+
+        if value is None:
+            if self.required:
+                raise ValueError('Missing required property {0}.'.format(path))
+            if self.type != 'object':
+                return self.default
+            value = {}
+
+        if self.type == 'node':
+            if not isinstance(value, basestring):
+                raise TypeError('Property {0} must be a node name, got {1!r}.'.format(path, value))
+
+        elif self.type == 'bool':
+            if not isinstance(value, bool):
+                raise TypeError('Property {0} must be a bool, got {1!r}.'.format(path, value))
+
+        elif self.type in ('float', 'int'):
+            if isinstance(value, bool) or not isinstance(value, (int, long, float)):
+                raise TypeError('Property {0} must be a number, got {1!r}.'.format(path, value))
+            if self.min is not None and value < self.min or self.max is not None and value > self.max:
+                raise ValueError('Property {0} must be between {1} and {2}, got {3}.'.format(path, self.min, self.max, value))
+            value = float(value) if self.type == 'float' else int(value)
+
+        elif self.type == 'string':
+            if not isinstance(value, basestring):
+                raise TypeError('Property {0} must be a string, got {1!r}.'.format(path, value))
+
+        elif self.type == 'object':
+            if not isinstance(value, dict):
+                raise TypeError('Property {0} must be a mapping, got {1!r}.'.format(path, value))
+            value = dict(
+                (p.name, p.validate(value.get(p.name), '{0}.{1}'.format(path, p.name)))
+                for p in self.properties)
+
+        return value
+
+    def getNodeReferences(self, value):
+        """Get the node names referenced by a validated value.
+
+        Returns:
+            list
+        """
+        if self.type == 'node':
+            return [value] if value is not None else []
+
+        if self.type == 'object':
+            result = []
+            for p in self.properties:
+                result.extend(p.getNodeReferences(value.get(p.name)))
+            return result
+
+        return []
+
+
+class TaskType(object):
+    """A discovered task package."""
+
+    def __init__(self, path, config, fingerprint=None):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.title = config.get('title', self.name)
+        self.category = config.get('category')
+        self.properties = collections.OrderedDict(
+            (p['name'], Property(p['name'], p.get('schema', {}), p.get('description')))
+            for p in config.get('properties', []))
+        self.fingerprint = fingerprint or getHash(config)
+        self._build = None
+
+    @classmethod
+    def fromPath(cls, path):
+        if yaml is None:
+            raise ImportError('PyYAML is required to read task configs.')
+
+        with open(os.path.join(path, CONFIG_FILE), 'rb') as fp:
+            configData = fp.read()
+        with open(os.path.join(path, BUILD_FILE), 'rb') as fp:
+            buildData = fp.read()
+
+        # Editing either file changes the fingerprint of every instance.
+        fingerprint = hashlib.sha1(configData + b'\0' + buildData).hexdigest()
+
+        return cls(path, yaml.safe_load(configData) or {}, fingerprint)
+
+    def getBuild(self):
+        """Get the build function, importing build.py on first use."""
+        if self._build is None:
+            module = imp.load_source('dragonfly_task_{0}'.format(self.name), os.path.join(self.path, BUILD_FILE))
+            self._build = module.build
+
+        return self._build
+
+
+def getTaskTypes(directory=TASKS_DIRECTORY, reload=False):
+    """Get the task packages of a directory, discovered on first call.
+
+    Returns:
+        dict: task type per name.
+    """
+    directory = os.path.abspath(directory)
+
+    if reload or directory not in _taskTypes:
+        start = time.time()
+
+        taskTypes = {}
+        for fileName in sorted(os.listdir(directory)):
+            path = os.path.join(directory, fileName)
+            if fileName.endswith(TASK_EXTENSION) and os.path.isdir(path):
+                taskType = TaskType.fromPath(path)
+                taskTypes[taskType.name] = taskType
+
+        _taskTypes[directory] = taskTypes
+        LOG.info('Discovered {0} task types in {1:.3f}s.'.format(len(taskTypes), time.time() - start))
+
+    return _taskTypes[directory]
+
+
+class Task(object):
+    """A task instance, with property values validated against its task type.
+
+    Items give the property values, with node properties resolved to Node
+    objects, plus the instance's title and bone.
+    """
+
+    def __init__(self, taskType, title, bone, values):
+        self.taskType = taskType
+        self.title = title
+        self.bone = bone
+        self.values = values
+        self.nodes = []
+        self.attributes = []
+        self._resolved = {}
+
+    @classmethod
+    def fromData(cls, data, taskTypes=None):
+        """Create a validated task from a description like
+        {'type': 'CopyScale', 'title': 'armScale', 'bone': 'arm_jnt', 'properties': {...}}.
+        """
+        if taskTypes is None:
+            taskTypes = getTaskTypes()
+
+        taskType = taskTypes.get(data.get('type'))
+        if taskType is None:
+            raise ValueError('Unknown task type: {0}'.format(data.get('type')))
+
+        title = data.get('title', taskType.name)
+        bone = data.get('bone')
+        if not isinstance(bone, basestring):
+            raise TypeError('Task {0} needs the name of the bone it drives.'.format(title))
+
+        properties = data.get('properties', {})
+        unknown = set(properties) - set(taskType.properties)
+        if unknown:
+            raise ValueError('Task {0} has unknown properties: {1}'.format(title, ', '.join(sorted(unknown))))
+
+        values = dict(
+            (name, p.validate(properties.get(name), '{0}.{1}'.format(title, name)))
+            for name, p in taskType.properties.items())
+
+        return cls(taskType, title, bone, values)
+
+    def __repr__(self):
+        return 'Task({0!r}, {1!r})'.format(self.taskType.name, self.title)
+
+    def __getitem__(self, name):
+        if name == 'title':
+            return self.title
+        if name == 'bone':
+            return self.getNode(self.bone)
+
+        if self.taskType.properties[name].type == 'node':
+            return self.getNode(self.values[name])
+
+        return self.values[name]
+
+    def getNode(self, name):
+        n = self._resolved.get(name)
+        if n is None:
+            n = self._resolved[name] = node.Node(name)
+
+        return n
+
+    def getProperty(self, name):
+        return self.taskType.properties[name]
+
+    def getInputs(self):
+        """Get the names of the nodes this task reads, other than its bone.
+
+        Returns:
+            set
+        """
+        result = set()
+        for name, p in self.taskType.properties.items():
+            result.update(p.getNodeReferences(self.values[name]))
+        result.discard(self.bone)
+
+        return result
+
+    def createNode(self, nodeType, name=None):
+        """Create a node owned by the task, torn down with it.
+
+        Unnamed nodes are named after the task, so rebuilds give the same names.
+        """
+        if name is None:
+            name = '{0}_{1}{2}'.format(self.title, nodeType, len(self.nodes) + 1)
+
+        n = node.createNode(nodeType, name)
+        self.nodes.append(n.fullPath)
+
+        return n
+
+    def addAttr(self, n, longName, **kwargs):
+        """Add a dynamic attribute owned by the task to a node, removed when the task is torn down."""
+        cmds.addAttr(n.fullPath, ln=longName, **kwargs)
+        self.attributes.append('{0}.{1}'.format(n.fullPath, longName))
+
+        return n[longName]
+
+    def getFingerprint(self, upstreamOutputs=()):
+        return getHash(self.taskType.fingerprint, self.bone, self.values, sorted(upstreamOutputs))
+
+    def build(self):
+        self.nodes = []
+        self.attributes = []
+
+        self.taskType.getBuild()(self)
+
+
+def loadTasks(descriptions, taskTypes=None):
+    """Create and validate the tasks of a rig description.
+
+    Returns:
+        list
+    """
+    start = time.time()
+
+    if taskTypes is None:
+        taskTypes = getTaskTypes()
+    tasks = [Task.fromData(d, taskTypes) for d in descriptions]
+
+    titles = set()
+    for t in tasks:
+        if t.title in titles:
+            raise ValueError('Task titles must be unique, {0} is used twice.'.format(t.title))
+        titles.add(t.title)
+
+    LOG.info('Validated {0} tasks in {1:.3f}s.'.format(len(tasks), time.time() - start))
+
+    return tasks
+
+
+def getDependencies(tasks):
+    """Get the tasks each task depends on, being the tasks driving its input nodes.
+
+    Returns:
+        list: set of task indices per task.
+    """
+    drivers = collections.defaultdict(list)
+    for index, t in enumerate(tasks):
+        drivers[t.bone].append(index)
+
+    dependencies = []
+    for index, t in enumerate(tasks):
+        upstream = set()
+        for name in t.getInputs():
+            upstream.update(drivers.get(name, []))
+        upstream.discard(index)
+        dependencies.append(upstream)
+
+    return dependencies
+
+
+def getBuildOrder(tasks, dependencies=None):
+    """Sort tasks so every task comes after the tasks it depends on, keeping the given order otherwise.
+
+    Returns:
+        list
+    """
+    if dependencies is None:
+        dependencies = getDependencies(tasks)
+
+    dependents = [[] for t in tasks]
+    remaining = []
+    for index, upstream in enumerate(dependencies):
+        remaining.append(len(upstream))
+        for u in upstream:
+            dependents[u].append(index)
+
+    ready = collections.deque(i for i, count in enumerate(remaining) if not count)
+    order = []
+    while ready:
+        index = ready.popleft()
+        order.append(index)
+
+        for d in dependents[index]:
+            remaining[d] -= 1
+            if not remaining[d]:
+                ready.append(d)
+
+    if len(order) != len(tasks):
+        cycle = [tasks[i].title for i, count in enumerate(remaining) if count]
+        raise ValueError('Tasks depend on each other in a cycle: {0}'.format(', '.join(cycle)))
+
+    return [tasks[i] for i in order]
+
+
+class Manifest(object):
+    """Fingerprint, output hash and created nodes and attributes per built task title.
+
+    Stored in a sidecar JSON file, or on a scene node when no path is given.
+    """
+
+    def __init__(self, tasks=None):
+        self.tasks = tasks or {}
+
+    @classmethod
+    def load(cls, path=None):
+        if path is None:
+            if not cmds.objExists(MANIFEST_NODE):
+                return cls()
+            data = cmds.getAttr('{0}.{1}'.format(MANIFEST_NODE, MANIFEST_ATTR)) or '{}'
+            data = json.loads(data)
+        elif os.path.exists(path):
+            with open(path) as fp:
+                data = json.load(fp)
+        else:
+            return cls()
+
+        if data.get('version') != MANIFEST_VERSION:
+            LOG.warning('Ignoring manifest of another version, every task will be built.')
+            return cls()
+
+        return cls(data['tasks'])
+
+    def save(self, path=None):
+        data = {'version': MANIFEST_VERSION, 'tasks': self.tasks}
+
+        if path is not None:
+            with open(path, 'w') as fp:
+                json.dump(data, fp, sort_keys=True)
+            return
+
+        if not cmds.objExists(MANIFEST_NODE):
+            cmds.createNode('network', name=MANIFEST_NODE)
+            cmds.addAttr(MANIFEST_NODE, ln=MANIFEST_ATTR, dt='string')
+        cmds.setAttr('{0}.{1}'.format(MANIFEST_NODE, MANIFEST_ATTR), json.dumps(data, sort_keys=True), type='string')
+
+    def isBuilt(self, title, fingerprint):
+        """Whether the task was built with this fingerprint and its outputs still exist."""
+        record = self.tasks.get(title)
+        if record is None or record['fingerprint'] != fingerprint:
+            return False
+
+        return all(cmds.objExists(n) for n in record['nodes'] + record['attributes'])
+
+    def add(self, t, fingerprint):
+        record = self.tasks[t.title] = {
+            'type': t.taskType.name,
+            'fingerprint': fingerprint,
+            'outputHash': getHash(t.nodes, t.attributes),
+            'nodes': t.nodes,
+            'attributes': t.attributes,
+        }
+
+        return record
+
+    def tearDown(self, title):
+        """Delete the nodes and attributes a task created, and forget it."""
+        record = self.tasks.pop(title, None)
+        if record is None:
+            return
+
+        for attr in record['attributes']:
+            if cmds.objExists(attr):
+                cmds.deleteAttr(attr)
+
+        nodes = [n for n in record['nodes'] if cmds.objExists(n)]
+        if nodes:
+            cmds.delete(nodes)
+
+
+def buildTasks(tasks, manifest=None):
+    """Build tasks in dependency order as one undo step, with their connections made in one batch.
+
+    With a manifest, only tasks whose fingerprint changed are torn down and built
+    again, and tasks no longer in the list are torn down. The manifest is updated
+    in place.
+
+    Returns:
+        list: the tasks that were built.
+    """
+    start = time.time()
+
+    dependencies = getDependencies(tasks)
+    ordered = getBuildOrder(tasks, dependencies)
+    upstreamTasks = dict((t.title, [tasks[i].title for i in d]) for t, d in zip(tasks, dependencies))
+
+    if manifest is None:
+        manifest = Manifest()
+
+    built = []
+    outputHashes = {}
+
+    with modifier.undoChunk('dragonflyBuildTasks'):
+        titles = set(t.title for t in tasks)
+        for title in [k for k in manifest.tasks if k not in titles]:
+            manifest.tearDown(title)
+
+        with node.batch():
+            for t in ordered:
+                fingerprint = t.getFingerprint(outputHashes[u] for u in upstreamTasks[t.title])
+
+                if manifest.isBuilt(t.title, fingerprint):
+                    outputHashes[t.title] = manifest.tasks[t.title]['outputHash']
+                    continue
+
+                manifest.tearDown(t.title)
+                t.build()
+                outputHashes[t.title] = manifest.add(t, fingerprint)['outputHash']
+                built.append(t)
+
+    LOG.info('Built {0} of {1} tasks in {2:.3f}s.'.format(len(built), len(ordered), time.time() - start))
+
+    return built
+
+
+def run(descriptions, directory=TASKS_DIRECTORY, manifestPath=None, incremental=True):
+    """Load, validate and build the tasks of a rig description.
+
+    When incremental, the manifest is read from manifestPath, or the scene when
+    None, and only changed tasks are built. The updated manifest is saved back.
+
+    Returns:
+        list: the tasks that were built, in build order.
+    """
+    tasks = loadTasks(descriptions, getTaskTypes(directory))
+
+    manifest = Manifest.load(manifestPath) if incremental else Manifest()
+    built = buildTasks(tasks, manifest)
+    manifest.save(manifestPath)
+
+    return built
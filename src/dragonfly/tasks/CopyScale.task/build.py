@@ -1,34 +1,37 @@
-from maya import cmds
+from dragonfly import node
+
 
 def build(task):
+    bone = task['bone']
+
     # Create envelope attribute node.
-    envelope = task['envelope']
+    envelope = task.getProperty('influence')
     envelopeAttr = '{0}Envelope'.format(task['title'])
-    cmds.addAttr(task.bone, ln=envelopeAttr, at='float', min=envelope.min, max=envelope.max, default=envelope.default)
-    envelopeNode = cmds.createNode('multiplyDivide')
+    task.addAttr(bone, envelopeAttr, at='float', min=envelope.min, max=envelope.max, default=task['influence'])
+    envelopeNode = task.createNode('multiplyDivide')
 
     # Create power attribute node.
-    envelope = task['power']
+    power = task.getProperty('power')
     powerAttr = '{0}Power'.format(task['title'])
-    cmds.addAttr(task['bone'], ln=powerAttr, at='float', min=power.min, max=power.max, default=power.default)
-    powerNode = cmds.createNode('multiplyDivide')
-
-    # Connect node attributes from target to bone.
-    task['bone'][powerAttr].connect(powerNode.input1)
-    task['target'].scale.connect(powerNode.input2)
-    
-    task['bone'][envelopeAttr].connect(envelopeNode.input1)
-    powerNode.output.connect(envelopeNode.input2)
-    
-    # Connect envelope to the bone, if the axis is enabled.
-    if task['axes']['xAxis']:
-        envelopeNode.output.connect(task['bone'].scaleX)
-
-    if task['axes']['yAxis']:
-        envelopeNode.output.connect(task['bone'].scaleY)
-
-    if task['axes']['zAxis']:
-        envelopeNode.output.connect(task['bone'].scaleZ)
-    
-
-    
\ No newline at end of file
+    task.addAttr(bone, powerAttr, at='float', min=power.min, max=power.max, default=task['power'])
+    powerNode = task.createNode('multiplyDivide')
+
+    with node.batch():
+        # Connect node attributes from target to bone, the float attributes drive each axis of the float3 inputs.
+        for axis in 'XYZ':
+            bone[powerAttr].connect(powerNode['input1' + axis])
+        task['target'].scale.connect(powerNode.input2)
+
+        for axis in 'XYZ':
+            bone[envelopeAttr].connect(envelopeNode['input1' + axis])
+        powerNode.output.connect(envelopeNode.input2)
+
+        # Connect envelope to the bone, if the axis is enabled.
+        if task['axes']['xAxis']:
+            envelopeNode.outputX.connect(bone.scaleX)
+
+        if task['axes']['yAxis']:
+            envelopeNode.outputY.connect(bone.scaleY)
+
+        if task['axes']['zAxis']:
+            envelopeNode.outputZ.connect(bone.scaleZ)
@@ -8,7 +8,7 @@ from maya import OpenMayaUI, cmds
 from shiboken2 import wrapInstance
 from PySide2 import QtWidgets, QtCore
 
-from dragonfly import transforms, joints
+from dragonfly import transforms, joints, modifier, orient, profiling
 
 
 LOG = logging.getLogger(__name__)
@@ -94,6 +94,7 @@ class GeneralToolsWidget(QtWidgets.QWidget):
         self.selectChildrenButton.clicked.connect(self.selectChildren)
 
 
+    @profiling.trackCalls
     def freezeScales(self):
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
         
@@ -108,6 +109,7 @@ class GeneralToolsWidget(QtWidgets.QWidget):
 
         OpenMaya.MGlobal.setActiveSelectionList(selectionList)
 
+    @profiling.trackCalls
     def freezePivots(self):
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
 
@@ -134,6 +136,7 @@ class GeneralToolsWidget(QtWidgets.QWidget):
 
             nodeTransform.setTranslation(OpenMaya.MVector(pos), OpenMaya.MSpace.kWorld)
 
+    @profiling.trackCalls
     def parentSelected(self):
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
 
@@ -163,60 +166,78 @@ class GeneralToolsWidget(QtWidgets.QWidget):
             LOG.exception('Parent relationship already setup.')
 
 
+    @profiling.trackCalls
     def createOffset(self):
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
 
+        dagModifier = modifier.DagModifier()
+
         for index in range(selectionList.length()):
             node = selectionList.getDependNode(index)
             nodePath = selectionList.getDagPath(index)
-            
-            offset = OpenMaya.MFnDependencyNode().create('transform')
-            offsetPath = OpenMaya.MFnDagNode(offset).getPath()
 
+            parent = OpenMaya.MFnDagNode(nodePath).parent(0)
+            if not parent.hasFn(OpenMaya.MFn.kTransform):
+                parent = None
 
-            offsetTransform = OpenMaya.MFnTransform(offsetPath)
-            nodeTransform = OpenMaya.MFnTransform(nodePath)
+            # The offset takes over the node's local transformation, and the node is zeroed under it.
+            localMatrix = OpenMaya.MTransformationMatrix(nodePath.inclusiveMatrix() * nodePath.exclusiveMatrixInverse())
+            localRotation = localMatrix.rotation()
 
-            ws = OpenMaya.MSpace.kWorld
-            offsetTransform.setTranslation(nodeTransform.translation(ws), ws)
-            offsetTransform.setRotation(nodeTransform.rotation(ws, asQuaternion=True), ws)
-            offsetTransform.setScale(nodeTransform.scale())
+            offset = dagModifier.createNode('transform', parent)
+            dagModifier.setDoubles(offset, 'translate', localMatrix.translation(OpenMaya.MSpace.kTransform))
+            dagModifier.setAngles(offset, 'rotate', [localRotation.x, localRotation.y, localRotation.z])
+            dagModifier.setDoubles(offset, 'scale', localMatrix.scale(OpenMaya.MSpace.kTransform))
 
-            dagNode = OpenMaya.MFnDagNode(nodePath)
-            parent = dagNode.parent(0)
-            if parent.hasFn(OpenMaya.MFn.kTransform):
-                cmds.parent(offsetPath.fullPathName(), OpenMaya.MFnDagNode(parent).fullPathName())
-            
-            cmds.parent(nodePath.fullPathName(), offsetPath.fullPathName())
+            dagModifier.reparent(node, offset)
+            dagModifier.setDoubles(node, 'translate', [0, 0, 0])
+            dagModifier.setAngles(node, 'rotate', [0, 0, 0])
+            dagModifier.setAngles(node, 'rotateAxis', [0, 0, 0])
+            dagModifier.setDoubles(node, 'scale', [1, 1, 1])
+            if node.hasFn(OpenMaya.MFn.kJoint):
+                dagModifier.setAngles(node, 'jointOrient', [0, 0, 0])
 
+                # The offset is not a joint, so the old parent's scale no longer needs compensating.
+                inverseScalePlug = modifier.getPlug(node, 'inverseScale')
+                if inverseScalePlug.isDestination:
+                    dagModifier.disconnect(inverseScalePlug.source(), inverseScalePlug)
+
+        dagModifier.doIt()
+
+    @profiling.trackCalls
     def parentSelectedInOrder(self):
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
-        nodeNames = selectionList.getSelectionStrings()
+        nodes = [selectionList.getDependNode(index) for index in range(selectionList.length())]
 
-        for nodeName in nodeNames:
-            cmds.parent(nodeName, world=True)
+        with modifier.undoChunk('parentSelectedInOrder'):
+            parented = [n for n in nodes if transforms.getParent(n) is not None]
+            if parented:
+                cmds.parent(*transforms.getPathNames(parented), world=True)
 
-        for index in reversed(range(1, selectionList.length())):
-            parent = nodeNames[index - 1] 
-            child = nodeNames[index]
-            cmds.parent(child, parent)
+            for index in reversed(range(1, len(nodes))):
+                cmds.parent(*transforms.getPathNames([nodes[index], nodes[index - 1]]))
 
+    @profiling.trackCalls
     def selectChildren(self):
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
         
         newSelectionList = OpenMaya.MSelectionList()
 
+        # Shared between selected nodes, so overlapping hierarchies are only walked once.
+        jointIndex = transforms.HierarchyIndex(OpenMaya.MFn.kJoint)
+        transformIndex = transforms.HierarchyIndex()
+
         for index in range(selectionList.length()):
             depNode = selectionList.getDependNode(index)
             
             if depNode.hasFn(OpenMaya.MFn.kJoint):
                 newSelectionList.add(depNode)
-                for child in joints.getAllChild(depNode):
+                for child in joints.getAllChild(depNode, jointIndex):
                     newSelectionList.add(child)
 
             if depNode.hasFn(OpenMaya.MFn.kTransform):
                 newSelectionList.add(depNode)
-                for child in transforms.getAllChildTransforms(depNode):
+                for child in transforms.getAllChildTransforms(depNode, transformIndex):
                     newSelectionList.add(child)
 
         for name in newSelectionList.getSelectionStrings():
@@ -259,12 +280,15 @@ class JointToolsWidget(QtWidgets.QWidget):
         self.insertNumJointButton.clicked.connect(self.insertNumJoints)
         self.toggleSSCButton.clicked.connect(self.toggleSSC)
 
+    @profiling.trackCalls
     def createNewJoint(self):
         OpenMaya.MGlobal.executeCommandOnIdle('JointTool')
 
+    @profiling.trackCalls
     def insertNewJoint(self):
         OpenMaya.MGlobal.executeCommandOnIdle('InsertJointTool')
 
+    @profiling.trackCalls
     def centerSelectedJoint(self):
         """Center a joint between 2 other joints.
 
@@ -328,47 +352,94 @@ class JointToolsWidget(QtWidgets.QWidget):
                 ws=True
             )
 
+    @profiling.trackCalls
     def insertNumJoints(self):
         count = self.insertNumJointField.value()
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
+
+        dagModifier = modifier.DagModifier()
+        newJoints = []
+
         for index in range(selectionList.length()):
             depNode = selectionList.getDependNode(index)
             dagPath = selectionList.getDagPath(index)
             dagNode = OpenMaya.MFnDagNode(dagPath)
 
-            if not dagNode.parent(0).hasFn(OpenMaya.MFn.kTransform):
+            parentObject = dagNode.parent(0)
+            if not parentObject.hasFn(OpenMaya.MFn.kTransform):
                 LOG.exception('Parent is not a transform, cannot insert more joints.')
-                return
+                continue
 
-            parent = OpenMaya.MFnDagNode(dagNode.parent(0)).getPath()
+            parent = OpenMaya.MFnDagNode(parentObject).getPath()
             parentWorldPosition = OpenMaya.MFnTransform(parent).translation(OpenMaya.MSpace.kWorld)
 
             jntWorldPosition = OpenMaya.MFnTransform(dagPath).translation(OpenMaya.MSpace.kWorld)
 
-            joints = [parent]
+            # The first inserted joint is offset in the parent's world frame, minus the parent's scale
+            # which is compensated by inverseScale.
+            frame = parent.inclusiveMatrix()
+            if parentObject.hasFn(OpenMaya.MFn.kJoint):
+                sx, sy, sz = OpenMaya.MFnTransform(parent).scale()
+                frame = OpenMaya.MMatrix([1.0 / sx, 0, 0, 0, 0, 1.0 / sy, 0, 0, 0, 0, 1.0 / sz, 0, 0, 0, 0, 1]) * frame
+            frameInverse = frame.inverse()
 
+            positions = []
             for i in range(count):
                 position = (jntWorldPosition - parentWorldPosition) * (float(i+1)/float(count+1)) + parentWorldPosition
+                positions.append([position.x, position.y, position.z])
+
+            if not count:
+                continue
+
+            # Solve the inserted chain and the selected joint at its end in one pass, new joints aim down the chain.
+            positions.append([jntWorldPosition.x, jntWorldPosition.y, jntWorldPosition.z])
+            parents = [None] + list(range(count))
+            frames, jointOrients, translates = orient.orientChain(
+                positions, parents, parentFrames={0: joints.getRotationRows(frame)})
+
+            isJoint = depNode.hasFn(OpenMaya.MFn.kJoint)
+            if not isJoint:
+                # Other transforms can only keep their rotation under unoriented joints, offset in the parent's frame.
+                points = [parentWorldPosition] + [OpenMaya.MVector(*p) for p in positions]
+                translates = [(b - a) * frameInverse for a, b in zip(points, points[1:])]
+            translates[0] = (OpenMaya.MVector(*positions[0]) - parentWorldPosition) * frameInverse
+
+            previous = parentObject
 
-                # TODO: Maybe figure out if this can be undone?
-                # newJointName = cmds.createNode('joint')
-                # selList = OpenMaya.MSelectionList()
-                # selList.add(newJointName)
-                # newJoint = selList.getDependNode(0)
-                newJoint = OpenMaya.MFnDependencyNode().create('joint')
+            for i in range(count):
+                newJoint = dagModifier.createNode('joint', previous)
+                dagModifier.setDoubles(newJoint, 'translate', translates[i])
+                if isJoint:
+                    dagModifier.setAngles(newJoint, 'jointOrient', jointOrients[i])
+                if previous.hasFn(OpenMaya.MFn.kJoint):
+                    dagModifier.connect(modifier.getPlug(previous, 'scale'), modifier.getPlug(newJoint, 'inverseScale'))
+
+                newJoints.append(newJoint)
+                previous = newJoint
 
-                newJointPath = OpenMaya.MFnDagNode(newJoint).getPath()
-                
-                OpenMaya.MFnTransform(newJointPath).setTranslation(position, OpenMaya.MSpace.kWorld)
+            # Move the selected node under the last inserted joint, keeping its world transformation.
+            dagModifier.reparent(depNode, previous)
 
-                cmds.parent(newJointPath.fullPathName(), joints[-1].fullPathName())
-                cmds.joint(newJointPath.fullPathName(), e=True, oj='xyz', secondaryAxisOrient='yup', zso=True)
+            if not isJoint:
+                dagModifier.setDoubles(depNode, 'translate', translates[-1])
+                continue
 
-                joints.append(newJointPath)
+            state = joints.JointState(depNode)
+            jointOrient = orient.getCompensatedOrient(
+                state.getWorldRotation(), frames[-2], state.rotate, state.rotateAxis, state.rotateOrder)
+            state.write(translate=translates[-1], jointOrient=jointOrient, dagModifier=dagModifier)
 
-            cmds.parent(dagPath.fullPathName(), joints[-1].fullPathName())
+            inverseScalePlug = modifier.getPlug(depNode, 'inverseScale')
+            if inverseScalePlug.isDestination:
+                dagModifier.disconnect(inverseScalePlug.source(), inverseScalePlug)
+            dagModifier.connect(modifier.getPlug(previous, 'scale'), inverseScalePlug)
 
+        if not newJoints:
+            return
 
+        dagModifier.doIt()
+
+    @profiling.trackCalls
     def toggleSSC(self):
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
         for index in range(selectionList.length()):
@@ -399,12 +470,10 @@ class OrientToolsWidget(QtWidgets.QWidget):
 
         self.addSeparator(mainLayout)
 
-        self.preserveTransformsCheck = QtWidgets.QCheckBox('Preserve Child Transforms')
         self.preserveShapesCheck = QtWidgets.QCheckBox('Preserve Shapes')
         self.incrementField = QtWidgets.QSpinBox()
         self.incrementField.setValue(90)
 
-        mainLayout.addWidget(self.preserveTransformsCheck)
         mainLayout.addWidget(self.preserveShapesCheck)
         mainLayout.addWidget(self.incrementField)
 
@@ -432,11 +501,13 @@ class OrientToolsWidget(QtWidgets.QWidget):
         self.setRotateOrderBox.addItems(self.rotationOrders)
         self.packRotationButton = QtWidgets.QPushButton('Pack Rotation')
         self.orientToWorldButton = QtWidgets.QPushButton('Orient To World')
+        self.orientJointsButton = QtWidgets.QPushButton('Orient Joints')
 
         mainLayout.addWidget(self.includeChildrenCheck)
         mainLayout.addWidget(self.setRotateOrderBox)
         mainLayout.addWidget(self.packRotationButton)
         mainLayout.addWidget(self.orientToWorldButton)
+        mainLayout.addWidget(self.orientJointsButton)
 
         self.setRotateOrderBox.activated.connect(self.setRotateOrder)
         self.transformAttrsButton.clicked.connect(self.toggleTransformAttrs)
@@ -448,6 +519,7 @@ class OrientToolsWidget(QtWidgets.QWidget):
         self.negativeZRotateButton.clicked.connect(lambda x=(0, 0, -1): self.incrementalRotate(x))
         self.positiveZRotateButton.clicked.connect(lambda x=(0, 0, 1): self.incrementalRotate(x))
         self.packRotationButton.clicked.connect(self.packRotation)
+        self.orientJointsButton.clicked.connect(self.orientJoints)
 
     def addSeparator(self, layout):
         frame = QtWidgets.QFrame()
@@ -457,14 +529,31 @@ class OrientToolsWidget(QtWidgets.QWidget):
         layout.addWidget(QtWidgets.QWidget())
         layout.addWidget(frame)
 
+    @profiling.trackCalls
     def packRotation(self):
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
-        preserveChildren = self.preserveTransformsCheck.isChecked()
 
-        for i in range(selectionList.length()):
-            depNode = selectionList.getDependNode(i)
-            joints.packRotation(depNode, preserveChildren)
+        # Packing keeps every joint's local rotation, so children stay in place.
+        joints.packRotations([selectionList.getDependNode(i) for i in range(selectionList.length())])
+
+    @profiling.trackCalls
+    def orientJoints(self):
+        selectionList = OpenMaya.MGlobal.getActiveSelectionList()
+        nodes = [selectionList.getDependNode(i) for i in range(selectionList.length())]
+
+        if self.includeChildrenCheck.isChecked():
+            index = transforms.HierarchyIndex(OpenMaya.MFn.kJoint)
+            keys = set(transforms.getNodeKey(n) for n in nodes)
+            for node in list(nodes):
+                for child in joints.getAllChild(node, index):
+                    key = transforms.getNodeKey(child)
+                    if key not in keys:
+                        keys.add(key)
+                        nodes.append(child)
+
+        joints.orientJoints([n for n in nodes if n.hasFn(OpenMaya.MFn.kJoint)])
 
+    @profiling.trackCalls
     def incrementalRotate(self, axisVector):
         degrees = self.incrementField.value()
 
@@ -478,6 +567,7 @@ class OrientToolsWidget(QtWidgets.QWidget):
             nodeName = OpenMaya.MFnDagNode(depNode).fullPathName()
             cmds.rotate(axis[0], axis[1], axis[2], nodeName, r=True, os=True)
 
+    @profiling.trackCalls
     def toggleLocalAxis(self):
         selectionList = OpenMaya.MGlobal.getActiveSelectionList()
         nodeNames = selectionList.getSelectionStrings()
@@ -486,6 +576,7 @@ class OrientToolsWidget(QtWidgets.QWidget):
             val = cmds.getAttr('{0}.dla'.format(nodeName))
             cmds.setAttr('{0}.dla'.format(nodeName), not(val))
 
+    @profiling.trackCalls
     def toggleTransformAttrs(self):
         attrs = [
             # rotate order
@@ -521,6 +612,7 @@ class OrientToolsWidget(QtWidgets.QWidget):
                     attrName = '{0}.{1}'.format(nodeName, attr)
                     cmds.setAttr(attrName, cb=not(cb))
 
+    @profiling.trackCalls
     def setRotateOrder(self, index):
         index = self.setRotateOrderBox.currentIndex()
 
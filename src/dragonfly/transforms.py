@@ -1,8 +1,12 @@
+import collections
 import logging
 
 from maya.api import OpenMaya
 from maya import cmds
 
+from dragonfly import modifier
+from dragonfly.node import Node
+
 
 LOG = logging.getLogger(__name__)
 
@@ -26,67 +30,199 @@ def getParent(node):
     return parent
 
 
-def getParentNodes(nodes):
-    """Given a list of nodes, returns the top-most level nodes of the list.
+def getNodeKey(node):
+    """Get a hashable key for a node, MObjects themselves cannot be hashed.
+
+    MObjectHandle hash codes are not unique, so the key also compares handles.
 
     Returns:
-        Union[list, OpenMaya.MObject]
+        Node
     """
-    result = []
+    return Node(node)
 
-    for n in nodes:
-        if any([p in nodes for p in getAllParents(n)]):
-            continue
-        result.append(n)
-    
-    return result
 
+class HierarchyIndex(object):
+    """Caches parent and children relationships between DAG nodes of one type.
 
-def getAllParents(node):
-    """Return all parents of the given node.
+    Nodes are keyed by getNodeKey, so once visited, parent and children
+    lookups are dictionary hits instead of new function set queries.
+    Subtrees are indexed in a single pass over the DAG.
+    """
+
+    def __init__(self, fnType=OpenMaya.MFn.kTransform):
+        self.fnType = fnType
+
+        self._objects = {}
+        self._parents = {}
+        self._children = {}
+
+    def add(self, node):
+        key = getNodeKey(node)
+        self._objects[key] = node
+
+        return key
+
+    def getParent(self, node):
+        """Get the first parent of the node, if it matches the index type.
+
+        Returns:
+            OpenMaya.MObject
+        """
+        key = self.add(node)
+
+        if key not in self._parents:
+            parentKey = None
+
+            dagNode = OpenMaya.MFnDagNode(node)
+            if dagNode.parentCount():
+                parent = dagNode.parent(0)
+                if parent.hasFn(self.fnType):
+                    parentKey = self.add(parent)
+
+            self._parents[key] = parentKey
+
+        parentKey = self._parents[key]
+        if parentKey is None:
+            return
+
+        return self._objects[parentKey]
+
+    def getAllParents(self, node):
+        """Return all parents of the node, nearest first.
+
+        Returns:
+            Union[list, OpenMaya.MObject]
+        """
+        result = []
+
+        parent = self.getParent(node)
+        while parent is not None:
+            result.append(parent)
+            parent = self.getParent(parent)
+
+        return result
+
+    def indexChildren(self, node):
+        """Record the children of every node under the given node."""
+        stack = [node]
+
+        while stack:
+            current = stack.pop()
+            key = self.add(current)
+
+            if key in self._children:
+                continue
+
+            dagNode = OpenMaya.MFnDagNode(current)
+
+            childKeys = []
+            for childIndex in range(dagNode.childCount()):
+                child = dagNode.child(childIndex)
+                if not child.hasFn(self.fnType):
+                    continue
+
+                childKey = self.add(child)
+                self._parents[childKey] = key
+                childKeys.append(childKey)
+                stack.append(child)
+
+            self._children[key] = childKeys
+
+    def getChildren(self, node):
+        """Return the direct children of the node.
+
+        Returns:
+            Union[list, OpenMaya.MObject]
+        """
+        self.indexChildren(node)
+
+        return [self._objects[k] for k in self._children[getNodeKey(node)]]
+
+    def getAllChildren(self, node):
+        """Return all children under the node, depth first.
+
+        Returns:
+            Union[list, OpenMaya.MObject]
+        """
+        self.indexChildren(node)
+
+        result = []
+
+        stack = list(reversed(self._children[getNodeKey(node)]))
+        while stack:
+            key = stack.pop()
+            result.append(self._objects[key])
+            stack.extend(reversed(self._children[key]))
+
+        return result
+
+    def getTopNodes(self, nodes):
+        """Given a list of nodes, returns the top-most level nodes of the list.
+
+        Returns:
+            Union[list, OpenMaya.MObject]
+        """
+        keys = set(getNodeKey(n) for n in nodes)
+
+        # Whether a node has one of the given nodes above it, shared between ancestor chains.
+        covered = {}
+
+        result = []
+
+        for n in nodes:
+            chain = []
+            isCovered = False
+
+            parent = self.getParent(n)
+            while parent is not None:
+                parentKey = getNodeKey(parent)
+                if parentKey in keys:
+                    isCovered = True
+                    break
+                if parentKey in covered:
+                    isCovered = covered[parentKey]
+                    break
+                chain.append(parentKey)
+                parent = self.getParent(parent)
+
+            for key in chain:
+                covered[key] = isCovered
+
+            if not isCovered:
+                result.append(n)
+
+        return result
+
+
+def getParentNodes(nodes, index=None):
+    """Given a list of nodes, returns the top-most level nodes of the list.
 
     Returns:
         Union[list, OpenMaya.MObject]
     """
-    dagNode = OpenMaya.MFnDagNode(node)
-
-    parentCount = dagNode.parentCount()
-    
-    parents = []
-    
-    for parentIndex in range(parentCount):
-        parent = dagNode.parent(parentIndex)
-        if not parent.hasFn(OpenMaya.MFn.kTransform):
-            continue
-    
-    result = []
-    
-    if parents:
-        result.append(parent)
-        result.extend(getAllParents(parent))
+    if index is None:
+        index = HierarchyIndex()
 
-    return result
+    return index.getTopNodes(nodes)
 
 
-def getAllChildTransforms(node):
-    dagNode = OpenMaya.MFnDagNode(node)
+def getAllParents(node, index=None):
+    """Return all parents of the given node.
 
-    children = []
+    Returns:
+        Union[list, OpenMaya.MObject]
+    """
+    if index is None:
+        index = HierarchyIndex()
 
-    for childIndex in range(dagNode.childCount()):
-        child = dagNode.child(childIndex) 
-        if not child.hasFn(OpenMaya.MFn.kTransform):
-            continue
-        children.append(child)
+    return index.getAllParents(node)
 
-    result = []
 
-    if children:
-        for child in children:
-            result.append(child)
-            result.extend(getAllChildTransforms(child))
+def getAllChildTransforms(node, index=None):
+    if index is None:
+        index = HierarchyIndex()
 
-    return result
+    return index.getAllChildren(node)
 
 
 def getDagPaths(nodes):
@@ -99,25 +235,37 @@ def getDagPaths(nodes):
     return result
 
 
+def getPathNames(nodes):
+    """Get the current full path of each node, paths change as soon as a node is reparented.
+
+    Returns:
+        Union[list, str]
+    """
+    return [OpenMaya.MFnDagNode(n).fullPathName() for n in nodes]
+
+
 def freezeTree(node):
     """Freeze all transforms in the given node's hierarchy without affecting pivots.
     Does this by parenting all children to the world, freezing, then restoring the hierarchy.
+
+    Every step works on the whole hierarchy in one command, and the lot is a single undo.
     
     Returns:
         None
     """
     children = getAllChildTransforms(node)
-    childrenPaths = getDagPaths(children)
 
-    parentMap = [(c, OpenMaya.MFnDagNode(OpenMaya.MFnDagNode(c).parent(0)).getPath()) for c in childrenPaths]
-    
-    for c in childrenPaths:
-        cmds.parent(c.fullPathName(), world=True)
-    
-    nodeDagPath = OpenMaya.MFnDagNode(node).getPath()
+    # Group children by parent, keeping their order so siblings are restored in place.
+    parentMap = collections.OrderedDict()
+    for c in children:
+        parent = OpenMaya.MFnDagNode(c).parent(0)
+        parentMap.setdefault(getNodeKey(parent), (parent, []))[1].append(c)
 
-    for n in [nodeDagPath] + childrenPaths:
-        cmds.makeIdentity(n.fullPathName(), t=0, r=0, s=1, n=0, apply=True)
-    
-    for pair in parentMap:
-        cmds.parent(pair[0], pair[1])
+    with modifier.undoChunk('freezeTree'):
+        if children:
+            cmds.parent(*getPathNames(children), world=True)
+
+        cmds.makeIdentity(*getPathNames([node] + children), t=0, r=0, s=1, n=0, apply=True)
+
+        for parent, parentChildren in parentMap.values():
+            cmds.parent(*getPathNames(parentChildren + [parent]))
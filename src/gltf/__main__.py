@@ -0,0 +1,45 @@
+"""Convert and optimize a directory tree of glTF assets, e.g.
+
+    python -m gltf assets/ converted/ --format glb --processes 16 --timeout 300
+"""
+import argparse
+import logging
+import sys
+
+from gltf.interface import batch
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m gltf', description=__doc__.splitlines()[0])
+    parser.add_argument('input', help='directory searched for .glb files and directories holding a .gltf file')
+    parser.add_argument('output', help='directory the converted assets are written to, mirroring the input layout')
+    parser.add_argument('--format', choices=[batch.FORMAT_GLTF, batch.FORMAT_GLB], default=batch.FORMAT_GLTF)
+    parser.add_argument('--no-optimize', dest='optimize', action='store_false', help='repack without welding or reordering')
+    parser.add_argument('--compact', action='store_true', help='write minimal .gltf json')
+    parser.add_argument('--processes', type=int, help='worker processes, one per core by default')
+    parser.add_argument('--timeout', type=float, help='seconds an asset may take before it is abandoned')
+    parser.add_argument('--max-memory', type=float, help='address space limit per worker, in megabytes')
+    parser.add_argument('--max-tasks-per-child', type=int, help='assets a worker converts before it is replaced')
+    parser.add_argument('--verbose', action='store_true')
+    options = parser.parse_args(args)
+
+    logging.basicConfig(level=logging.INFO if options.verbose else logging.WARNING, format='%(levelname)s %(message)s')
+    # The summary is always shown.
+    logging.getLogger(batch.__name__).setLevel(logging.INFO)
+
+    summary = batch.convertAssets(
+        options.input,
+        options.output,
+        outputFormat=options.format,
+        optimize=options.optimize,
+        compact=options.compact,
+        processes=options.processes,
+        timeout=options.timeout,
+        maxMemory=options.max_memory,
+        maxTasksPerChild=options.max_tasks_per_child)
+
+    return 1 if summary['failedCount'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,381 @@
+"""Convert and optimize glTF assets in bulk, across a pool of worker processes.
+
+Each asset is loaded, its mesh data repacked into a single new buffer, optionally
+welded and reordered for the vertex cache, then written as .gltf plus .bin or as
+.glb. Only what the object model covers is written: scenes, nodes, meshes and
+the accessors their primitives use. Assets using anything else, such as
+materials, skins or morph targets, fail rather than lose it.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import core
+import gltf
+import mesh
+
+
+FORMAT_GLTF = 'gltf'
+FORMAT_GLB = 'glb'
+
+BYTES_PER_MB = 1024 * 1024
+
+# Unsupported properties named in the error of an asset that cannot be repacked.
+MAX_LISTED_PROPERTIES = 5
+
+
+class AssetTimeout(Exception):
+    pass
+
+
+def findAssets(inputDirectory):
+    """Find the .glb files and the directories holding a .gltf file under a directory.
+
+    Returns:
+        list: asset paths, sorted.
+    """
+    result = []
+
+    for directory, dirNames, fileNames in os.walk(inputDirectory):
+        dirNames.sort()
+
+        if any(f.endswith('.gltf') for f in fileNames):
+            result.append(directory)
+
+        result.extend(os.path.join(directory, f) for f in sorted(fileNames) if f.endswith('.glb'))
+
+    return result
+
+
+def getAssetSize(assetPath):
+    if os.path.isfile(assetPath):
+        return os.path.getsize(assetPath)
+
+    return sum(
+        os.path.getsize(os.path.join(assetPath, f))
+        for f in os.listdir(assetPath) if f.endswith(('.gltf', '.bin')))
+
+
+def loadAsset(assetPath):
+    if assetPath.endswith('.glb'):
+        return gltf.GLTF.importGLB(assetPath, mapped=True)
+
+    return gltf.GLTF.importGLTF(assetPath, mapped=True)
+
+
+def getComponentBounds(values, componentCount):
+    """Get the per component min and max of flat or (count, componentCount) values.
+
+    Returns:
+        tuple: min list and max list.
+    """
+    if core.numpy is not None:
+        values = core.numpy.asarray(values).reshape(-1, componentCount)
+        return values.min(axis=0).tolist(), values.max(axis=0).tolist()
+
+    values = core.toList(values)
+    columns = [values[i::componentCount] for i in range(componentCount)]
+
+    return [min(c) for c in columns], [max(c) for c in columns]
+
+
+def getFlatArray(values):
+    if core.numpy is not None:
+        return values.reshape(-1)
+
+    return values
+
+
+def addAccessor(target, values, componentType, dataType, normalized=False, bounds=False):
+    """Pack values into the target's first buffer and add an accessor for them.
+
+    Returns:
+        int: index of the new accessor.
+    """
+    componentCount = core.DATA_TYPE_COMPONENT_COUNTS[dataType]
+
+    buffView = gltf.BufferView.addBufferView(target.buffers[0], core.packComponents(values, componentType))
+    target.bufferViews.append(buffView)
+
+    accessor = gltf.Accessor()
+    accessor.bufferView = len(target.bufferViews) - 1
+    accessor.componentType = componentType
+    accessor.type = dataType
+    accessor.count = (core.numpy.size(values) if core.numpy is not None else len(values)) // componentCount
+    accessor.normalized = normalized
+    if bounds:
+        accessor.min, accessor.max = getComponentBounds(values, componentCount)
+
+    target.accessors.append(accessor)
+
+    return len(target.accessors) - 1
+
+
+def getUnsupportedProperties(source):
+    """Get the properties of an asset that repackAsset cannot carry over.
+
+    Returns:
+        list: property paths, e.g. 'materials' or 'nodes[3].skin'.
+    """
+    result = list(source.skippedProperties)
+
+    for index, n in enumerate(source.nodes):
+        result.extend(
+            'nodes[{0}].{1}'.format(index, field)
+            for field in ('camera', 'skin', 'weights', 'extensions') if getattr(n, field) is not None)
+
+    for index, m in enumerate(source.meshes):
+        result.extend(
+            'meshes[{0}].{1}'.format(index, field)
+            for field in ('weights', 'extensions') if getattr(m, field) is not None)
+
+        for primitiveIndex, primitive in enumerate(m.primitives or []):
+            result.extend(
+                'meshes[{0}].primitives[{1}].{2}'.format(index, primitiveIndex, field)
+                for field in ('material', 'targets', 'extensions') if getattr(primitive, field) is not None)
+
+    return result
+
+
+def repackPrimitive(source, target, primitive, optimize=True):
+    """Copy a primitive's accessors into the target, welded and reordered when it is a triangle list.
+
+    Returns:
+        gltf.Primitive
+    """
+    names = sorted(primitive.attributes)
+    accessors = [source.accessors[primitive.attributes[name]] for name in names]
+
+    for accessor in accessors:
+        if accessor.bufferView is None or accessor.sparse is not None:
+            raise ValueError('Sparse accessors and accessors without a buffer view are not supported.')
+
+    # The mesh functions expect flat component arrays.
+    attributes = [
+        (getFlatArray(source.getAccessorArray(primitive.attributes[name])), core.DATA_TYPE_COMPONENT_COUNTS[a.type])
+        for name, a in zip(names, accessors)]
+
+    optimize = optimize and primitive.mode == core.PRIMITIVE_MODE_TRIANGLES
+
+    indices = None
+    if primitive.indices is not None:
+        indices = source.getAccessorArray(primitive.indices)
+    elif optimize:
+        # Welding works through indices, so only optimized triangle lists gain them.
+        indices = range(accessors[0].count)
+
+    if optimize and len(indices):
+        componentCounts = [c for values, c in attributes]
+        indices, values, weldStats = mesh.weldVertices(indices, attributes)
+        indices, values, cacheStats = mesh.optimizePrimitive(indices, list(zip(values, componentCounts)))
+        attributes = list(zip(values, componentCounts))
+
+    result = gltf.Primitive()
+    result.mode = primitive.mode
+    result.attributes = {}
+    result.extras = primitive.extras
+
+    if indices is not None and len(indices):
+        result.indices = addAccessor(
+            target, indices, gltf.Primitive.getIndicesComponentType(indices), 'SCALAR', bounds=True)
+
+    for name, accessor, (values, componentCount) in zip(names, accessors, attributes):
+        result.attributes[name] = addAccessor(
+            target, values, accessor.componentType, accessor.type, accessor.normalized, bounds=name == 'POSITION')
+
+    return result
+
+
+def repackAsset(source, optimize=True):
+    """Build a new GLTF holding the source's scenes, nodes and meshes, with all mesh data in one buffer.
+
+    Primitives sharing the same accessors are only written once. Assets with
+    properties that cannot be carried over raise a ValueError, so nothing is
+    written referencing data that was left out.
+
+    Returns:
+        gltf.GLTF
+    """
+    unsupported = getUnsupportedProperties(source)
+    if unsupported:
+        raise ValueError('Cannot carry over {0}{1}.'.format(
+            ', '.join(unsupported[:MAX_LISTED_PROPERTIES]),
+            ' and {0} more'.format(len(unsupported) - MAX_LISTED_PROPERTIES) if len(unsupported) > MAX_LISTED_PROPERTIES else ''))
+
+    target = gltf.GLTF()
+    target.asset = source.asset
+    target.scene = source.scene
+    target.scenes = list(source.scenes)
+    target.nodes = list(source.nodes)
+
+    buff = gltf.Buffer()
+    buff.name = buff.uri = 'out.bin'
+    target.buffers.append(buff)
+
+    primitives = {}
+    for sourceMesh in source.meshes:
+        m = gltf.Mesh()
+        m.name = sourceMesh.name
+        m.extras = sourceMesh.extras
+        m.primitives = []
+
+        for primitive in sourceMesh.primitives:
+            key = (tuple(sorted(primitive.attributes.items())), primitive.indices, primitive.mode)
+            if key not in primitives:
+                primitives[key] = repackPrimitive(source, target, primitive, optimize)
+            m.primitives.append(primitives[key])
+
+        target.meshes.append(m)
+
+    return target
+
+
+def getOutputPath(assetPath, inputDirectory, outputDirectory, outputFormat):
+    relativePath = os.path.relpath(assetPath, inputDirectory)
+    if os.path.isfile(assetPath):
+        relativePath = os.path.splitext(relativePath)[0]
+    if relativePath == '.':
+        relativePath = os.path.basename(os.path.abspath(assetPath))
+
+    outputPath = os.path.join(outputDirectory, relativePath)
+    if outputFormat == FORMAT_GLB:
+        outputPath += '.glb'
+
+    return outputPath
+
+
+def _raiseTimeout(signum, frame):
+    raise AssetTimeout()
+
+
+def initWorker(maxMemory=None):
+    """Set up a worker process, bounding its address space to maxMemory megabytes."""
+    if maxMemory and resource is not None:
+        limit = int(maxMemory * BYTES_PER_MB)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    if hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, _raiseTimeout)
+
+
+def convertAsset(job):
+    """Load, optimize and write one asset, in a worker process.
+
+    Args:
+        job (dict): assetPath, outputPath, format, optimize, compact and timeout in seconds.
+
+    Returns:
+        dict: assetPath, inputBytes, outputBytes, duration and error, None on success.
+    """
+    start = time.time()
+    result = {'assetPath': job['assetPath'], 'inputBytes': 0, 'outputBytes': 0, 'error': None}
+
+    timeout = job.get('timeout')
+    if timeout and hasattr(signal, 'alarm'):
+        signal.alarm(int(max(1, timeout)))
+
+    source = target = None
+    try:
+        result['inputBytes'] = getAssetSize(job['assetPath'])
+
+        source = loadAsset(job['assetPath'])
+        if source is None:
+            raise ValueError('Failed to load asset.')
+
+        target = repackAsset(source, job.get('optimize', True))
+
+        outputPath = job['outputPath']
+        if job.get('format') == FORMAT_GLB:
+            target.buffers[0].streamTo()
+            gltf.GLTF.exportGLB(target, outputPath)
+            result['outputBytes'] = os.path.getsize(outputPath)
+        else:
+            gltf.GLTF.exportGLTF(target, outputPath, job.get('compact', False))
+            result['outputBytes'] = getAssetSize(outputPath)
+
+    except AssetTimeout:
+        result['error'] = 'Timed out after {0}s.'.format(timeout)
+    except MemoryError:
+        result['error'] = 'Ran out of memory.'
+    except Exception as e:
+        result['error'] = '{0}: {1}'.format(type(e).__name__, e)
+    finally:
+        if timeout and hasattr(signal, 'alarm'):
+            signal.alarm(0)
+
+        for ctx in (source, target):
+            if ctx is None:
+                continue
+            # Decoded arrays are views on the buffers, release them first.
+            ctx.clearAccessorArrays()
+            for buff in ctx.buffers:
+                buff.close()
+
+    result['duration'] = time.time() - start
+
+    return result
+
+
+def convertAssets(inputDirectory, outputDirectory, outputFormat=FORMAT_GLTF, optimize=True, compact=False,
+                  processes=None, timeout=None, maxMemory=None, maxTasksPerChild=None):
+    """Convert every asset found under inputDirectory into outputDirectory, mirroring its layout.
+
+    Returns:
+        dict: summary with assetCount, failedCount, inputBytes, outputBytes, duration,
+            assetsPerSecond and megabytesPerSecond, plus the per asset results.
+    """
+    logger = logging.getLogger(__name__)
+
+    start = time.time()
+
+    jobs = [
+        {
+            'assetPath': assetPath,
+            'outputPath': getOutputPath(assetPath, inputDirectory, outputDirectory, outputFormat),
+            'format': outputFormat,
+            'optimize': optimize,
+            'compact': compact,
+            'timeout': timeout,
+        }
+        for assetPath in findAssets(inputDirectory)]
+
+    logger.info('Converting {0} assets with {1} processes.'.format(len(jobs), processes or multiprocessing.cpu_count()))
+
+    results = []
+    pool = multiprocessing.Pool(processes, initWorker, (maxMemory,), maxTasksPerChild)
+    try:
+        for result in pool.imap_unordered(convertAsset, jobs):
+            if result['error'] is not None:
+                logger.error('Failed to convert {assetPath}: {error}'.format(**result))
+            results.append(result)
+    finally:
+        pool.close()
+        pool.join()
+
+    duration = time.time() - start
+    converted = [r for r in results if r['error'] is None]
+    inputBytes = sum(r['inputBytes'] for r in converted)
+
+    summary = {
+        'assetCount': len(results),
+        'failedCount': len(results) - len(converted),
+        'inputBytes': inputBytes,
+        'outputBytes': sum(r['outputBytes'] for r in converted),
+        'duration': duration,
+        'assetsPerSecond': len(converted) / duration if duration else 0.0,
+        'megabytesPerSecond': inputBytes / float(BYTES_PER_MB) / duration if duration else 0.0,
+        'results': results,
+    }
+
+    logger.info(
+        'Converted {0} of {assetCount} assets in {duration:.1f}s, {assetsPerSecond:.1f} assets/s, '
+        '{megabytesPerSecond:.1f} MB/s, {inputBytes} bytes in, {outputBytes} bytes out.'.format(len(converted), **summary))
+
+    return summary
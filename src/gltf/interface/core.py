@@ -1,4 +1,22 @@
+import array
+import binascii
 import json
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    _buffer = buffer
+except NameError:
+    _buffer = None
+
+try:
+    from urllib import unquote
+except ImportError:
+    from urllib.parse import unquote
 
 
 COMPONENT_TYPE_BYTE = 5120
@@ -17,6 +35,9 @@ COMPONENT_TYPES = {
     'FLOAT': COMPONENT_TYPE_FLOAT
 }
 
+# Base64 characters decoded at a time from data uris, a multiple of 4.
+DATA_URI_CHUNK_SIZE = 1 << 16
+
 COMPONENT_TYPE_CODES = {
     COMPONENT_TYPE_BYTE: 'b',
     COMPONENT_TYPE_UNSIGNED_BYTE: 'B',
@@ -26,6 +47,15 @@ COMPONENT_TYPE_CODES = {
     COMPONENT_TYPE_FLOAT: 'f'
 }
 
+COMPONENT_TYPE_SIZES = {
+    COMPONENT_TYPE_BYTE: 1,
+    COMPONENT_TYPE_UNSIGNED_BYTE: 1,
+    COMPONENT_TYPE_SHORT: 2,
+    COMPONENT_TYPE_UNSIGNED_SHORT: 2,
+    COMPONENT_TYPE_UNSIGNED_INT: 4,
+    COMPONENT_TYPE_FLOAT: 4
+}
+
 DATA_TYPE_SCALAR = "SCALAR"
 DATA_TYPE_VEC2 = "VEC2"
 DATA_TYPE_VEC3 = "VEC3"
@@ -34,6 +64,16 @@ DATA_TYPE_MAT2 = "MAT2"
 DATA_TYPE_MAT3 = "MAT3"
 DATA_TYPE_MAT4 = "MAT4"
 
+DATA_TYPE_COMPONENT_COUNTS = {
+    DATA_TYPE_SCALAR: 1,
+    DATA_TYPE_VEC2: 2,
+    DATA_TYPE_VEC3: 3,
+    DATA_TYPE_VEC4: 4,
+    DATA_TYPE_MAT2: 4,
+    DATA_TYPE_MAT3: 9,
+    DATA_TYPE_MAT4: 16
+}
+
 IDENTITY_MATRIX = [1,0,0,0,0,1,0,0,0,0,1,0,0,0,0,1]
 
 BUFFERVIEW_TARGET_ARRAY_BUFFER = 34962
@@ -48,9 +88,237 @@ PRIMITIVE_MODE_TRIANGLE_STRIP = 5
 PRIMITIVE_MODE_TRIANGLE_FAN = 6
 
 
+def getMemorySlice(data, byteOffset, byteLength):
+    """Get a zero-copy view into a bytes-like object.
+
+    Returns:
+        Union[memoryview, buffer]
+    """
+    if _buffer is not None:
+        # NumPy and the array module still expect the old buffer interface on Python 2.
+        return _buffer(data, byteOffset, byteLength)
+
+    return memoryview(data)[byteOffset:byteOffset + byteLength]
+
+
+def toBytes(data):
+    """Copy a bytes-like object, such as a slice from getMemorySlice, into bytes."""
+    if isinstance(data, memoryview):
+        return data.tobytes()
+
+    return bytes(data)
+
+
+def toList(data):
+    """Convert a list, array or ndarray into a plain list of Python numbers."""
+    if hasattr(data, 'tolist'):
+        return data.tolist()
+
+    return list(data)
+
+
+def isNumberArray(data):
+    """Check if data is a sequence of numbers, as opposed to a buffer of packed components."""
+    if isinstance(data, (list, tuple, array.array)):
+        return True
+
+    return numpy is not None and isinstance(data, numpy.ndarray)
+
+
+def isArrayLike(data):
+    """Check if data can be packed as components, lists, tuples, arrays and buffer objects are accepted."""
+    if isNumberArray(data):
+        return True
+
+    try:
+        memoryview(data)
+    except TypeError:
+        return False
+
+    return True
+
+
+def getMinValue(data):
+    if numpy is not None and isinstance(data, numpy.ndarray):
+        return data.min()
+
+    if not isNumberArray(data) and isArrayLike(data):
+        raise TypeError('Packed buffers have no component type, decode them before reading values.')
+
+    return min(data)
+
+
+def getMaxValue(data):
+    if numpy is not None and isinstance(data, numpy.ndarray):
+        return data.max()
+
+    if not isNumberArray(data) and isArrayLike(data):
+        raise TypeError('Packed buffers have no component type, decode them before reading values.')
+
+    return max(data)
+
+
+def packComponents(data, componentType):
+    """Pack a flat or nested sequence of numbers as little-endian glTF components.
+
+    Lists and tuples go through the array module, arrays are converted in
+    bulk by NumPy when it is available. Any other buffer object is taken to
+    already hold packed components of componentType, with or without NumPy.
+
+    Returns:
+        bytes
+    """
+    typeCode = COMPONENT_TYPE_CODES[componentType]
+
+    if isinstance(data, (list, tuple)):
+        return array.array(typeCode, data).tostring()
+
+    if numpy is not None and isNumberArray(data):
+        return numpy.ascontiguousarray(data, dtype='<' + typeCode).tostring()
+
+    if isinstance(data, array.array):
+        if data.typecode == typeCode:
+            return data.tostring()
+        return array.array(typeCode, data).tostring()
+
+    packed = memoryview(data).tobytes()
+    if len(packed) % COMPONENT_TYPE_SIZES[componentType]:
+        raise ValueError('Buffer of {0} bytes does not hold whole {1} components.'.format(len(packed), typeCode))
+
+    return packed
+
+
+def unpackComponents(data, componentType, dataType, count, byteStride=None):
+    """Unpack accessor bytes into their components.
+
+    With NumPy this is a zero-copy ndarray view shaped (count,) for scalars and
+    (count, componentCount) otherwise, e.g. (count, 3) float32 for VEC3. Without
+    NumPy a flat array.array of the components is returned.
+
+    Returns:
+        Union[numpy.ndarray, array.array]
+    """
+    typeCode = COMPONENT_TYPE_CODES[componentType]
+    componentCount = DATA_TYPE_COMPONENT_COUNTS[dataType]
+    componentSize = COMPONENT_TYPE_SIZES[componentType]
+    elementSize = componentSize * componentCount
+    byteStride = byteStride or elementSize
+
+    if numpy is not None:
+        shape = (count, componentCount)
+        strides = (byteStride, componentSize)
+        if componentCount == 1:
+            shape = (count,)
+            strides = (byteStride,)
+
+        return numpy.ndarray(shape, dtype='<' + typeCode, buffer=data, strides=strides)
+
+    data = toBytes(data)
+
+    result = array.array(typeCode)
+    if byteStride == elementSize:
+        result.fromstring(data[:count * elementSize])
+    else:
+        for index in range(count):
+            offset = index * byteStride
+            result.fromstring(data[offset:offset + elementSize])
+
+    return result
+
+
+def isDataUri(uri):
+    return uri.startswith('data:')
+
+
+def resolveUri(uri, directory):
+    """Get the file path of a relative uri, e.g. a buffer uri relative to its .gltf file."""
+    return os.path.normpath(os.path.join(directory, unquote(uri)))
+
+
+def decodeDataUri(uri, byteLength=None):
+    """Decode a base64 data uri into a bytearray.
+
+    The payload is sliced out of the uri and decoded a chunk at a time into a
+    bytearray allocated up front, so neither the base64 text nor the decoded
+    data is ever copied whole.
+
+    Returns:
+        bytearray
+    """
+    separator = uri.find(',')
+    if separator < 0 or not uri.endswith(';base64', 0, separator):
+        raise ValueError('Only base64 data uris are supported: {0}'.format(uri[:max(separator, 0)] or uri[:64]))
+
+    payloadStart = separator + 1
+
+    # Only the last two characters can be padding.
+    padding = 0
+    while padding < 2 and len(uri) - padding > payloadStart and uri[-1 - padding] == '=':
+        padding += 1
+
+    decodedLength = (len(uri) - payloadStart - padding) * 3 // 4
+    if byteLength is not None:
+        decodedLength = min(decodedLength, byteLength)
+
+    result = bytearray(decodedLength)
+    offset = 0
+
+    for start in range(payloadStart, len(uri), DATA_URI_CHUNK_SIZE):
+        chunk = binascii.a2b_base64(uri[start:start + DATA_URI_CHUNK_SIZE])
+        chunk = chunk[:decodedLength - offset]
+        result[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+
+    return result
+
+
+def roundFloat32(value):
+    """Round a float to float32 precision for compact json.
+
+    Nine significant digits are the fewest that always read back as the same
+    float32. Integral values come back as ints so they serialize without a
+    trailing '.0'.
+    """
+    value = float('%.9g' % value)
+
+    if value.is_integer() and abs(value) < 1e15:
+        return int(value)
+
+    return value
+
+
+class GLTFSpecObjectType(type):
+    """Builds a compact representation for each GLTFSpecObject subclass from its field lists.
+
+    Instances get __slots__ instead of a __dict__, and the field set used to
+    load them is computed once per class.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        inheritedSlots = set()
+        for base in bases:
+            for cls in base.__mro__:
+                inheritedSlots.update(cls.__dict__.get('__slots__', ()))
+
+        declared = list(namespace.get('fields', [])) + list(namespace.get('internalFields', []))
+        namespace['__slots__'] = tuple(f for f in declared if f not in inheritedSlots)
+
+        cls = super(GLTFSpecObjectType, mcs).__new__(mcs, name, bases, namespace)
+
+        cls._fieldSet = frozenset(cls.fields)
+
+        return cls
+
+
 class GLTFSpecObject(object):
+    __metaclass__ = GLTFSpecObjectType
+
     fields = []
     requiredFields = []
+    # Fields holding lists of floats, which are rounded to float32 precision in compact json.
+    float32Fields = []
+    # Non-glTF attributes a subclass stores on its instances.
+    internalFields = []
 
     def __init__(self):
         pass
@@ -60,15 +328,22 @@ class GLTFSpecObject(object):
 
     @property
     def gltf(self):
+        # A plain loop beats attrgetter plus zip, which allocates a tuple and a list per call.
         result = {}
-
         for field in self.fields:
-            fieldValue = getattr(self, field, None)
-            if fieldValue is not None:
-                result[field] = fieldValue
+            value = getattr(self, field)
+            if value is not None:
+                result[field] = value
+
+        return result
+
+    @property
+    def compactGLTF(self):
+        result = self.gltf
 
-            if field in self.requiredFields and field is None:
-                logger.exception('Field is required for glTF {0}: {1}'.format(self.__name__, field))
+        for field in self.float32Fields:
+            if field in result:
+                result[field] = [roundFloat32(v) for v in result[field]]
 
         return result
 
@@ -77,7 +352,48 @@ class GLTFSpecObject(object):
         _instance = cls()
 
         for key, value in kwargs.items():
-            if key in _instance.fields:
+            if key in cls._fieldSet:
                 setattr(_instance, key, value)
 
-        return _instance
\ No newline at end of file
+        return _instance
+
+
+class LazyList(object):
+    """A list of spec objects created from their json data on first access, then cached.
+
+    Reading one item of a large document only allocates that item.
+    """
+    __slots__ = ['_data', '_items', '_factory']
+
+    def __init__(self, data, factory):
+        self._data = data
+        self._items = [None] * len(data)
+        self._factory = factory
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._factory(self._data[index])
+
+        return item
+
+    def __setitem__(self, index, value):
+        self._items[index] = value
+
+    def __iter__(self):
+        for index in range(len(self._items)):
+            yield self[index]
+
+    def append(self, value):
+        self._data.append(None)
+        self._items.append(value)
+
+    def getCreatedCount(self):
+        """Get how many items were created so far."""
+        return len(self._items) - self._items.count(None)
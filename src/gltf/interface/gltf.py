@@ -4,10 +4,20 @@ import json
 import base64
 import os
 import io
+import mmap
+import shutil
+import struct
+import tempfile
 
 import core
 
 
+GLB_MAGIC = b'glTF'
+GLB_VERSION = 2
+GLB_CHUNK_TYPE_JSON = b'JSON'
+GLB_CHUNK_TYPE_BIN = b'BIN\x00'
+
+
 class GLTF(object):
     def __init__(self):
         self.asset = None  # Must be an object/dictionary.
@@ -29,31 +39,176 @@ class GLTF(object):
         self.samplers = []
         self.extensionsUsed = []
         self.extensionsRequired = []
+
+        # Top level properties of a loaded description that are not part of the object model.
+        self.skippedProperties = []
+
+        # Decoded accessor arrays, shared by everything reading the same accessor.
+        self._accessorArrays = {}
     
     def __repr__(self):
         return self.serialized()
 
-    def toGLTF(self):
+    def getProperties(self):
+        """Get the top level glTF properties in the order they are written.
+
+        Returns:
+            list: (name, value) pairs, value being a spec object, a list of them or a plain value.
+        """
+        return [
+            ('asset', self.asset),
+            ('accessors', self.accessors),
+            ('bufferViews', self.bufferViews),
+            ('buffers', self.buffers),
+            ('scene', self.scene),
+            ('scenes', self.scenes),
+            ('nodes', self.nodes),
+            ('meshes', self.meshes),
+        ]
+
+    @staticmethod
+    def getItem(value, compact=False):
+        if not isinstance(value, core.GLTFSpecObject):
+            return value
+
+        if compact:
+            return value.compactGLTF
+
+        return value.gltf
+
+    def toGLTF(self, compact=False):
         result = {}
 
-        result['asset'] = self.asset.gltf
-        result['accessors'] = [a.gltf for a in self.accessors]
-        result['bufferViews'] = [b.gltf for b in self.bufferViews]
-        result['buffers'] = [b.gltf for b in self.buffers]
-        result['scene'] = self.scene
-        result['scenes'] = [s.gltf for s in self.scenes]
-        result['nodes'] = [n.gltf for n in self.nodes]
-        result['meshes'] = [m.gltf for m in self.meshes]
+        for name, value in self.getProperties():
+            if value is None:
+                continue
 
-        for m in result['meshes']:
-            for i, p in enumerate(m['primitives']):
-                m['primitives'][i] = p.gltf
+            if isinstance(value, (list, core.LazyList)):
+                # Top level lists only hold spec objects.
+                if compact:
+                    result[name] = [v.compactGLTF for v in value]
+                else:
+                    result[name] = [v.gltf for v in value]
+            else:
+                result[name] = GLTF.getItem(value, compact)
 
         return result
 
-    def serialized(self):
+    def serialized(self, compact=False):
+        if compact:
+            return json.dumps(self.toGLTF(compact=True), separators=(',', ':'), allow_nan=False)
+
         return json.dumps(self.toGLTF(), indent=4, separators=(',', ' : '), allow_nan=False)
 
+    def dump(self, fp, compact=False):
+        """Write the glTF json to an open text file one object at a time.
+
+        Produces an equivalent json document to serialized, parsing to the same
+        values though top level properties follow getProperties order, without
+        building the whole dict tree or json string in memory first.
+        """
+        if compact:
+            separators = (',', ':')
+            propertyIndent = itemIndent = ''
+        else:
+            separators = (',', ' : ')
+            propertyIndent = '\n' + ' ' * 4
+            itemIndent = '\n' + ' ' * 8
+
+        def encode(value, indent):
+            if compact:
+                return json.dumps(value, separators=separators, allow_nan=False)
+
+            text = json.dumps(value, indent=4, separators=separators, allow_nan=False)
+            return text.replace('\n', indent)
+
+        fp.write(unicode('{'))
+
+        properties = [(name, value) for name, value in self.getProperties() if value is not None]
+        for propertyIndex, (name, value) in enumerate(properties):
+            if propertyIndex:
+                fp.write(unicode(separators[0]))
+            fp.write(unicode(propertyIndent + json.dumps(name) + separators[1]))
+
+            if not isinstance(value, (list, core.LazyList)):
+                fp.write(unicode(encode(GLTF.getItem(value, compact), propertyIndent)))
+                continue
+
+            fp.write(unicode('['))
+            for itemIndex, item in enumerate(value):
+                if itemIndex:
+                    fp.write(unicode(separators[0]))
+                fp.write(unicode(itemIndent + encode(GLTF.getItem(item, compact), itemIndent)))
+            fp.write(unicode((propertyIndent if value else '') + ']'))
+
+        fp.write(unicode(('\n' if not compact else '') + '}'))
+
+    def getBufferViewData(self, bufferViewIndex):
+        """Get the bytes of a buffer view without copying them out of the buffer.
+
+        Returns:
+            Union[memoryview, buffer]
+        """
+        buffView = self.bufferViews[bufferViewIndex]
+
+        return self.buffers[buffView.buffer].getSlice(buffView.byteOffset or 0, buffView.byteLength)
+
+    def getAccessorData(self, accessorIndex):
+        """Get the bytes of an accessor without copying them out of the buffer.
+
+        Accessors without a buffer view are all zeros, as the spec initializes them.
+
+        Returns:
+            Union[memoryview, buffer, bytes]
+        """
+        accessor = self.accessors[accessorIndex]
+        elementSize = accessor.getElementSize()
+
+        if accessor.bufferView is None:
+            if accessor.sparse is not None:
+                raise ValueError('Accessor {0} is sparse, sparse accessors are not supported.'.format(accessorIndex))
+
+            return bytes(bytearray(elementSize * accessor.count))
+
+        buffView = self.bufferViews[accessor.bufferView]
+
+        stride = buffView.byteStride or elementSize
+        byteLength = stride * (accessor.count - 1) + elementSize if accessor.count else 0
+        byteOffset = (buffView.byteOffset or 0) + (accessor.byteOffset or 0)
+
+        return self.buffers[buffView.buffer].getSlice(byteOffset, byteLength)
+
+    def getAccessorArray(self, accessorIndex):
+        """Decode an accessor into typed components, see core.unpackComponents.
+
+        Each accessor is decoded once, later calls return the same array. NumPy
+        arrays are views on the buffer, so call clearAccessorArrays before
+        appending to buffers.
+
+        Returns:
+            Union[numpy.ndarray, array.array]
+        """
+        result = self._accessorArrays.get(accessorIndex)
+        if result is not None:
+            return result
+
+        accessor = self.accessors[accessorIndex]
+        byteStride = None
+        if accessor.bufferView is not None:
+            byteStride = self.bufferViews[accessor.bufferView].byteStride
+
+        result = self._accessorArrays[accessorIndex] = core.unpackComponents(
+            self.getAccessorData(accessorIndex),
+            accessor.componentType,
+            accessor.type,
+            accessor.count,
+            byteStride)
+
+        return result
+
+    def clearAccessorArrays(self):
+        self._accessorArrays = {}
+
     def addData(self, lst, componentType):
         data = GLTF.getBinDataFromList(lst, componentType)
         buffView = bufferView.BufferView.addBufferView(self.buffers[0], data)
@@ -70,47 +225,102 @@ class GLTF(object):
                 'componentType must be one of the following: {0}'.format(
                     'BYTE, UNSIGNED_BYTE, SHORT, UNSIGNED_SHORT, UNSIGNED_INT, FLOAT'))
 
-        if not isinstance(lst, (list, tuple)):
-            raise TypeError('lst must be a list')
-
-        componentType = core.COMPONENT_TYPE_CODES[core.COMPONENT_TYPES[componentType]]
+        if not core.isArrayLike(lst):
+            raise TypeError('lst must be a list, array or buffer')
 
         logger.info('Component type: {0}'.format(componentType))
 
-        return array.array(componentType, lst).tostring()
+        return core.packComponents(lst, core.COMPONENT_TYPES[componentType])
 
     @staticmethod
-    def exportGLTF(gltfObject, outputDirectory):
+    def exportGLTF(gltfObject, outputDirectory, compact=False):
+        """Write the asset as out.gltf plus its .bin buffers.
 
+        Args:
+            compact (bool): write minimal json with float32 precision transforms.
+        """
         if not os.path.exists(os.path.abspath(outputDirectory)):
             os.makedirs(os.path.abspath(outputDirectory), 0755)
 
         gltfFilePath = os.path.abspath(os.path.join(outputDirectory, 'out.gltf'))
         with io.open(gltfFilePath, mode='w+', encoding='utf8', newline='\n') as fp:
-            fp.write(unicode(gltfObject.serialized()))
+            gltfObject.dump(fp, compact)
             fp.write(unicode("\n"))
 
         for buff in gltfObject.buffers:
             binFilePath = os.path.abspath(os.path.join(outputDirectory, buff.name))
+
+            # Buffers streaming to their final location only need flushing.
+            if buff.streamPath == binFilePath:
+                buff.flush()
+                continue
+
             with io.open(binFilePath, 'wb') as fp:
-                fp.write(buff.data)
+                buff.writeTo(fp)
 
     @staticmethod
-    def importGLTF(inputDirectory):
-        logger = logging.getLogger(__name__)
+    def exportGLB(gltfObject, filePath):
+        """Write the asset as a single binary glTF file.
+
+        The first buffer is embedded as the BIN chunk, any other buffers are
+        written next to the file as in exportGLTF.
+        """
+        outputDirectory = os.path.dirname(os.path.abspath(filePath))
+        if not os.path.exists(outputDirectory):
+            os.makedirs(outputDirectory, 0755)
+
+        description = gltfObject.toGLTF(compact=True)
+
+        binBuffer = None
+        if gltfObject.buffers:
+            binBuffer = gltfObject.buffers[0]
+            # The embedded buffer is referenced without a uri.
+            description['buffers'][0].pop('uri', None)
+
+        jsonData = json.dumps(description, separators=(',', ':'), allow_nan=False).encode('utf8')
+        jsonData += b' ' * ((4 - (len(jsonData) % 4)) % 4)
+
+        fileLength = 12 + 8 + len(jsonData)
+
+        if binBuffer is not None:
+            binLength = binBuffer.getByteLength()
+            binPadding = (4 - (binLength % 4)) % 4
+            fileLength += 8 + binLength + binPadding
+
+        with io.open(filePath, 'wb') as fp:
+            fp.write(struct.pack('<4sII', GLB_MAGIC, GLB_VERSION, fileLength))
+            fp.write(struct.pack('<I4s', len(jsonData), GLB_CHUNK_TYPE_JSON))
+            fp.write(jsonData)
+
+            if binBuffer is not None:
+                fp.write(struct.pack('<I4s', binLength + binPadding, GLB_CHUNK_TYPE_BIN))
+                binBuffer.writeTo(fp)
+                fp.write(b'\x00' * binPadding)
+
+        for buff in gltfObject.buffers[1:]:
+            binFilePath = os.path.join(outputDirectory, buff.name)
+            if buff.streamPath == os.path.abspath(binFilePath):
+                buff.flush()
+                continue
 
-        bufferFiles = []
-        gltfFiles = []
+            with io.open(binFilePath, 'wb') as fp:
+                buff.writeTo(fp)
 
-        for f in os.listdir(inputDirectory):
-            if f.endswith('.gltf'):
-                gltfFiles.append(os.path.join(inputDirectory, f))
-            elif f.endswith('.bin'):
-                bufferFiles.append(os.path.join(inputDirectory, f))
+    @staticmethod
+    def importGLTF(inputDirectory, mapped=False, lazy=False):
+        """Load a glTF asset from a directory.
 
-        if not bufferFiles:
-            logger.exception('Missing associated binary data for asset.')
-            return
+        Args:
+            inputDirectory (str): directory holding the .gltf file and its .bin buffers.
+            mapped (bool): memory-map the buffers instead of reading them into memory.
+            lazy (bool): create nodes, meshes, accessors, buffer views and scenes on first access.
+
+        Returns:
+            GLTF
+        """
+        logger = logging.getLogger(__name__)
+
+        gltfFiles = [os.path.join(inputDirectory, f) for f in os.listdir(inputDirectory) if f.endswith('.gltf')]
 
         if not gltfFiles:
             logger.exception('Missing associated gltf description for asset.')
@@ -125,37 +335,127 @@ class GLTF(object):
         
         # TODO: Check for empty description file.
 
+        # Buffers often share a file, so each uri is resolved once.
+        paths = {}
+        for buffer in gltfDescription.get('buffers', []):
+            uri = buffer.get('uri')
+            if uri is None or core.isDataUri(uri):
+                continue
+
+            if uri not in paths:
+                paths[uri] = core.resolveUri(uri, os.path.dirname(gltfFiles[0]))
+                if not os.path.isfile(paths[uri]):
+                    logger.exception('Missing binary data for asset: {0}'.format(paths[uri]))
+                    return
+
+            buffer['path'] = paths[uri]
+
+        return GLTF.fromDescription(gltfDescription, mapped, lazy)
+
+    @staticmethod
+    def importGLB(filePath, mapped=True, lazy=False):
+        """Load a binary glTF file.
+
+        Args:
+            filePath (str): .glb file to load.
+            mapped (bool): memory-map the BIN chunk instead of reading it into memory.
+            lazy (bool): create nodes, meshes, accessors, buffer views and scenes on first access.
+
+        Raises:
+            ValueError: the file is not a binary glTF 2.0 file.
+
+        Returns:
+            GLTF
+        """
+        binOffset = None
+        binLength = None
+
+        with io.open(filePath, 'rb') as fp:
+            magic, version, fileLength = struct.unpack('<4sII', fp.read(12))
+
+            if magic != GLB_MAGIC:
+                raise ValueError('Not a binary glTF file: {0}'.format(filePath))
+
+            if version != GLB_VERSION:
+                raise ValueError('Unsupported binary glTF version {0}: {1}'.format(version, filePath))
+
+            chunkLength, chunkType = struct.unpack('<I4s', fp.read(8))
+            if chunkType != GLB_CHUNK_TYPE_JSON:
+                raise ValueError('Binary glTF file must start with a JSON chunk: {0}'.format(filePath))
+
+            gltfDescription = json.loads(fp.read(chunkLength).decode('utf8'))
+
+            # The optional BIN chunk follows the JSON chunk, both are 4 byte aligned.
+            chunkOffset = 12 + 8 + chunkLength
+            if chunkOffset + 8 <= fileLength:
+                chunkLength, chunkType = struct.unpack('<I4s', fp.read(8))
+                if chunkType == GLB_CHUNK_TYPE_BIN:
+                    binOffset = chunkOffset + 8
+                    binLength = chunkLength
+
+        directory = os.path.dirname(os.path.abspath(filePath))
+        for buffer in gltfDescription.get('buffers', []):
+            if 'uri' in buffer and not core.isDataUri(buffer['uri']):
+                buffer['path'] = core.resolveUri(buffer['uri'], directory)
+
+        gltfObject = GLTF.fromDescription(gltfDescription, mapped, lazy)
+
+        if binOffset is not None and gltfObject.buffers and gltfObject.buffers[0].uri is None:
+            binBuffer = gltfObject.buffers[0]
+            if mapped:
+                binBuffer.mapFile(filePath, binOffset, binLength)
+            else:
+                with io.open(filePath, 'rb') as fp:
+                    fp.seek(binOffset)
+                    binBuffer.data = fp.read(binLength)
+
+        return gltfObject
+
+    @staticmethod
+    def fromDescription(gltfDescription, mapped=False, lazy=False):
+        """Build a GLTF object from a parsed glTF json description.
+
+        Buffers with a resolved 'path' key or a data uri get their data loaded. When lazy,
+        the other top level lists are LazyLists and their objects are created on
+        first access. Top level properties outside the object model, like
+        materials, are listed in skippedProperties.
+
+        Returns:
+            GLTF
+        """
         gltfObject = GLTF()
 
         gltfObject.asset = Asset.fromData(**gltfDescription['asset'])
+        gltfObject.scene = gltfDescription.get('scene')
 
-        for index, buffer in enumerate(gltfDescription['buffers']):
-            for buffFile in bufferFiles:
-                if buffer['uri'] in buffFile:
-                    buffer['directory'] = os.path.dirname(buffFile)
-                    break
+        for index, buffer in enumerate(gltfDescription.get('buffers', [])):
             buffer['index'] = index
+            buffer['mapped'] = mapped
             gltfObject.buffers.append(Buffer.fromData(**buffer))
 
-        for bufferView in gltfDescription['bufferViews']:
-            gltfObject.bufferViews.append(BufferView.fromData(**bufferView))        
+        for name, factory in (
+                ('bufferViews', lambda data: BufferView.fromData(**data)),
+                ('accessors', lambda data: Accessor.fromData(**data)),
+                ('scenes', lambda data: Scene.fromData(**data)),
+                ('nodes', lambda data: Node.fromData(**data)),
+                ('meshes', GLTF.meshFromData)):
+            data = gltfDescription.get(name, [])
+            if lazy:
+                setattr(gltfObject, name, core.LazyList(data, factory))
+            else:
+                setattr(gltfObject, name, [factory(d) for d in data])
 
-        for accessor in gltfDescription['accessors']:
-            gltfObject.accessors.append(Accessor.fromData(**accessor))
+        gltfObject.skippedProperties = sorted(set(gltfDescription) - set(name for name, value in gltfObject.getProperties()))
 
-        for scene in gltfDescription['scenes']:
-            gltfObject.scenes.append(Scene.fromData(**scene))
-
-        for node in gltfDescription['nodes']:
-            gltfObject.nodes.append(Node.fromData(**node))
+        return gltfObject
 
-        for mesh in gltfDescription['meshes']:
-            m = Mesh.fromData(**mesh)
-            for index, primitive in enumerate(m.primitives):
-                m.primitives[index] = Primitive.fromData(**primitive)
-            gltfObject.meshes.append(m)
+    @staticmethod
+    def meshFromData(data):
+        m = Mesh.fromData(**data)
+        if m.primitives is not None:
+            m.primitives = [Primitive.fromData(**p) for p in m.primitives]
 
-        return gltfObject
+        return m
 
         
 class Asset(core.GLTFSpecObject):
@@ -188,6 +488,7 @@ class Asset(core.GLTFSpecObject):
 class Accessor(core.GLTFSpecObject):
     fields = ['bufferView', 'byteOffset', 'componentType', 'normalized', 'count', 'type', 'max', 'min', 'sparse', 'name', 'extensions', 'extras']
     requiredFields = ['componentType', 'count', 'type']
+    float32Fields = ['max', 'min']
 
     def __init__(self):
         # int, >= 0
@@ -215,10 +516,22 @@ class Accessor(core.GLTFSpecObject):
         # any
         self.extras = None
 
+    @property
+    def compactGLTF(self):
+        # Integer bounds must stay exact.
+        if self.componentType != core.COMPONENT_TYPE_FLOAT:
+            return self.gltf
+
+        return super(Accessor, self).compactGLTF
+
+    def getElementSize(self):
+        return core.COMPONENT_TYPE_SIZES[self.componentType] * core.DATA_TYPE_COMPONENT_COUNTS[self.type]
+
 
 class Buffer(core.GLTFSpecObject):
     fields = ['uri', 'byteLength', 'name', 'extensions', 'extras']
     requiredFields = ['byteLength']
+    internalFields = ['_data', '_bufferIndex', '_map', '_stream', '_streamPath', '_streamLength']
 
     def __init__(self, bufferIndex=0):
         # str
@@ -232,9 +545,18 @@ class Buffer(core.GLTFSpecObject):
         # any
         self.extras = None
 
-        self._data = b''
+        # Grown in place so appending views stays linear in the final buffer size.
+        self._data = bytearray()
         self._bufferIndex = bufferIndex
 
+        # Memory map the data is read from, see mapFile.
+        self._map = None
+
+        # Open file that appended data is written through to, see streamTo.
+        self._stream = None
+        self._streamPath = None
+        self._streamLength = 0
+
     @property
     def gltf(self):
         self.byteLength = self.getByteLength()
@@ -251,16 +573,139 @@ class Buffer(core.GLTFSpecObject):
     def fromData(cls, **kwargs):
         _instance = super(Buffer, cls).fromData(**kwargs)
 
-        if 'directory' in kwargs:
-            with open(os.path.join(kwargs['directory'], _instance.uri), 'rb') as fp:
-                _instance._data = fp.read()
+        if _instance.uri is not None and core.isDataUri(_instance.uri):
+            _instance._data = core.decodeDataUri(_instance.uri, kwargs.get('byteLength'))
+        elif 'path' in kwargs:
+            filePath = kwargs['path']
+            if kwargs.get('mapped', False):
+                _instance.mapFile(filePath)
+            else:
+                with open(filePath, 'rb') as fp:
+                    _instance._data = fp.read()
 
         if 'index' in kwargs:
             _instance._bufferIndex = kwargs['index']
 
         return _instance
 
+    def mapFile(self, filePath, byteOffset=0, byteLength=None):
+        """Back the buffer with a read-only memory map of the given file, or a range of it."""
+        with open(filePath, 'rb') as fp:
+            # Empty files cannot be mapped.
+            if os.fstat(fp.fileno()).st_size == 0:
+                self._data = b''
+                return
+
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if byteLength is None:
+            byteLength = len(self._map) - byteOffset
+
+        if byteOffset == 0 and byteLength == len(self._map):
+            self._data = self._map
+        else:
+            self._data = core.getMemorySlice(self._map, byteOffset, byteLength)
+
+    def streamTo(self, filePath=None):
+        """Write all appended data straight to a file instead of holding it in memory.
+
+        Args:
+            filePath (str): file to write the buffer to, a temporary file is used when None.
+        """
+        if self._stream is not None:
+            raise ValueError('Buffer is already streaming to a file.')
+
+        if filePath is None:
+            self._stream = tempfile.TemporaryFile()
+        else:
+            self._stream = io.open(filePath, 'w+b')
+            self._streamPath = os.path.abspath(filePath)
+
+        # Flush anything appended before streaming was enabled.
+        self._stream.write(self._data)
+        self._streamLength = len(self._data)
+        self._data = bytearray()
+
+    @property
+    def isStreaming(self):
+        return self._stream is not None
+
+    @property
+    def streamPath(self):
+        return self._streamPath
+
+    def flush(self):
+        if self._stream is not None:
+            self._stream.flush()
+
+    def writeTo(self, fp):
+        """Write the buffer contents to an open binary file."""
+        if self._stream is None:
+            fp.write(self._data)
+            return
+
+        self._stream.flush()
+        self._stream.seek(0)
+        shutil.copyfileobj(self._stream, fp)
+        self._stream.seek(0, os.SEEK_END)
+
+    def close(self):
+        """Release the memory map or stream backing the buffer, if any."""
+        if self._map is not None:
+            # Views into the map have to be released before it can be closed.
+            if isinstance(self._data, memoryview) and hasattr(self._data, 'release'):
+                self._data.release()
+            self._data = b''
+            self._map.close()
+            self._map = None
+
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+            self._streamPath = None
+
+    def append(self, binaryData):
+        """Append data to the buffer, padded to a 4 byte boundary.
+
+        Returns:
+            int: byte offset the data was written at.
+        """
+        padding = (4 - (len(binaryData) % 4)) % 4
+
+        if self._stream is not None:
+            byteOffset = self._streamLength
+            self._stream.write(binaryData)
+            self._stream.write(b'\x00' * padding)
+            self._streamLength += len(binaryData) + padding
+
+            return byteOffset
+
+        if not isinstance(self._data, bytearray):
+            # Loaded and mapped buffers are read-only, copy them once before growing.
+            self._data = bytearray(self._data[:])
+
+        byteOffset = len(self._data)
+        self._data += binaryData
+        self._data += b'\x00' * padding
+
+        return byteOffset
+
+    def getSlice(self, byteOffset, byteLength):
+        if self._stream is not None:
+            # Streamed data is no longer in memory, read a copy back from the file.
+            self._stream.flush()
+            self._stream.seek(byteOffset)
+            data = self._stream.read(byteLength)
+            self._stream.seek(0, os.SEEK_END)
+
+            return data
+
+        return core.getMemorySlice(self._data, byteOffset, byteLength)
+
     def getByteLength(self):
+        if self._stream is not None:
+            return self._streamLength
+
         return len(self._data)
 
     @property
@@ -301,20 +746,12 @@ class BufferView(core.GLTFSpecObject):
     @staticmethod
     def addBufferView(buffer, binaryData):
         if not isinstance(buffer, Buffer):
-            raise TypeError('buffer must be of type {0}'.format(buffer.Buffer))
-
-        if not isinstance(buffer, Buffer):
-            raise TypeError('buffer must be of type {0}'.format(buffer.Buffer))
+            raise TypeError('buffer must be of type {0}'.format(Buffer))
 
         buffView = BufferView()
         buffView.buffer = buffer.index
         buffView.byteLength = len(binaryData)
-        buffView.byteOffset = len(buffer.data)
-
-        buffer.data += binaryData
-
-        padding = (4 - (len(binaryData) % 4)) % 4
-        buffer.data += b'\x00' * padding
+        buffView.byteOffset = buffer.append(binaryData)
 
         return buffView
 
@@ -337,6 +774,7 @@ class Scene(core.GLTFSpecObject):
 class Node(core.GLTFSpecObject):
     fields = ['camera', 'children', 'skin', 'mesh', 'matrix', 'translation', 'rotation', 'scale', 'weights', 'name', 'extensions', 'extras']
     requiredFields = []
+    float32Fields = ['matrix', 'translation', 'rotation', 'scale']
 
     def __init__(self):
         # int >= 0
@@ -366,12 +804,13 @@ class Node(core.GLTFSpecObject):
 
     @property
     def gltf(self):
-        # Clean up matrix attributes if there is no transformation.
-        if self.matrix is not None:
-            if self.matrix == core.IDENTITY_MATRIX:
-                self.matrix = None
+        result = super(Node, self).gltf
+
+        # Leave out the matrix if there is no transformation.
+        if result.get('matrix') == core.IDENTITY_MATRIX:
+            del result['matrix']
 
-        return super(Node, self).gltf
+        return result
 
 class Mesh(core.GLTFSpecObject):
     fields = ['primitives', 'weights', 'name', 'extensions', 'extras']
@@ -389,6 +828,15 @@ class Mesh(core.GLTFSpecObject):
         # any
         self.extras = None
 
+    @property
+    def gltf(self):
+        result = super(Mesh, self).gltf
+
+        if self.primitives is not None:
+            result['primitives'] = [p.gltf for p in self.primitives]
+
+        return result
+
 
 class Primitive(core.GLTFSpecObject):
     fields = ['attributes', 'indices', 'material', 'mode', 'targets', 'extensions', 'extras']
@@ -414,15 +862,18 @@ class Primitive(core.GLTFSpecObject):
     def getIndicesComponentType(indicesList):
         logger = logging.getLogger(__name__)
 
-        if not isinstance(indicesList, (list, tuple)):    
-            logger.exception('This method only excepts list type arguments.')
+        # Packed buffers have no component type to read the indices with.
+        if not core.isNumberArray(indicesList):
+            logger.exception('This method only excepts list or array type arguments.')
             return 0
 
-        if max(indicesList) < 255:
+        maxIndex = core.getMaxValue(indicesList)
+
+        if maxIndex < 255:
             typ = core.COMPONENT_TYPE_UNSIGNED_BYTE
-        elif max(indicesList) < 65535:
+        elif maxIndex < 65535:
             typ = core.COMPONENT_TYPE_UNSIGNED_SHORT
-        elif max(indicesList) < 4294967295:
+        elif maxIndex < 4294967295:
             typ = core.COMPONENT_TYPE_UNSIGNED_INT
         else:
             logger.exception('Could not match to a component type.')
@@ -432,21 +883,20 @@ class Primitive(core.GLTFSpecObject):
 
     @staticmethod
     def indicesToBytes(data):
-        if not isinstance(data, (list, tuple)):
+        if not core.isNumberArray(data):
             logger = logging.getLogger(__name__)
-            logger.exception('This method only excepts list type arguments.')
+            logger.exception('This method only excepts list or array type arguments.')
             return ''
 
         typ = Primitive.getIndicesComponentType(data)
 
-        # return struct.pack(typ, data)
-        return array.array(core.COMPONENT_TYPE_CODES[typ], data).tostring()
+        return core.packComponents(data, typ)
         
     @staticmethod
     def positionsToBytes(data):
-        if not isinstance(data, (list, tuple)):
+        if not core.isArrayLike(data):
             logger = logging.getLogger(__name__)
-            logger.exception('This method only excepts list type arguments.')
+            logger.exception('This method only excepts list or array type arguments.')
             return ''
 
-        return array.array(core.COMPONENT_TYPE_CODES[core.COMPONENT_TYPE_FLOAT], data).tostring()
\ No newline at end of file
+        return core.packComponents(data, core.COMPONENT_TYPE_FLOAT)
@@ -0,0 +1,302 @@
+import logging
+
+import core
+
+
+# Tom Forsyth's linear-speed vertex cache optimisation scoring constants.
+VERTEX_CACHE_SIZE = 32
+CACHE_DECAY_POWER = 1.5
+LAST_TRIANGLE_SCORE = 0.75
+VALENCE_BOOST_SCALE = 2.0
+VALENCE_BOOST_POWER = 0.5
+
+# Post-transform cache size used when measuring ACMR, typical of GPU FIFO caches.
+ACMR_CACHE_SIZE = 16
+
+
+def weldVertices(indices, attributes):
+    """Merge vertices whose attribute values are identical and remap the indices to match.
+
+    Works on raw arrays so it can run on exported or imported primitives alike.
+    Unique vertices keep the order of their first occurrence.
+
+    Args:
+        indices (list): vertex index per triangle corner.
+        attributes (list): (values, componentCount) pair per vertex attribute,
+            values being a flat list or array, e.g. [(positions, 3), (normals, 3)].
+
+    Returns:
+        tuple: remapped indices, list of welded attribute values and a stats dict
+            with vertexCount, weldedVertexCount and bytesSaved.
+    """
+    logger = logging.getLogger(__name__)
+
+    if not attributes:
+        raise ValueError('At least one vertex attribute is required to weld vertices.')
+
+    vertexCount = len(attributes[0][0]) // attributes[0][1]
+
+    if core.numpy is not None:
+        remap, uniqueVertices = _getWeldRemapNumpy(attributes, vertexCount)
+        newIndices = remap[core.numpy.asarray(indices, dtype='int64')].astype('uint32')
+        newAttributes = [
+            core.numpy.asarray(values).reshape(vertexCount, count)[uniqueVertices].ravel()
+            for values, count in attributes]
+    else:
+        remap, uniqueVertices = _getWeldRemap(attributes, vertexCount)
+        newIndices = [remap[i] for i in indices]
+        newAttributes = []
+        for values, count in attributes:
+            welded = []
+            for vertex in uniqueVertices:
+                welded.extend(values[vertex * count:(vertex + 1) * count])
+            newAttributes.append(welded)
+
+    weldedVertexCount = len(uniqueVertices)
+    vertexSize = sum(core.COMPONENT_TYPE_SIZES[core.COMPONENT_TYPE_FLOAT] * count for values, count in attributes)
+
+    stats = {
+        'vertexCount': vertexCount,
+        'weldedVertexCount': weldedVertexCount,
+        'bytesSaved': (vertexCount - weldedVertexCount) * vertexSize,
+    }
+
+    logger.info('Welded {vertexCount} vertices down to {weldedVertexCount}, saving {bytesSaved} bytes.'.format(**stats))
+
+    return newIndices, newAttributes, stats
+
+
+def _getWeldRemap(attributes, vertexCount):
+    remap = []
+    uniqueVertices = []
+    seen = {}
+
+    for vertex in range(vertexCount):
+        key = tuple(
+            tuple(values[vertex * count:(vertex + 1) * count])
+            for values, count in attributes)
+
+        newIndex = seen.get(key)
+        if newIndex is None:
+            newIndex = len(uniqueVertices)
+            seen[key] = newIndex
+            uniqueVertices.append(vertex)
+
+        remap.append(newIndex)
+
+    return remap, uniqueVertices
+
+
+def _getWeldRemapNumpy(attributes, vertexCount):
+    numpy = core.numpy
+
+    columns = []
+    for values, count in attributes:
+        values = numpy.asarray(values)
+        # Floats are keyed as written, float32, integers such as joint indices on their own values.
+        if values.dtype.kind not in 'iub':
+            values = values.astype('float32')
+        columns.append(numpy.ascontiguousarray(values.reshape(vertexCount, count)).view('uint8').reshape(vertexCount, count * values.dtype.itemsize))
+
+    rows = numpy.ascontiguousarray(numpy.hstack(columns))
+    # Compare whole rows as opaque byte strings, so equal attribute tuples hash equally.
+    keys = rows.view(numpy.dtype((numpy.void, rows.shape[1]))).ravel()
+
+    _, firstIndices, inverse = numpy.unique(keys, return_index=True, return_inverse=True)
+
+    # numpy.unique sorts by key, renumber so unique vertices keep first-occurrence order.
+    order = numpy.argsort(firstIndices)
+    rank = numpy.empty_like(order)
+    rank[order] = numpy.arange(len(order))
+
+    return rank[inverse], firstIndices[order]
+
+
+def getACMR(indices, cacheSize=ACMR_CACHE_SIZE):
+    """Get the average cache miss ratio of a triangle list against a FIFO vertex cache.
+
+    Returns:
+        float: cache misses per triangle, between 0.5 at best and 3.0 at worst.
+    """
+    indices = core.toList(indices)
+    triangleCount = len(indices) // 3
+    if not triangleCount:
+        return 0.0
+
+    cache = set()
+    fifo = []
+    misses = 0
+
+    for vertex in indices:
+        if vertex in cache:
+            continue
+
+        misses += 1
+        cache.add(vertex)
+        fifo.append(vertex)
+
+        if len(fifo) > cacheSize:
+            cache.discard(fifo.pop(0))
+
+    return float(misses) / triangleCount
+
+
+def _getVertexScore(cachePosition, remainingTriangles):
+    if remainingTriangles == 0:
+        # Vertex is no longer used by any triangle.
+        return -1.0
+
+    score = 0.0
+    if cachePosition >= 0:
+        if cachePosition < 3:
+            # Vertices of the last triangle get a fixed score, so the next triangle does not simply reuse them.
+            score = LAST_TRIANGLE_SCORE
+        else:
+            scaler = 1.0 / (VERTEX_CACHE_SIZE - 3)
+            score = (1.0 - (cachePosition - 3) * scaler) ** CACHE_DECAY_POWER
+
+    # Boost vertices with few triangles left, so lone triangles are not left behind.
+    score += VALENCE_BOOST_SCALE * remainingTriangles ** -VALENCE_BOOST_POWER
+
+    return score
+
+
+def optimizeVertexCache(indices, vertexCount=None):
+    """Reorder triangles to improve post-transform vertex cache hits.
+
+    Returns:
+        list: triangle indices in the new order.
+    """
+    indices = core.toList(indices)
+    triangleCount = len(indices) // 3
+    if not triangleCount:
+        return indices
+
+    if vertexCount is None:
+        vertexCount = max(indices) + 1
+
+    vertexTriangles = [[] for i in range(vertexCount)]
+    for triangle in range(triangleCount):
+        for vertex in indices[triangle * 3:triangle * 3 + 3]:
+            vertexTriangles[vertex].append(triangle)
+
+    remaining = [len(t) for t in vertexTriangles]
+    cachePositions = [-1] * vertexCount
+    vertexScores = [_getVertexScore(-1, r) for r in remaining]
+    triangleScores = [
+        sum(vertexScores[v] for v in indices[triangle * 3:triangle * 3 + 3])
+        for triangle in range(triangleCount)]
+    triangleAdded = [False] * triangleCount
+
+    cache = []
+    result = []
+    nextTriangle = 0
+    bestTriangle = max(range(triangleCount), key=triangleScores.__getitem__)
+
+    for i in range(triangleCount):
+        if bestTriangle < 0:
+            # Nothing connected is left in the cache, carry on with the next unused triangle.
+            while triangleAdded[nextTriangle]:
+                nextTriangle += 1
+            bestTriangle = nextTriangle
+
+        triangleVertices = indices[bestTriangle * 3:bestTriangle * 3 + 3]
+        result.extend(triangleVertices)
+        triangleAdded[bestTriangle] = True
+
+        for vertex in triangleVertices:
+            remaining[vertex] -= 1
+            vertexTriangles[vertex].remove(bestTriangle)
+            if vertex in cache:
+                cache.remove(vertex)
+
+        cache = triangleVertices + cache
+        evicted = cache[VERTEX_CACHE_SIZE:]
+        cache = cache[:VERTEX_CACHE_SIZE]
+
+        for vertex in evicted:
+            cachePositions[vertex] = -1
+
+        # Rescore the vertices whose cache position changed, and the triangles using them.
+        for position, vertex in enumerate(cache):
+            cachePositions[vertex] = position
+
+        touched = set()
+        for vertex in cache + evicted:
+            newScore = _getVertexScore(cachePositions[vertex], remaining[vertex])
+            delta = newScore - vertexScores[vertex]
+            vertexScores[vertex] = newScore
+
+            for triangle in vertexTriangles[vertex]:
+                triangleScores[triangle] += delta
+                touched.add(triangle)
+
+        # Only pick once every delta is in, a triangle sharing several vertices gets them all.
+        bestTriangle = max(touched, key=triangleScores.__getitem__) if touched else -1
+
+    return result
+
+
+def optimizeVertexFetch(indices, attributes):
+    """Renumber vertices in the order they are first used by the triangles.
+
+    Unreferenced vertices are dropped.
+
+    Args:
+        indices (list): vertex index per triangle corner.
+        attributes (list): (values, componentCount) pair per vertex attribute.
+
+    Returns:
+        tuple: remapped indices and list of reordered attribute values.
+    """
+    indices = core.toList(indices)
+
+    remap = {}
+    order = []
+    newIndices = []
+    for vertex in indices:
+        newIndex = remap.get(vertex)
+        if newIndex is None:
+            newIndex = len(order)
+            remap[vertex] = newIndex
+            order.append(vertex)
+        newIndices.append(newIndex)
+
+    newAttributes = []
+    for values, count in attributes:
+        if core.numpy is not None:
+            values = core.numpy.asarray(values).reshape(-1, count)
+            newAttributes.append(values[order].ravel())
+            continue
+
+        reordered = []
+        for vertex in order:
+            reordered.extend(values[vertex * count:(vertex + 1) * count])
+        newAttributes.append(reordered)
+
+    return newIndices, newAttributes
+
+
+def optimizePrimitive(indices, attributes):
+    """Reorder a triangle list for the vertex cache, then its vertices for fetch locality.
+
+    Returns:
+        tuple: new indices, list of reordered attribute values and a stats dict
+            with acmrBefore and acmrAfter.
+    """
+    logger = logging.getLogger(__name__)
+
+    vertexCount = len(attributes[0][0]) // attributes[0][1] if attributes else None
+
+    acmrBefore = getACMR(indices)
+    indices = optimizeVertexCache(indices, vertexCount)
+    indices, attributes = optimizeVertexFetch(indices, attributes)
+
+    stats = {
+        'acmrBefore': acmrBefore,
+        'acmrAfter': getACMR(indices),
+    }
+
+    logger.info('Vertex cache ACMR went from {acmrBefore:.3f} to {acmrAfter:.3f}.'.format(**stats))
+
+    return indices, attributes, stats
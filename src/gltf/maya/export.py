@@ -3,8 +3,9 @@ import math
 
 from maya.api import OpenMaya
 
+import rawpoints
 import utils
-from gltf.interface import core, gltf
+from gltf.interface import core, gltf, mesh
 
 
 class ExportContext(object):
@@ -24,7 +25,7 @@ class ExportContext(object):
         self._gltf = gltf.GLTF()
 
 
-def exportSelection(exportContext=None):
+def exportSelection(exportContext=None, optimize=False, outputDirectory='/Users/ricksilliker/Desktop/testAsset'):
     # hierarchy = getExportContext(selection=True)
 
     logger = logging.getLogger(__name__)
@@ -34,15 +35,21 @@ def exportSelection(exportContext=None):
     ctx.asset = gltf.Asset()
 
     ctx.buffers.append(gltf.Buffer())
+    # Spill binary data to disk as it is gathered, instead of keeping it next to the scene.
+    ctx.buffers[0].streamTo()
 
     ctx.scenes.append(gltf.Scene())
     ctx.scenes[0].nodes = []
     ctx.scenes[0].name = utils.getSceneName()
 
     getExportForTransforms(ctx)
-    getExportForMeshes(ctx)
+    stats = getExportForMeshes(ctx, optimize)
 
-    gltf.GLTF.exportGLTF(ctx, '/Users/ricksilliker/Desktop/testAsset')
+    gltf.GLTF.exportGLTF(ctx, outputDirectory)
+
+    ctx.buffers[0].close()
+
+    return stats
         
 
 def getExportForTransforms(gltfContext):
@@ -64,7 +71,7 @@ def getExportForTransforms(gltfContext):
 def getGLTFNodes(ctx, nodes, nodeList, parentIndex=None):
     for n in nodes:
         nodeIndex = getGLTFNode(ctx, n, nodeList, parentIndex)
-        getGLTFNodes(ctx, utils.getChildren(n), nodeList, nodeIndex)
+        getGLTFNodes(ctx, utils.getChildren(n, recursive=False), nodeList, nodeIndex)
 
 
 def getGLTFNode(ctx, mobject, nodeList, parentIndex=None):
@@ -89,17 +96,42 @@ def getGLTFNode(ctx, mobject, nodeList, parentIndex=None):
     return nodeIndex
 
 
-def getExportForMeshes(gltfContext):
+def getExportForMeshes(gltfContext, optimize=False):
+    """Export the meshes of every node and log how much welding and the vertex cache optimization did.
+
+    Returns:
+        dict: primitiveCount, vertexCount, weldedVertexCount and bytesSaved, plus
+            acmrBefore and acmrAfter averaged over the triangles when optimizing.
+    """
     logger = logging.getLogger(__name__)
 
+    stats = {'primitiveCount': 0, 'vertexCount': 0, 'weldedVertexCount': 0, 'bytesSaved': 0}
+    cacheStats = []
+
     for nodeIndex, gltfNode in enumerate(gltfContext.nodes):
-        nodeMObject = utils.getMObject(gltfNode.name)
-        meshIndex = getGLTFMesh(gltfContext, nodeIndex)
+        getGLTFMesh(gltfContext, nodeIndex, optimize, stats, cacheStats)
+
+    logger.info(
+        'Exported {primitiveCount} primitives, welded {vertexCount} vertices down to '
+        '{weldedVertexCount}, saving {bytesSaved} bytes.'.format(**stats))
+
+    triangleCount = sum(c for c, primitiveStats in cacheStats)
+    if triangleCount:
+        for key in ('acmrBefore', 'acmrAfter'):
+            stats[key] = sum(c * primitiveStats[key] for c, primitiveStats in cacheStats) / float(triangleCount)
+
+        logger.info('Vertex cache ACMR went from {acmrBefore:.3f} to {acmrAfter:.3f} over all primitives.'.format(**stats))
+
+    return stats
 
-    # logger.info(gltfContext)
 
+def getGLTFMesh(ctx, nodeIndex, optimize=False, stats=None, cacheStats=None):
+    """Export the meshes under a node as one glTF mesh.
 
-def getGLTFMesh(ctx, nodeIndex):
+    Args:
+        stats (dict): weld totals to add each primitive's weld stats to.
+        cacheStats (list): gets a (triangleCount, stats) pair per optimized primitive.
+    """
     buff = ctx.buffers[0]
 
     n = ctx.nodes[nodeIndex]
@@ -109,43 +141,40 @@ def getGLTFMesh(ctx, nodeIndex):
         m = gltf.Mesh()
         m.primitives = []
 
-        ctx.meshes.append(m)
-        
-        n.mesh = len(ctx.meshes) - 1
-        
         for meshMObject in meshes:
             # Skip meshes that are deformer source nodes.
             if utils.isIntermediateObject(meshMObject):
                 continue
 
+            meshFn = OpenMaya.MFnMesh(meshMObject)
+
+            indices, positions, positionMin, positionMax = getMeshArrays(meshFn)
+            # Primitives must have attributes, so empty meshes are left out.
+            if not len(indices):
+                continue
+
             prim = gltf.Primitive()
             prim.attributes = {}
             m.primitives.append(prim)
 
-            meshFn = OpenMaya.MFnMesh(meshMObject)
-
-            vertCount = meshFn.numVertices
-            vertArray = [x for x in range(vertCount)]
-
-            triCorrelation, triVertIds = meshFn.getTriangles()
-            triCount = 0
-            for t in triCorrelation:
-                triCount += t
-            indices = [x for x in range(triCount * 3)]
+            indices, (positions,), weldStats = mesh.weldVertices(indices, [(positions, 3)])
+            if stats is not None:
+                stats['primitiveCount'] += 1
+                for key, value in weldStats.items():
+                    stats[key] += value
 
-            mpoints = [meshFn.getPoint(i) for i in triVertIds]
-            positions = []
-            for index in indices:
-                pt = mpoints[index]
-                positions.extend([pt.x, pt.y, pt.z])
+            if optimize:
+                indices, (positions,), primitiveCacheStats = mesh.optimizePrimitive(indices, [(positions, 3)])
+                if cacheStats is not None:
+                    cacheStats.append((len(indices) // 3, primitiveCacheStats))
 
             # mesh indices accessor            
             indicesAccessor = gltf.Accessor()
             indicesAccessor.type = "SCALAR"
             indicesAccessor.componentType = gltf.Primitive.getIndicesComponentType(indices)
             indicesAccessor.count = len(indices)
-            indicesAccessor.min = [min(indices)]
-            indicesAccessor.max = [max(indices)]
+            indicesAccessor.min = [int(core.getMinValue(indices))]
+            indicesAccessor.max = [int(core.getMaxValue(indices))]
 
             buffData = gltf.Primitive.indicesToBytes(indices)
 
@@ -163,18 +192,9 @@ def getGLTFMesh(ctx, nodeIndex):
             positionAccessor.type = "VEC3"
             positionAccessor.componentType = core.COMPONENT_TYPE_FLOAT
 
-            positionAccessor.count = len(indices)
-
-            positionAccessor.min = [float('inf') for i in range(3)]
-            positionAccessor.max = [-float('inf') for i in range(3)]
-
-            for pt in mpoints:
-                for i, c in enumerate(pt):
-                    if i > 2:
-                        continue
-
-                    positionAccessor.min[i] = min(positionAccessor.min[i], c)
-                    positionAccessor.max[i] = max(positionAccessor.max[i], c)
+            positionAccessor.count = len(positions) // 3
+            positionAccessor.min = positionMin
+            positionAccessor.max = positionMax
 
             buffData = gltf.Primitive.positionsToBytes(positions)
             buffView = gltf.BufferView.addBufferView(buff, buffData)
@@ -186,6 +206,41 @@ def getGLTFMesh(ctx, nodeIndex):
 
             prim.attributes['POSITION'] = len(ctx.accessors) - 1
 
+        # Meshes must have primitives, so nodes with only empty or intermediate meshes get none.
+        if m.primitives:
+            ctx.meshes.append(m)
+            n.mesh = len(ctx.meshes) - 1
+
+
+def getMeshArrays(meshFn):
+    """Get a mesh's triangle index buffer and packed vertex positions in bulk.
+
+    Positions are copied straight from the mesh's raw float points, rather than
+    going through one MPoint per vertex.
+
+    Returns:
+        tuple: indices, flat xyz positions, position min and position max.
+    """
+    points = rawpoints.getPoints(meshFn.fullPathName())
+    triCounts, triVertIds = meshFn.getTriangles()
+
+    positions = core.unpackComponents(
+        points, core.COMPONENT_TYPE_FLOAT, 'VEC3', len(points) // rawpoints.POINT_SIZE)
+
+    if core.numpy is not None:
+        indices = core.numpy.array(triVertIds, dtype='uint32')
+        positionMin = [float(c) for c in positions.min(axis=0)]
+        positionMax = [float(c) for c in positions.max(axis=0)]
+
+        return indices, positions.ravel(), positionMin, positionMax
+
+    indices = list(triVertIds)
+
+    positionMin = [min(positions[i::3]) for i in range(3)]
+    positionMax = [max(positions[i::3]) for i in range(3)]
+
+    return indices, positions, positionMin, positionMax
+
 
             
             
@@ -3,6 +3,8 @@ import math
 
 from maya.api import OpenMaya
 
+import modifier
+import rawpoints
 import utils
 from gltf.interface import core, gltf
 
@@ -10,32 +12,187 @@ from gltf.interface import core, gltf
 def importGLTF(directory):
     logger = logging.getLogger(__name__)
     
-    ctx = gltf.GLTF.importGLTF(directory)
+    # Binary glTF assets are a single file rather than a directory.
+    if directory.endswith('.glb'):
+        ctx = gltf.GLTF.importGLB(directory, mapped=True)
+    else:
+        ctx = gltf.GLTF.importGLTF(directory, mapped=True)
 
     # logger.info(ctx.serialized())
 
-    nodes = []
+    # The hierarchy and its meshes are created together, as one undo step.
+    dagModifier = modifier.DagModifier()
+    nodes = createHierarchy(ctx.nodes, dagModifier)
+    createMeshes(ctx, nodes, dagModifier)
+    dagModifier.doIt()
 
-    for node in ctx.nodes:
-        nodeFn = createTransform(node.name)
-        nodes.append(nodeFn)
+    return nodes
 
-    for index, nodeMObject in enumerate(nodes):
-        dagNode = OpenMaya.MFnDagNode(nodeMObject)
 
-        gltfNode = ctx.nodes[index]
-        if gltfNode.children is not None:
-            for childMObject in [nodes[i] for i in gltfNode.children]:
-                dagNode.addChild(childMObject)
+def getHierarchyOrder(gltfNodes):
+    """Get node indices ordered parents first, with the parent index of each node.
 
-    for index, nodeMObject in enumerate(nodes):
-        mat = ctx.nodes[index].matrix
-        if mat is not None:
-            matFn = OpenMaya.MMatrix(mat)
-            transformMatFn = OpenMaya.MTransformationMatrix(matFn)
-            transformFn = OpenMaya.MFnTransform(nodeMObject)
-            transformFn.setTransformation(transformMatFn)
+    Returns:
+        tuple: ordered node indices and parent index per node, None for roots.
+    """
+    parents = [None] * len(gltfNodes)
+    for index, gltfNode in enumerate(gltfNodes):
+        for child in gltfNode.children or []:
+            parents[child] = index
 
+    order = [i for i, parent in enumerate(parents) if parent is None]
+    # Breadth first, the list grows while it is walked.
+    for index in order:
+        order.extend(gltfNodes[index].children or [])
 
-def createTransform(name):
-    return OpenMaya.MFnDagNode().create('transform', name)
\ No newline at end of file
+    return order, parents
+
+
+def getLocalTransform(gltfNode):
+    """Get the translate, rotate in radians and scale values of a node.
+
+    Returns:
+        tuple: translate, rotate and scale, each None when it is the default value.
+    """
+    if gltfNode.matrix is not None:
+        transformMat = OpenMaya.MTransformationMatrix(OpenMaya.MMatrix(gltfNode.matrix))
+        translate = transformMat.translation(OpenMaya.MSpace.kTransform)
+        rotation = transformMat.rotation()
+        scale = transformMat.scale(OpenMaya.MSpace.kTransform)
+    else:
+        translate = gltfNode.translation
+        rotation = None
+        if gltfNode.rotation is not None:
+            rotation = OpenMaya.MQuaternion(*gltfNode.rotation).asEulerRotation()
+        scale = gltfNode.scale
+
+    rotate = [rotation.x, rotation.y, rotation.z] if rotation is not None else None
+
+    values = []
+    for value, default in ((translate, 0.0), (rotate, 0.0), (scale, 1.0)):
+        if value is not None and all(v == default for v in value):
+            value = None
+        values.append(value)
+
+    return tuple(values)
+
+
+def createHierarchy(gltfNodes, dagModifier=None):
+    """Create a transform per glTF node, parented at creation and in one undoable edit.
+
+    The nodes are queued on dagModifier when given, otherwise they are created right away.
+
+    Returns:
+        list: transform MObject per node.
+    """
+    order, parents = getHierarchyOrder(gltfNodes)
+
+    nodes = [None] * len(gltfNodes)
+    execute = dagModifier is None
+    if execute:
+        dagModifier = modifier.DagModifier()
+
+    for index in order:
+        gltfNode = gltfNodes[index]
+        parent = parents[index]
+
+        nodes[index] = dagModifier.createNode(
+            'transform', nodes[parent] if parent is not None else None, gltfNode.name)
+
+        translate, rotate, scale = getLocalTransform(gltfNode)
+        if translate is not None:
+            dagModifier.setDoubles(nodes[index], 'translate', translate)
+        if rotate is not None:
+            dagModifier.setAngles(nodes[index], 'rotate', rotate)
+        if scale is not None:
+            dagModifier.setDoubles(nodes[index], 'scale', scale)
+
+    if execute:
+        dagModifier.doIt()
+
+    return nodes
+
+
+def createMeshData(vertexCount, polygonConnects):
+    """Build a triangle mesh with all its points at the origin into a new mesh data object, outside of any scene node.
+
+    The points are filled in afterwards with DagModifier.setPoints, in bulk.
+
+    Returns:
+        OpenMaya.MObject
+    """
+    meshData = OpenMaya.MFnMeshData().create()
+    vertices = OpenMaya.MFloatPointArray(vertexCount, OpenMaya.MFloatPoint())
+    polygonCounts = [3] * (len(polygonConnects) // 3)
+    OpenMaya.MFnMesh().create(vertices, polygonCounts, polygonConnects, parent=meshData)
+
+    return meshData
+
+
+def createMeshes(ctx, nodes, dagModifier=None):
+    """Create the mesh shapes of every node referencing a mesh, one per triangle primitive.
+
+    Each shape is a mesh node with its inMesh set to mesh data built from the
+    accessors, and a member of initialShadingGroup. The edits are queued on
+    dagModifier when given, so undoing the import removes the shapes with
+    their transforms. Primitives using the same accessors share their mesh
+    data, primitives without positions are skipped.
+
+    Returns:
+        list: mesh MObjects, valid once the modifier has run.
+    """
+    logger = logging.getLogger(__name__)
+
+    points = {}
+    meshData = {}
+    result = []
+    shadingGroup = None
+
+    execute = dagModifier is None
+    if execute:
+        dagModifier = modifier.DagModifier()
+
+    for index, gltfNode in enumerate(ctx.nodes):
+        if gltfNode.mesh is None:
+            continue
+
+        for primitive in ctx.meshes[gltfNode.mesh].primitives:
+            if primitive.mode != core.PRIMITIVE_MODE_TRIANGLES:
+                logger.warning('Skipping primitive of mode {0}, only triangles are imported.'.format(primitive.mode))
+                continue
+
+            positionIndex = (primitive.attributes or {}).get('POSITION')
+            if positionIndex is None:
+                logger.warning('Skipping a primitive of mesh {0} without POSITION.'.format(gltfNode.mesh))
+                continue
+
+            key = (positionIndex, primitive.indices)
+
+            if positionIndex not in points:
+                points[positionIndex] = gltf.Primitive.positionsToBytes(ctx.getAccessorArray(positionIndex))
+            positions = points[positionIndex]
+            vertexCount = len(positions) // rawpoints.POINT_SIZE
+
+            if key not in meshData:
+                if primitive.indices is None:
+                    polygonConnects = range(vertexCount)
+                else:
+                    polygonConnects = OpenMaya.MIntArray(core.toList(ctx.getAccessorArray(primitive.indices)))
+
+                meshData[key] = createMeshData(vertexCount, polygonConnects)
+
+            if shadingGroup is None:
+                shadingGroup = utils.getMObject('initialShadingGroup')
+
+            shape = dagModifier.createNode('mesh', nodes[index])
+            dagModifier.setData(shape, 'inMesh', meshData[key])
+            dagModifier.setPoints(shape, 'inMesh', positions)
+            dagModifier.addToSet(shape, shadingGroup)
+            result.append(shape)
+
+    if execute:
+        dagModifier.doIt()
+
+    logger.info('Created {0} meshes from {1} position accessors.'.format(len(result), len(points)))
+
+    return result
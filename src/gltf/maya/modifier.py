@@ -0,0 +1,160 @@
+"""Queue the DAG edits of an import and run them as one undoable step.
+
+Edits are queued on an OpenMaya.MDagModifier. Mesh points are copied in bulk
+once it has run, through an API 1.0 modifier, see rawpoints. The modifiers are
+then handed to an undoable command that this module registers when it is
+loaded as a plugin, so undo and redo act on the whole import.
+"""
+import os
+
+from maya.api import OpenMaya
+from maya import cmds
+
+from gltf.maya import rawpoints
+
+
+COMMAND_NAME = 'gltfModifier'
+
+# Lists of modifiers that were executed and wait for the undo command to pick them up.
+_pending = []
+
+
+def maya_useNewAPI():
+    """Tells Maya this plugin uses the Python API 2.0."""
+    pass
+
+
+class ModifierCommand(OpenMaya.MPxCommand):
+    """Puts the last executed modifiers on the undo queue."""
+
+    def __init__(self):
+        super(ModifierCommand, self).__init__()
+        self._modifiers = []
+
+    @staticmethod
+    def creator():
+        return ModifierCommand()
+
+    def doIt(self, args):
+        # Maya loads the plugin as its own module, so reach the queue through the package.
+        from gltf.maya import modifier
+        self._modifiers = modifier._pending.pop()
+
+    def isUndoable(self):
+        return True
+
+    def undoIt(self):
+        for m in reversed(self._modifiers):
+            m.undoIt()
+
+    def redoIt(self):
+        for m in self._modifiers:
+            m.doIt()
+
+
+def initializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).registerCommand(COMMAND_NAME, ModifierCommand.creator)
+
+
+def uninitializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)
+
+
+def loadPlugin():
+    pluginPath = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+
+    if not cmds.pluginInfo(pluginPath, query=True, loaded=True):
+        cmds.loadPlugin(pluginPath, quiet=True)
+
+
+def getPlug(node, attr):
+    return OpenMaya.MFnDependencyNode(node).findPlug(attr, False)
+
+
+class DagModifier(object):
+    """Queues node creation and plug writes, executed together by doIt."""
+
+    def __init__(self):
+        self._modifier = OpenMaya.MDagModifier()
+        self._points = []
+        # Next free dagSetMembers index per set name.
+        self._memberIndices = {}
+
+    def createNode(self, nodeType, parent=None, name=None):
+        """Queue a new DAG node, parented at creation time.
+
+        Returns:
+            OpenMaya.MObject: the node, valid once doIt has run.
+        """
+        if parent is None:
+            node = self._modifier.createNode(nodeType)
+        else:
+            node = self._modifier.createNode(nodeType, parent)
+
+        if name is not None:
+            self._modifier.renameNode(node, name)
+
+        return node
+
+    def setDoubles(self, node, attr, values):
+        """Queue values for the children of a compound attribute, e.g. translate."""
+        plug = getPlug(node, attr)
+
+        for index, value in enumerate(values):
+            self._modifier.newPlugValueDouble(plug.child(index), value)
+
+    def setAngles(self, node, attr, radians):
+        """Queue angles in radians for the children of a compound attribute, e.g. rotate."""
+        plug = getPlug(node, attr)
+
+        for index, value in enumerate(radians):
+            self._modifier.newPlugValueMAngle(plug.child(index), OpenMaya.MAngle(value))
+
+    def setData(self, node, attr, data):
+        """Queue a data object, such as mesh data from MFnMeshData, as the value of an attribute."""
+        self._modifier.newPlugValue(getPlug(node, attr), data)
+
+    def setPoints(self, node, attr, data):
+        """Queue packed float32 x, y, z points for the mesh data of an attribute, e.g. inMesh.
+
+        The attribute must hold mesh data with as many points once the other
+        edits ran, such as data set with setData.
+        """
+        self._points.append((node, attr, data))
+
+    def addToSet(self, node, setNode):
+        """Queue making a shape a member of a set, e.g. initialShadingGroup to shade it."""
+        members = getPlug(setNode, 'dagSetMembers')
+
+        setName = OpenMaya.MFnDependencyNode(setNode).name()
+        if setName not in self._memberIndices:
+            indices = members.getExistingArrayAttributeIndices()
+            self._memberIndices[setName] = indices[-1] + 1 if indices else 0
+
+        index = self._memberIndices[setName]
+        self._memberIndices[setName] += 1
+
+        self._modifier.connect(
+            getPlug(node, 'instObjGroups').elementByLogicalIndex(0), members.elementByLogicalIndex(index))
+
+    def doIt(self):
+        """Execute every queued edit and record them as a single undo step."""
+        loadPlugin()
+
+        self._modifier.doIt()
+        modifiers = [self._modifier]
+
+        if self._points:
+            edits = [(OpenMaya.MFnDagNode(n).fullPathName(), attr, data) for n, attr, data in self._points]
+            try:
+                modifiers.append(rawpoints.setPoints(edits))
+            except Exception:
+                self._modifier.undoIt()
+                raise
+
+        _pending.append(modifiers)
+        getattr(cmds, COMMAND_NAME)()
+
+        self._modifier = OpenMaya.MDagModifier()
+        self._points = []
+        self._memberIndices = {}
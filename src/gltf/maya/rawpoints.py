@@ -0,0 +1,64 @@
+"""Copy mesh points to and from packed float32 x, y, z bytes in bulk.
+
+The Python API 2.0 passes points one MPoint or MFloatPoint per vertex. The API
+1.0 MFnMesh.getRawPoints gives the mesh's own float array instead, which is
+copied in one go with ctypes.
+"""
+import ctypes
+
+from maya import OpenMaya
+
+
+# Bytes per point, three float32.
+POINT_SIZE = 12
+
+
+def getDependNode(name):
+    """Get the API 1.0 MObject of a node by name or path."""
+    selectionList = OpenMaya.MSelectionList()
+    selectionList.add(name)
+
+    node = OpenMaya.MObject()
+    selectionList.getDependNode(0, node)
+
+    return node
+
+
+def getRawPointsAddress(meshFn):
+    return int(meshFn.getRawPoints())
+
+
+def getPoints(name):
+    """Get the points of a mesh by name or path as packed float32 x, y, z bytes."""
+    meshFn = OpenMaya.MFnMesh(getDependNode(name))
+
+    return ctypes.string_at(getRawPointsAddress(meshFn), meshFn.numVertices() * POINT_SIZE)
+
+
+def setPoints(edits):
+    """Copy points into the mesh data of attributes, then set the data back with an API 1.0 MDGModifier.
+
+    Args:
+        edits (list): node name, attribute and packed points per edit, the
+            attribute holding mesh data with as many points.
+
+    Returns:
+        OpenMaya.MDGModifier: the executed modifier, to undo and redo the edits with.
+    """
+    modifier = OpenMaya.MDGModifier()
+
+    for name, attr, data in edits:
+        plug = OpenMaya.MFnDependencyNode(getDependNode(name)).findPlug(attr, False)
+        meshData = plug.asMObject()
+        meshFn = OpenMaya.MFnMesh(meshData)
+
+        if meshFn.numVertices() * POINT_SIZE != len(data):
+            raise ValueError('{0} bytes of points do not fit the {1} vertices of {2}.{3}.'.format(
+                len(data), meshFn.numVertices(), name, attr))
+
+        ctypes.memmove(getRawPointsAddress(meshFn), data, len(data))
+        modifier.newPlugValue(plug, meshData)
+
+    modifier.doIt()
+
+    return modifier
@@ -87,24 +87,77 @@ def getSkinInfluences(node):
     return [inf.node() for inf in skin.influenceObjects()]
 
 
-def getSkeletonHierarchy(influences):
-    nodes = getSkeleton(influences)
+class NodeKey(object):
+    """Hashable identity of a node, MObjects themselves cannot be hashed.
 
-    return [i for n, i in enumerate(nodes) if i not in nodes[:n]] 
+    MObjectHandle hash codes are not unique, so keys also compare their handles.
+    """
+    __slots__ = ['handle', '_hash']
 
+    def __init__(self, node):
+        self.handle = OpenMaya.MObjectHandle(node)
+        self._hash = self.handle.hashCode()
 
-def getSkeleton(influences):
+    def __eq__(self, other):
+        return isinstance(other, NodeKey) and self.handle == other.handle
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
+
+def getNodeKey(node):
+    return NodeKey(node)
+
+
+def resolveSkeleton(influences):
+    """Get the influences along with all their transform ancestors.
+
+    Each ancestor chain is walked only until it reaches a node that was already
+    found, so shared ancestors are visited once. Nodes are ordered parents
+    before children, following the order of the influences.
+
+    Returns:
+        tuple: list of OpenMaya.MObject and a dict of node key to its index in that list.
+    """
     result = []
+    indices = {}
 
     for n in influences:
-        result.append(n)
+        chain = []
 
-        for parentMObject in getParents(n):
-            
-            if parentMObject.hasFn(OpenMaya.MFn.kTransform) and parentMObject not in influences:
-                result.extend(getSkeleton([parentMObject]))
+        node = n
+        while node is not None:
+            key = getNodeKey(node)
+            if key in indices:
+                break
 
-    return result
+            # Mark as found right away so a node is never added twice to a chain.
+            indices[key] = None
+            chain.append((key, node))
+
+            dag = OpenMaya.MFnDagNode(node)
+            node = None
+            if dag.parentCount():
+                parent = dag.parent(0)
+                if parent.hasFn(OpenMaya.MFn.kTransform):
+                    node = parent
+
+        for key, node in reversed(chain):
+            indices[key] = len(result)
+            result.append(node)
+
+    return result, indices
+
+
+def getSkeletonHierarchy(influences):
+    return resolveSkeleton(influences)[0]
+
+
+def getSkeleton(influences):
+    return resolveSkeleton(influences)[0]
 
 
 def isIntermediateObject(node):
@@ -0,0 +1,51 @@
+import os
+import sys
+import unittest
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SOURCE_DIRECTORY not in sys.path:
+    sys.path.insert(0, SOURCE_DIRECTORY)
+
+from gltf.interface import core, gltf
+
+
+def getContext(**accessorData):
+    ctx = gltf.GLTF()
+    ctx.accessors.append(gltf.Accessor.fromData(**accessorData))
+
+    return ctx
+
+
+class AccessorWithoutBufferViewTest(unittest.TestCase):
+
+    def setUp(self):
+        self.numpy = core.numpy
+
+    def tearDown(self):
+        core.numpy = self.numpy
+
+    def test_data_is_zeros(self):
+        ctx = getContext(componentType=core.COMPONENT_TYPE_FLOAT, type='VEC3', count=3)
+
+        self.assertEqual(core.toBytes(ctx.getAccessorData(0)), b'\x00' * 36)
+
+    def test_array_is_zeros(self):
+        ctx = getContext(componentType=core.COMPONENT_TYPE_UNSIGNED_SHORT, type='VEC2', count=4)
+
+        self.assertEqual(core.toList(ctx.getAccessorArray(0)), [[0, 0]] * 4 if core.numpy else [0] * 8)
+
+    def test_array_is_zeros_without_numpy(self):
+        core.numpy = None
+        ctx = getContext(componentType=core.COMPONENT_TYPE_FLOAT, type='SCALAR', count=5)
+
+        self.assertEqual(core.toList(ctx.getAccessorArray(0)), [0.0] * 5)
+
+    def test_sparse_is_refused(self):
+        ctx = getContext(componentType=core.COMPONENT_TYPE_FLOAT, type='SCALAR', count=5, sparse={'count': 1})
+
+        with self.assertRaises(ValueError):
+            ctx.getAccessorData(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
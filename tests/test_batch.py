@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SOURCE_DIRECTORY not in sys.path:
+    sys.path.insert(0, SOURCE_DIRECTORY)
+
+from gltf.interface import batch, core, gltf, mesh
+
+
+def getContext():
+    ctx = gltf.GLTF()
+    ctx.buffers.append(gltf.Buffer())
+
+    return ctx
+
+
+def getTrianglePrimitive(ctx):
+    """Two unindexed triangles sharing an edge, their shared corners identical."""
+    primitive = gltf.Primitive()
+    primitive.attributes = {
+        'POSITION': batch.addAccessor(
+            ctx, [0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0], core.COMPONENT_TYPE_FLOAT, 'VEC3'),
+    }
+
+    return primitive
+
+
+class RepackPrimitiveTest(unittest.TestCase):
+
+    def test_unoptimized_keeps_no_indices(self):
+        source = getContext()
+        result = batch.repackPrimitive(source, getContext(), getTrianglePrimitive(source), optimize=False)
+
+        self.assertIsNone(result.indices)
+
+    def test_optimized_welds_into_indices(self):
+        source = getContext()
+        target = getContext()
+        result = batch.repackPrimitive(source, target, getTrianglePrimitive(source))
+
+        self.assertEqual(len(core.toList(target.getAccessorArray(result.indices))), 6)
+        self.assertEqual(target.accessors[result.attributes['POSITION']].count, 4)
+
+
+class WeldVerticesTest(unittest.TestCase):
+
+    @unittest.skipIf(core.numpy is None, 'numpy is not available')
+    def test_integers_are_not_rounded(self):
+        # Past 2 ** 24 neighbouring integers round to the same float32.
+        values = core.numpy.array([2 ** 24, 2 ** 24 + 1], dtype='uint32')
+        indices, attributes, stats = mesh.weldVertices([0, 1], [(values, 1)])
+
+        self.assertEqual(stats['weldedVertexCount'], 2)
+        self.assertEqual(core.toList(attributes[0]), [2 ** 24, 2 ** 24 + 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import io
+import json
+import os
+import sys
+import unittest
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SOURCE_DIRECTORY not in sys.path:
+    sys.path.insert(0, SOURCE_DIRECTORY)
+
+from gltf.interface import core, gltf
+
+
+def getContext():
+    ctx = gltf.GLTF()
+    ctx.asset = gltf.Asset()
+    ctx.scene = 0
+
+    scene = gltf.Scene()
+    scene.nodes = [0]
+    ctx.scenes.append(scene)
+
+    for index in range(3):
+        node = gltf.Node()
+        node.name = 'node{0}'.format(index)
+        node.translation = [index * 0.1, 0.0, -1.0]
+        node.children = [index + 1] if index < 2 else None
+        node.extras = {'tags': ['a', 'b'], 'weight': 1.0 / 3.0}
+        ctx.nodes.append(node)
+
+    buff = gltf.Buffer()
+    buff.uri = 'out.bin'
+    buff.append(b'\x00' * 12)
+    ctx.buffers.append(buff)
+    ctx.bufferViews.append(gltf.BufferView.addBufferView(buff, b'\x00' * 12))
+    ctx.accessors.append(gltf.Accessor.fromData(
+        bufferView=0, componentType=core.COMPONENT_TYPE_FLOAT, type='VEC3', count=1, min=[0.0] * 3, max=[0.0] * 3))
+
+    return ctx
+
+
+def dump(ctx, compact):
+    fp = io.StringIO()
+    ctx.dump(fp, compact)
+
+    return fp.getvalue()
+
+
+class DumpTest(unittest.TestCase):
+
+    def test_matches_serialized(self):
+        ctx = getContext()
+
+        self.assertEqual(json.loads(dump(ctx, False)), json.loads(ctx.serialized()))
+
+    def test_matches_serialized_compact(self):
+        ctx = getContext()
+
+        self.assertEqual(json.loads(dump(ctx, True)), json.loads(ctx.serialized(compact=True)))
+
+    def test_empty_lists(self):
+        ctx = gltf.GLTF()
+        ctx.asset = gltf.Asset()
+
+        self.assertEqual(json.loads(dump(ctx, False)), json.loads(ctx.serialized()))
+
+
+if __name__ == '__main__':
+    unittest.main()
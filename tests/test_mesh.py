@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+import unittest
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SOURCE_DIRECTORY not in sys.path:
+    sys.path.insert(0, SOURCE_DIRECTORY)
+
+from gltf.interface import mesh
+
+
+def getShuffledGrid(size):
+    """Get the triangle indices of a size by size quad grid, in random triangle order."""
+    triangles = []
+    for y in range(size):
+        for x in range(size):
+            a = y * (size + 1) + x
+            c = a + size + 1
+            triangles.extend([[a, a + 1, c], [a + 1, c + 1, c]])
+
+    random.Random(1).shuffle(triangles)
+
+    return sum(triangles, [])
+
+
+class OptimizeVertexCacheTest(unittest.TestCase):
+
+    def test_keeps_every_triangle(self):
+        indices = getShuffledGrid(20)
+        result = mesh.optimizeVertexCache(indices)
+
+        self.assertEqual(
+            sorted(tuple(result[i:i + 3]) for i in range(0, len(result), 3)),
+            sorted(tuple(indices[i:i + 3]) for i in range(0, len(indices), 3)))
+
+    def test_lowers_acmr(self):
+        indices = getShuffledGrid(40)
+
+        self.assertLess(mesh.getACMR(mesh.optimizeVertexCache(indices)), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()